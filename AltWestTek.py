@@ -1,154 +1,177 @@
 import time
-import random
-import keyboard
-import datetime
-import threading
-import sys
-import psutil
+from RoutineMixin import RoutineMixin
+from RoutineDefaults import ALT_CONFIG
 
-class Alt:
-    def __init__(self, config=None):
-        # Default configuration
-        self.default_config = {
-            "walk_min_time": 63,
-            "walk_max_time": 88,
-            "sleep_min_time": 80,
-            "sleep_max_time": 100,
-            "walk_cycles": 8,
-            "wait_time": 60000,  # 60 seconds in milliseconds
-            "action_key": "e",
-            "action_press_time": 60,  # in milliseconds
-            "action_cycles": 15,
-            "backward_key": "s",  # The parameter name in your original code
-            "right_key": "d",
-            "start_hotkey": "f3",
-            "stop_hotkey": "f2",
-            "game_process": "Fallout76.exe"  # Added game process check
-        }
-        
-        # Use provided config or default
-        self.config = config if config else self.default_config
-        self.running = False
-        self.hotkeys_registered = False
-        self.registered_hotkeys = []  # Track which hotkeys were successfully registered
-    
-    def display_tooltip(self, message=None):
-        """Display a message (equivalent to ToolTip in AHK)"""
-        if message:
-            print(f"\rCountdown: {message}", end="")
-        else:
-            print("\r" + " " * 20 + "\r", end="")  # Clear the line
-    
-    def process_exists(self, process_name):
-        """Check if a process exists by name"""
-        for proc in psutil.process_iter(['name']):
-            if proc.info['name'] == process_name:
-                return True
-        return False
+class Alt(RoutineMixin):
+    default_config = ALT_CONFIG
     
-    def start_automation(self):
-        """Function that gets called when start hotkey is pressed"""
-        self.running = True
+    def __init__(self, config=None, logger=None, clock=None, rng=None, input_backend=None):
+        RoutineMixin.__init__(self, config, logger, None, clock, rng, input_backend)
+        self.registered_hotkeys = []  # Track which hotkeys were successfully registered
+        self.stop_requested = False
         
+        # Cycle steps in order, a checkpoint is journaled before each one
+        self.cycle_steps = [
+            ("walk", self.walk),
+            ("wait", self.wait_for_respawn),
+            ("action", self.press_action)
+        ]
+    
+    def automation_loop(self, resume=None):
+        """Countdown to the respawn minute (or resume a checkpoint), then run cycles until stopped"""
         # Check if game is running before starting
         if not self.process_exists(self.config["game_process"]):
-            print(f"{self.config['game_process']} not running. Exiting script...")
+            self.logger.error("{process} not running. Exiting script...", process=self.config["game_process"])
             self.running = False
             return
         
-        # First loop - countdown until seconds = 01
-        while self.running:
-            # Get current time seconds
-            current_seconds = datetime.datetime.now().strftime("%S")
-            
-            if int(current_seconds) > 1:
-                countdown = 60 - int(current_seconds)
-            else:
-                countdown = 1
-                
-            self.display_tooltip(countdown)
-            
-            if current_seconds == "01":
-                self.display_tooltip()  # Clear tooltip
-                break
-            
-            time.sleep(0.1)  # Small delay to prevent high CPU usage
+        if resume is None:
+            self.wait_for_start()
+            start_phase, start_time = self.cycle_steps[0][0], None
+        else:
+            start_phase, start_time = resume
         
         # Second loop - continuous movement and key presses
         while self.running:
             # Check if game is running
             if not self.process_exists(self.config["game_process"]):
-                print(f"{self.config['game_process']} not running. Exiting script...")
+                self.logger.error("{process} not running. Exiting script...", process=self.config["game_process"])
                 self.stop_automation()
                 return
-                
-            start_time = time.time()
-            
-            # Walking pattern
-            for _ in range(self.config["walk_cycles"]):
-                ran_walk = random.randint(self.config["walk_min_time"], self.config["walk_max_time"]) / 1000
-                walk_sleep = random.randint(self.config["sleep_min_time"], self.config["sleep_max_time"]) / 1000
-                
-                # Fixed the variable name here to match the config
-                keyboard.press(self.config["backward_key"])
-                time.sleep(ran_walk)
-                keyboard.press(self.config["right_key"])
-                time.sleep(walk_sleep)
-                keyboard.release(self.config["backward_key"])
-                time.sleep(ran_walk)
-                keyboard.release(self.config["right_key"])
-                time.sleep(ran_walk)
             
-            # Wait until configured time has passed
-            while self.running:
-                elapsed_time = (time.time() - start_time) * 1000  # Convert to ms
-                if elapsed_time >= self.config["wait_time"]:
-                    break
-                time.sleep(1)
+            self.run_cycle(start_phase, start_time)
+            start_phase, start_time = self.cycle_steps[0][0], None
+        
+        if self.max_cycles and self.cycles_completed >= self.max_cycles:
+            self.checkpoint("stopped")
+    
+    def walk(self):
+        """Walking pattern"""
+        if self.hot_loop is not None:
+            self.walk_hot()
+            return
+        
+        for _ in range(self.config["walk_cycles"]):
+            ran_walk = self.rng.randint("walk", self.config["walk_min_time"], self.config["walk_max_time"]) / 1000
+            walk_sleep = self.rng.randint("walk_sleep", self.config["sleep_min_time"], self.config["sleep_max_time"]) / 1000
             
-            # Press action key multiple times
-            for _ in range(self.config["action_cycles"]):
-                keyboard.press(self.config["action_key"])
-                time.sleep(self.config["action_press_time"] / 1000)
-                keyboard.release(self.config["action_key"])
+            # Fixed the variable name here to match the config
+            self.input.press(self.config["backward_key"])
+            self.clock.sleep(ran_walk)
+            self.input.press(self.config["right_key"])
+            self.clock.sleep(walk_sleep)
+            self.input.release(self.config["backward_key"])
+            self.clock.sleep(ran_walk)
+            self.input.release(self.config["right_key"])
+            self.clock.sleep(ran_walk)
+    
+    def walk_hot(self):
+        """Walking pattern with every walk's timing drawn up front, so the walks themselves allocate nothing"""
+        walks = self.config["walk_cycles"]
+        walk_times = self.hot_loop.draw("walk", self.rng.stream("walk"),
+                                        self.config["walk_min_time"], self.config["walk_max_time"], walks)
+        walk_sleeps = self.hot_loop.draw("walk_sleep", self.rng.stream("walk_sleep"),
+                                         self.config["sleep_min_time"], self.config["sleep_max_time"], walks)
+        self.hot_loop.burst()
+        self.fire_walks(walk_times, walk_sleeps, walks)
+    
+    def fire_walks(self, walk_times, walk_sleeps, walks):
+        """Timing-critical part of the hot walking pattern"""
+        backward_key, right_key = self.config["backward_key"], self.config["right_key"]
+        press, release, sleep = self.input.press, self.input.release, self.clock.burst_sleep
+        for walk in self.hot_loop.indices(walks):
+            ran_walk = walk_times[walk]
+            press(backward_key)
+            sleep(ran_walk)
+            press(right_key)
+            sleep(walk_sleeps[walk])
+            release(backward_key)
+            sleep(ran_walk)
+            release(right_key)
+            sleep(ran_walk)
+    
+    def press_action(self):
+        """Press action key multiple times"""
+        if self.hot_loop is not None:
+            self.hot_loop.burst()
+            self.fire_actions(self.config["action_cycles"])
+            return
+        
+        for _ in range(self.config["action_cycles"]):
+            self.input.press(self.config["action_key"])
+            self.clock.sleep(self.config["action_press_time"] / 1000)
+            self.input.release(self.config["action_key"])
+    
+    def fire_actions(self, presses):
+        """Hot loop action presses, with the hold computed once"""
+        key, hold = self.config["action_key"], self.config["action_press_time"] / 1000
+        press, release, sleep = self.input.press, self.input.release, self.clock.burst_sleep
+        for _ in self.hot_loop.indices(presses):
+            press(key)
+            sleep(hold)
+            release(key)
     
     def stop_automation(self):
         """Function that gets called when stop hotkey is pressed"""
-        self.running = False
+        self.abort()
         
         # Make sure to release all keys
         try:
             time.sleep(0.09)  # 90ms
-            keyboard.release(self.config["backward_key"])
+            self.input.release(self.config["backward_key"])
             time.sleep(0.09)  # 90ms
-            keyboard.release(self.config["right_key"])
+            self.input.release(self.config["right_key"])
             time.sleep(0.09)  # 90ms
-            keyboard.release(self.config["action_key"])
+            self.input.release(self.config["action_key"])
         except Exception as e:
-            print(f"Error releasing keys: {e}")
+            self.logger.error("Error releasing keys: {error}", error=e)
+
+    def release_keys(self):
+        """Make sure no movement or action key stays held down after an abort"""
+        self.stop_automation()
+
+    def stop_hotkey_pressed(self):
+        """Stop the automation and let run() return"""
+        self.stop_requested = True
+        self.stop_automation()
 
     def register_hotkeys(self):
         """Register hotkeys for starting and stopping automation"""
         if not self.hotkeys_registered:
             try:
                 # Register start hotkey
-                start_hotkey = keyboard.add_hotkey(
+                start_hotkey = self.input.add_hotkey(
                     self.config["start_hotkey"], 
                     self.start_automation
                 )
                 self.registered_hotkeys.append(self.config["start_hotkey"])
                 
                 # Register stop hotkey
-                stop_hotkey = keyboard.add_hotkey(
+                stop_hotkey = self.input.add_hotkey(
                     self.config["stop_hotkey"], 
-                    self.stop_automation
+                    self.stop_hotkey_pressed
                 )
                 self.registered_hotkeys.append(self.config["stop_hotkey"])
                 
+                # Register sampler hotkey
+                self.input.add_hotkey(
+                    self.config["sampler_hotkey"],
+                    self.toggle_sampler
+                )
+                self.registered_hotkeys.append(self.config["sampler_hotkey"])
+                
+                # Register respawn hotkey
+                self.input.add_hotkey(
+                    self.config["respawn_hotkey"],
+                    self.mark_respawn
+                )
+                self.registered_hotkeys.append(self.config["respawn_hotkey"])
+                
                 self.hotkeys_registered = True
-                print(f"Registered hotkeys: {self.config['start_hotkey']} and {self.config['stop_hotkey']}")
+                self.logger.info("Registered hotkeys: {start_hotkey} and {stop_hotkey}",
+                                 start_hotkey=self.config["start_hotkey"], stop_hotkey=self.config["stop_hotkey"])
             except Exception as e:
-                print(f"Error registering hotkeys: {e}")
+                self.logger.error("Error registering hotkeys: {error}", error=e)
             
     def unregister_hotkeys(self):
         """Unregister hotkeys"""
@@ -156,27 +179,30 @@ class Alt:
             try:
                 # Only attempt to remove hotkeys that were successfully registered
                 for hotkey in self.registered_hotkeys:
-                    keyboard.remove_hotkey(hotkey)
+                    self.input.remove_hotkey(hotkey)
                 self.registered_hotkeys = []
                 self.hotkeys_registered = False
-                print("Hotkeys unregistered")
+                self.logger.info("Hotkeys unregistered")
             except Exception as e:
-                print(f"Error unregistering hotkeys: {e}")
+                self.logger.error("Error unregistering hotkeys: {error}", error=e)
     
     def run(self):
         """Main method to run the automation with hotkeys"""
-        print(f"Alt WestTek Script running. Press {self.config['start_hotkey']} to start, {self.config['stop_hotkey']} to stop.")
+        self.logger.info("Alt WestTek Script running. Press {start_hotkey} to start, {stop_hotkey} to stop.",
+                         start_hotkey=self.config["start_hotkey"], stop_hotkey=self.config["stop_hotkey"])
         
         # Check if game is running before registering hotkeys
         if not self.process_exists(self.config["game_process"]):
-            print(f"{self.config['game_process']} not running. Exiting script...")
+            self.logger.error("{process} not running. Exiting script...", process=self.config["game_process"])
             return
             
         self.register_hotkeys()
         
         try:
-            # Keep the script running
-            keyboard.wait(self.config["stop_hotkey"])
+            # Keep the script running until the stop hotkey is pressed or the hotkeys are unregistered
+            self.stop_requested = False
+            while self.hotkeys_registered and not self.stop_requested:
+                time.sleep(0.2)
         except KeyboardInterrupt:
             # Handle Ctrl+C
             pass
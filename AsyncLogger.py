@@ -0,0 +1,236 @@
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import datetime
+import threading
+
+from RoutineFactory import CONFIG_FOLDER
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+STATUS = 0  # Marker for the single rewritten status line (the old tooltip)
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+DEFAULT_LOG_FILE = os.path.join(CONFIG_FOLDER, "westtek.log")
+
+
+class AsyncLogger:
+    """Structured logger that formats and writes records on a background thread"""
+
+    def __init__(self, log_file=DEFAULT_LOG_FILE, console=True, level=INFO,
+                 max_bytes=1000000, backup_count=3, rate_limit_interval=1.0):
+        self.log_file = log_file
+        self.console = console
+        self.level = level
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.rate_limit_interval = rate_limit_interval
+
+        # The hot path only appends a tuple to this queue
+        self.queue = queue.SimpleQueue()
+        self.thread = None
+
+        # Writer thread state
+        self.file = None
+        self.file_size = 0
+        self.status_line = None
+        self.last_emitted = {}  # (level, text) -> [last write time, suppressed count, message, fields]
+        self.last_sweep = 0.0
+        self.suppressed_total = 0
+
+    # Hot path, called from the automation threads
+
+    def debug(self, message, **fields):
+        """Queue a debug record"""
+        if self.level <= DEBUG:
+            self.queue.put((time.time(), DEBUG, message, fields))
+
+    def info(self, message, **fields):
+        """Queue an info record"""
+        if self.level <= INFO:
+            self.queue.put((time.time(), INFO, message, fields))
+
+    def warning(self, message, **fields):
+        """Queue a warning record"""
+        if self.level <= WARNING:
+            self.queue.put((time.time(), WARNING, message, fields))
+
+    def error(self, message, **fields):
+        """Queue an error record"""
+        self.queue.put((time.time(), ERROR, message, fields))
+
+    def status(self, message=None, **fields):
+        """Queue a rewrite of the console status line, or clear it when message is None"""
+        self.queue.put((time.time(), STATUS, message, fields))
+
+    # Lifecycle
+
+    def start(self):
+        """Start the background writer thread"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.writer_loop, name="AsyncLogger", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Flush pending records and stop the writer thread"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+
+    # Background writer
+
+    def writer_loop(self):
+        """Drain the queue, formatting and writing each record"""
+        while True:
+            try:
+                record = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                self.sweep_suppressed(time.time())
+                self.flush()
+                continue
+
+            if record is None:
+                break
+
+            try:
+                self.write_record(record)
+            except Exception as e:
+                # Never let a bad record kill the writer
+                sys.stderr.write(f"Logging error: {e}\n")
+
+            # Flush once the burst has been drained
+            if self.queue.empty():
+                self.flush()
+
+        # Report repeats still held back, or they would never show up
+        self.sweep_suppressed(None)
+        self.flush()
+        self.close_file()
+
+    def write_record(self, record):
+        """Format a single record and write it to the console and log file"""
+        timestamp, level, message, fields = record
+
+        if level == STATUS:
+            self.write_status(message.format(**fields) if message else None)
+            return
+
+        # Rate limit repeats of the same formatted message
+        text = message.format(**fields) if fields else message
+        key = (level, text)
+        entry = self.last_emitted.get(key)
+        if entry is not None and timestamp - entry[0] < self.rate_limit_interval:
+            entry[1] += 1
+            self.suppressed_total += 1
+            return
+
+        if entry is not None and entry[1]:
+            text += f" ({entry[1]} repeats suppressed)"
+        self.last_emitted[key] = [timestamp, 0, message, fields]
+        if timestamp - self.last_sweep >= self.rate_limit_interval or len(self.last_emitted) > 1000:
+            self.sweep_suppressed(timestamp)
+
+        self.emit(timestamp, level, text, message, fields)
+
+    def sweep_suppressed(self, now):
+        """Report and forget messages whose rate limit window has passed (all of them when now is None)"""
+        if now is not None:
+            self.last_sweep = now
+        expired = [key for key, entry in self.last_emitted.items()
+                   if now is None or now - entry[0] >= self.rate_limit_interval]
+        for key in expired:
+            _, suppressed, message, fields = self.last_emitted.pop(key)
+            if suppressed:
+                level, text = key
+                self.emit(now if now is not None else time.time(), level,
+                          f"{text} ({suppressed} repeats suppressed)", message, fields)
+
+    def emit(self, timestamp, level, text, message, fields):
+        """Write a formatted record to the console and log file"""
+        if self.console:
+            clock = datetime.datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
+            if self.status_line:
+                # Clear the status line before writing over it
+                sys.stdout.write("\r" + " " * len(self.status_line) + "\r")
+                self.status_line = None
+            sys.stdout.write(f"{clock} {LEVEL_NAMES[level]:<7} {text}\n")
+
+        if self.log_file:
+            entry = {"ts": round(timestamp, 3), "level": LEVEL_NAMES[level], "msg": text, "event": message}
+            entry.update(fields)
+            self.write_file(json.dumps(entry, default=str) + "\n")
+
+    def write_status(self, text):
+        """Rewrite the console status line, skipping writes that change nothing"""
+        if not self.console or text == self.status_line:
+            return
+
+        if text:
+            padding = " " * max(0, len(self.status_line or "") - len(text))
+            sys.stdout.write("\r" + text + padding)
+        elif self.status_line:
+            sys.stdout.write("\r" + " " * len(self.status_line) + "\r")
+        self.status_line = text
+
+    def write_file(self, line):
+        """Append a line to the log file, rotating it when it grows too large"""
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.log_file) or ".", exist_ok=True)
+            self.file = open(self.log_file, "a", encoding="utf-8")
+            self.file_size = self.file.tell()
+
+        data_size = len(line.encode("utf-8"))
+        if self.max_bytes and self.file_size + data_size > self.max_bytes and self.file_size > 0:
+            self.rotate()
+
+        self.file.write(line)
+        self.file_size += data_size
+
+    def rotate(self):
+        """Shift log.1 .. log.N up by one and start a new log file"""
+        self.close_file()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.log_file}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.log_file}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            os.remove(self.log_file)
+        self.file = open(self.log_file, "a", encoding="utf-8")
+        self.file_size = 0
+
+    def flush(self):
+        """Flush the console and log file"""
+        if self.console:
+            sys.stdout.flush()
+        if self.file is not None:
+            self.file.flush()
+
+    def close_file(self):
+        """Close the log file"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+_default_logger = None
+_default_logger_lock = threading.Lock()
+
+
+def get_logger():
+    """Return the shared logger, starting it on first use"""
+    global _default_logger
+    with _default_logger_lock:
+        if _default_logger is None:
+            _default_logger = AsyncLogger().start()
+            atexit.register(_default_logger.stop)
+        return _default_logger
@@ -0,0 +1,124 @@
+import os
+import json
+import time
+import datetime
+
+from RoutineFactory import CONFIG_FOLDER
+
+TRACE_FOLDER = os.path.join(CONFIG_FOLDER, "traces")
+
+# Track (tid) of each event category in the trace viewer
+TRACKS = {"cycle": 1, "input": 2}
+
+
+def trace_path(routine_name):
+    """New trace file for a routine run, named after the time it is dumped"""
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(TRACE_FOLDER, f"{routine_name}_{stamp}.trace.json")
+
+
+class ChromeTracer:
+    """Preallocated ring of spans, dumped in Chrome Trace Event Format for Perfetto or chrome://tracing
+
+    Recording a span only stores four references into lists allocated up front, so
+    it stays well under a microsecond. Once the ring is full the oldest spans are
+    overwritten. Routines only create a tracer when tracing is enabled.
+    """
+
+    def __init__(self, now=time.perf_counter, capacity=65536):
+        self.now = now  # Seconds from a high resolution timer
+        self.capacity = capacity
+        self.names = [None] * capacity
+        self.categories = [None] * capacity
+        self.starts = [0.0] * capacity
+        self.ends = [0.0] * capacity
+        self.count = 0
+
+    def span(self, name, category, start, end):
+        """Record a finished span"""
+        index = self.count % self.capacity
+        self.names[index] = name
+        self.categories[index] = category
+        self.starts[index] = start
+        self.ends[index] = end
+        self.count += 1
+
+    def call(self, name, function, category="cycle"):
+        """Run a function and record it as a span, also when it raises (an abort mid-step)"""
+        start = self.now()
+        try:
+            return function()
+        finally:
+            self.span(name, category, start, self.now())
+
+    @property
+    def dropped(self):
+        """Spans overwritten since the last dump"""
+        return max(0, self.count - self.capacity)
+
+    def events(self):
+        """Recorded spans as trace event dicts, oldest first"""
+        pid = os.getpid()
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": category}}
+                  for category, tid in TRACKS.items()]
+        first = max(0, self.count - self.capacity)
+        for n in range(first, self.count):
+            index = n % self.capacity
+            start = self.starts[index]
+            events.append({
+                "name": self.names[index],
+                "cat": self.categories[index],
+                "ph": "X",
+                "ts": round(start * 1000000, 3),
+                "dur": round((self.ends[index] - start) * 1000000, 3),
+                "pid": pid,
+                "tid": TRACKS.get(self.categories[index], 0)
+            })
+        return events
+
+    def dump(self, path):
+        """Write the recorded spans to a trace file and clear the ring, returning the span count"""
+        count = self.count - self.dropped
+        if not count:
+            return 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms",
+                       "otherData": {"dropped": self.dropped}}, f, separators=(",", ":"))
+        self.count = 0
+        return count
+
+
+class TracedInput:
+    """Input backend wrapper that records each key hold, press to release, as a span"""
+
+    def __init__(self, backend, tracer):
+        self.backend = backend
+        self.tracer = tracer
+        self.down = {}  # key -> press time
+
+    def press(self, key):
+        self.backend.press(key)
+        self.down[key] = self.tracer.now()
+
+    def release(self, key):
+        self.backend.release(key)
+        start = self.down.pop(key, None)
+        if start is not None:
+            self.tracer.span(key, "input", start, self.tracer.now())
+
+    def __getattr__(self, name):
+        # Hotkeys and anything else go straight to the real backend
+        return getattr(self.backend, name)
+
+
+# If this script is run directly, measure the cost of recording a span
+if __name__ == "__main__":
+    tracer = ChromeTracer()
+    runs = 1000000
+    started = time.perf_counter()
+    for _ in range(runs):
+        now = tracer.now()
+        tracer.span("shoot", "cycle", now, now)
+    elapsed = time.perf_counter() - started
+    print(f"{elapsed / runs * 1e9:.0f} ns per span (timer read included), {tracer.dropped} overwritten")
@@ -0,0 +1,406 @@
+import re
+import sys
+import json
+import time
+import asyncio
+import threading
+
+import RoutineFactory
+from AsyncLogger import get_logger
+
+DEFAULT_PORT = 8776
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+
+
+def phase_error_ms(routine):
+    """Phase error of the routine's latest cycle start in ms, or None when its cycles are not phase-locked"""
+    phase_lock = getattr(routine, "phase_lock", None)
+    if phase_lock is None or phase_lock.last_error is None:
+        return None
+    return round(phase_lock.last_error * 1000, 3)
+
+
+def mistyped_keys(defaults, values):
+    """Keys whose value does not have the type of its default (an int will do for a float)"""
+    mistyped = []
+    for key, value in values.items():
+        expected = type(defaults[key])
+        if type(value) is not expected and not (expected is float and type(value) is int):
+            mistyped.append(f"{key} (expected {expected.__name__})")
+    return mistyped
+
+
+class RoutineInstance:
+    """A routine run by the control server on its own thread"""
+
+    def __init__(self, instance_id, routine_name, profile=None, config=None):
+        self.id = instance_id
+        self.routine_name = routine_name
+        self.profile = profile
+        self.overrides = dict(config or {})  # Applied on top of the profile at every start
+        self.routine = None
+        self.thread = None
+        self.started = None
+        self.last_error = None
+
+    def state(self):
+        """idle, running, paused, stopping or finished"""
+        if self.routine is None:
+            return "idle"
+        if self.thread is not None and self.thread.is_alive():
+            return "running" if self.routine.running else "stopping"
+        if getattr(self.routine, "paused", False):
+            return "paused"
+        return "finished"
+
+    def create(self, logger):
+        """Create the routine from its profile and overrides (reads files and imports, so off the server loop)"""
+        config = RoutineFactory.load_config(self.routine_name, profile=self.profile)
+        config.update(self.overrides)
+        self.routine = RoutineFactory.create_routine(self.routine_name, config, logger=logger)
+        # Instances of the same routine must not share a checkpoint journal or status block
+        safe_id = re.sub(r"[^\w.-]", "_", self.id)
+        self.routine.instance_name = f"{type(self.routine).__name__}-{safe_id}"
+
+    def resume(self):
+        """Run the existing routine again (it picks up its checkpoint after a pause)"""
+        self.last_error = None
+        self.started = time.time()
+        self.thread = threading.Thread(target=self.run, name=f"Control-{self.id}", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        """Routine thread"""
+        try:
+            self.routine.start_automation()
+        except SystemExit:
+            # exit_script() ends the routine's thread with SystemExit
+            pass
+        except Exception as e:
+            self.last_error = str(e)
+
+    def snapshot(self):
+        """Status of the instance, read from the routine's attributes"""
+        routine = self.routine
+        status = {
+            "id": self.id,
+            "routine": self.routine_name,
+            "profile": self.profile,
+            "state": self.state(),
+            "overrides": self.overrides,
+            "last_error": self.last_error
+        }
+        if routine is not None:
+            status.update({
+                "cycles": routine.cycles_completed,
+                "cycle_seconds": round(routine.cycle_seconds, 3),
+                "phase": getattr(routine, "phase", None),
+                "phase_error": phase_error_ms(routine),
+                "pacing": routine.pacer.stats() if getattr(routine, "pacer", None) is not None else None,
+                "emitter": routine.emitter.stats() if getattr(routine, "emitter", None) is not None else None,
+                "seed": getattr(getattr(routine, "rng", None), "seed", None),
+                "started": self.started,
+                "uptime": round(time.time() - self.started, 1) if self.started else None
+            })
+        return status
+
+
+class ControlError(Exception):
+    """A control request that cannot be served, with its HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ControlServer:
+    """Local HTTP control API for routine instances, served from an asyncio loop on its own thread
+
+    GET  /instances                 status of every instance
+    GET  /instances/<id>            status of one instance
+    POST /instances/<id>/start      start (body: {"routine", "profile", "config"}, routine required the first time)
+    POST /instances/<id>/stop       abort the run
+    POST /instances/<id>/pause      pause at the next step boundary, or resume from the checkpoint
+    POST /instances/<id>/sample     sample the automation thread's stack for its sampler window
+    PUT  /instances/<id>/config     swap config values, live for keys the routine reads each step
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None, token=None,
+                 snapshot_interval=0.25, logger=None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.token = token  # Required in an X-Control-Token header when set
+        self.snapshot_interval = snapshot_interval
+        self.logger = logger if logger else get_logger()
+
+        self.instances = {}
+        # Pre-serialised status bodies, rebuilt off the request path
+        self.snapshot_bodies = {}
+        self.snapshot_all = b"[]"
+
+        self.starting = set()  # Instances whose routine is being created in the executor
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    # Lifecycle
+
+    def start(self):
+        """Start the server loop on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="ControlServer", daemon=True)
+        self.thread.start()
+        self.ready.wait(5)
+        return self
+
+    def serve_forever(self):
+        """Thread body: run the asyncio loop until stop()"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self.serve())
+        finally:
+            self.loop.close()
+
+    async def serve(self):
+        """Open the listening socket and refresh snapshots until stopped"""
+        if self.unix_path:
+            self.server = await asyncio.start_unix_server(self.handle_connection, self.unix_path)
+            address = self.unix_path
+        else:
+            self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+            self.port = self.server.sockets[0].getsockname()[1]
+            address = f"http://{self.host}:{self.port}"
+        self.logger.info("Control server listening on {address}", address=address)
+        self.ready.set()
+
+        async with self.server:
+            while self.server.is_serving():
+                self.refresh_snapshots()
+                await asyncio.sleep(self.snapshot_interval)
+
+    def stop(self):
+        """Stop serving; running instances keep running unless stop_instances is called"""
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+        if self.thread is not None:
+            self.thread.join(5)
+
+    def stop_instances(self):
+        """Abort every running instance and wait for their threads"""
+        for instance in list(self.instances.values()):
+            if instance.routine is not None:
+                instance.routine.abort("control server stopped")
+            if instance.thread is not None:
+                instance.thread.join(5)
+
+    # Snapshots
+
+    def refresh_snapshots(self, instance_id=None):
+        """Rebuild the cached status bodies (of one instance, or all of them)"""
+        ids = [instance_id] if instance_id is not None else list(self.instances)
+        for key in ids:
+            self.snapshot_bodies[key] = json.dumps(self.instances[key].snapshot()).encode()
+        self.snapshot_all = b"[" + b",".join(self.snapshot_bodies[key] for key in self.instances) + b"]"
+
+    # HTTP
+
+    async def handle_connection(self, reader, writer):
+        """Serve one request per connection"""
+        try:
+            status, body = await self.read_and_dispatch(reader)
+        except ControlError as e:
+            status, body = e.status, json.dumps({"error": str(e)}).encode()
+        except Exception as e:
+            self.logger.error("Control request failed: {error}", error=e)
+            status, body = 500, json.dumps({"error": str(e)}).encode()
+
+        writer.write(f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + body)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def read_and_dispatch(self, reader):
+        """Parse the request and run it"""
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            raise ControlError(400, "Malformed request line")
+        method, path = request_line[0].upper(), request_line[1].split("?")[0]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if self.token and headers.get("x-control-token") != self.token:
+            raise ControlError(401, "Missing or wrong X-Control-Token")
+
+        body = None
+        length = int(headers.get("content-length", 0) or 0)
+        if length:
+            try:
+                body = json.loads(await reader.readexactly(length))
+            except ValueError:
+                raise ControlError(400, "Body is not valid JSON")
+
+        return await self.dispatch(method, [part for part in path.split("/") if part], body)
+
+    async def dispatch(self, method, parts, body):
+        """Route a request to its action, returning (status, JSON body bytes)"""
+        if not parts or parts[0] != "instances" or len(parts) > 3:
+            raise ControlError(404, "Unknown path")
+
+        if len(parts) == 1:
+            if method != "GET":
+                raise ControlError(405, "Use GET /instances")
+            return 200, self.snapshot_all
+
+        instance_id = parts[1]
+        if len(parts) == 2:
+            if method != "GET":
+                raise ControlError(405, "Use GET for instance status")
+            if instance_id not in self.snapshot_bodies:
+                raise ControlError(404, f"No instance {instance_id}")
+            return 200, self.snapshot_bodies[instance_id]
+
+        action = parts[2]
+        handlers = {
+            ("POST", "start"): self.start_instance,
+            ("POST", "stop"): self.stop_instance,
+            ("POST", "pause"): self.pause_instance,
+            ("POST", "sample"): self.sample_instance,
+            ("PUT", "config"): self.swap_config
+        }
+        if (method, action) not in handlers:
+            raise ControlError(404 if action not in ("start", "stop", "pause", "sample", "config") else 405,
+                               f"Unknown action {method} {action}")
+        if action == "start":
+            await self.start_instance(instance_id, body or {})
+        else:
+            handlers[(method, action)](instance_id, body or {})
+        self.refresh_snapshots(instance_id)
+        return 200, self.snapshot_bodies[instance_id]
+
+    # Actions
+
+    def get_instance(self, instance_id):
+        """Return an instance or raise 404"""
+        if instance_id not in self.instances:
+            raise ControlError(404, f"No instance {instance_id}")
+        return self.instances[instance_id]
+
+    async def start_instance(self, instance_id, body):
+        """Create or restart an instance, building its routine in the executor so other requests keep being served"""
+        instance = self.instances.get(instance_id)
+        if instance_id in self.starting or (instance is not None and instance.state() in ("running", "stopping")):
+            raise ControlError(409, f"{instance_id} is already running")
+
+        self.starting.add(instance_id)
+        try:
+            instance = await self.loop.run_in_executor(None, self.create_instance, instance_id, instance, body)
+        finally:
+            self.starting.discard(instance_id)
+        self.instances[instance_id] = instance
+        instance.resume()
+        self.logger.info("Control: started {instance} ({routine})", instance=instance_id, routine=instance.routine_name)
+
+    def create_instance(self, instance_id, instance, body):
+        """Executor thread: resolve the routine and create it from its profile (or saved config) and overrides"""
+        routine_name = body.get("routine") or (instance.routine_name if instance else None)
+        if routine_name is None:
+            raise ControlError(400, "Starting a new instance needs a routine")
+        if routine_name not in RoutineFactory.available_routines():
+            raise ControlError(400, f"Unknown routine {routine_name}")
+
+        if instance is None or body:
+            instance = RoutineInstance(instance_id, routine_name, body.get("profile"), body.get("config"))
+        try:
+            instance.create(self.logger)
+        except ValueError as e:
+            raise ControlError(400, str(e))
+        return instance
+
+    def stop_instance(self, instance_id, body):
+        """Abort an instance's run"""
+        instance = self.get_instance(instance_id)
+        if instance.routine is not None:
+            instance.routine.abort("stopped")
+            if hasattr(instance.routine, "paused"):
+                instance.routine.paused = False
+        self.logger.info("Control: stopped {instance}", instance=instance_id)
+
+    def pause_instance(self, instance_id, body):
+        """Toggle pause; the routine stops at its next step boundary and resumes from its checkpoint"""
+        instance = self.get_instance(instance_id)
+        routine = instance.routine
+        if routine is None or not hasattr(routine, "pause_toggle"):
+            raise ControlError(409, f"{instance_id} cannot be paused")
+
+        state = instance.state()
+        if state == "running" and not routine.paused:
+            routine.pause_toggle()
+        elif state == "paused":
+            routine.pause_toggle()
+            instance.resume()
+        else:
+            raise ControlError(409, f"{instance_id} is {state}")
+
+    def sample_instance(self, instance_id, body):
+        """Start (or end early) stack sampling of a running instance's automation thread"""
+        instance = self.get_instance(instance_id)
+        routine = instance.routine
+        if routine is None or not hasattr(routine, "toggle_sampler"):
+            raise ControlError(409, f"{instance_id} cannot be sampled")
+        if instance.state() != "running" or routine.automation_thread is None:
+            raise ControlError(409, f"{instance_id} is {instance.state()}")
+        routine.toggle_sampler()
+
+    def swap_config(self, instance_id, body):
+        """Replace config values, live on a running routine and kept for later starts"""
+        instance = self.get_instance(instance_id)
+        defaults = getattr(instance.routine, "default_config", None)
+        if defaults is None:
+            defaults = RoutineFactory.default_config(instance.routine_name)
+        unknown = [key for key in body if key not in defaults]
+        if unknown:
+            raise ControlError(400, f"Unknown config keys: {', '.join(unknown)}")
+        mistyped = mistyped_keys(defaults, body)
+        if mistyped:
+            raise ControlError(400, f"Wrong config value types: {', '.join(mistyped)}")
+
+        instance.overrides.update(body)
+        if instance.routine is not None:
+            # Routines read their config at each step, so new values apply from the next step on
+            instance.routine.config.update(body)
+        self.logger.info("Control: new config for {instance}: {keys}", instance=instance_id, keys=", ".join(body))
+
+
+# If this script is run directly, host routine instances controlled over loopback HTTP
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the local control server for routine instances")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Loopback HTTP port")
+    parser.add_argument("--unix", help="Serve on this Unix socket path instead of HTTP over loopback")
+    parser.add_argument("--token", help="Require this X-Control-Token header on every request")
+    args = parser.parse_args()
+
+    control = ControlServer(port=args.port, unix_path=args.unix, token=args.token).start()
+    try:
+        while control.thread.is_alive():
+            control.thread.join(0.5)
+    except KeyboardInterrupt:
+        pass
+    control.stop_instances()
+    control.stop()
+    control.logger.stop()
+    sys.exit(0)
@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import threading
+
+from RoutineFactory import CONFIG_FOLDER
+
+
+def journal_path(routine_name):
+    """Default journal file for a routine"""
+    return os.path.join(CONFIG_FOLDER, f"{routine_name}_checkpoint.journal")
+
+
+class CycleJournal:
+    """Append-only journal of cycle step checkpoints with batched fsync
+
+    Every record is written and flushed to the OS right away, so it survives the
+    app crashing. fsync (which survives power loss too) runs on a background thread
+    every sync_every records or sync_interval seconds, keeping it off the routine's
+    timing path.
+    """
+
+    def __init__(self, path, sync_every=8, sync_interval=5.0, max_bytes=1000000, logger=None):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.max_bytes = max_bytes
+        self.logger = logger
+
+        self.file = None
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+        self.sync_event = threading.Event()
+        self.closed = False
+        self.sync_thread = None
+
+    def open(self):
+        """Open the journal for appending and start the fsync thread"""
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+            self.closed = False
+            self.sync_thread = threading.Thread(target=self.sync_loop, name="CycleJournal", daemon=True)
+            self.sync_thread.start()
+        return self
+
+    def record(self, **fields):
+        """Append a checkpoint record"""
+        if self.file is None:
+            self.open()
+
+        line = json.dumps(fields, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            self.unsynced += 1
+            if self.file.tell() > self.max_bytes:
+                self.compact(line)
+
+        now = time.monotonic()
+        if self.unsynced >= self.sync_every or now - self.last_sync >= self.sync_interval:
+            self.sync_event.set()
+
+    def compact(self, last_line):
+        """Replace the journal with just its last record (called with the lock held)"""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(last_line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.file.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.unsynced = 0
+
+    def sync_loop(self):
+        """Background thread: fsync whenever a batch of records is waiting"""
+        while not self.closed:
+            self.sync_event.wait()
+            self.sync_event.clear()
+            try:
+                self.sync()
+            except OSError as e:
+                # Keep syncing later batches, the records are still flushed to the OS
+                if self.logger is not None:
+                    self.logger.warning("Journal fsync failed: {error}", error=e)
+
+    def sync(self):
+        """fsync the records written so far"""
+        with self.lock:
+            if self.file is None or not self.unsynced:
+                return
+            # A duplicate descriptor stays valid if compaction or close() swaps the file meanwhile
+            fileno = os.dup(self.file.fileno())
+            self.unsynced = 0
+        try:
+            os.fsync(fileno)
+        finally:
+            os.close(fileno)
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        """fsync outstanding records and close the journal"""
+        if self.file is None:
+            return
+        self.closed = True
+        self.sync_event.set()
+        if self.sync_thread is not None:
+            self.sync_thread.join(2)
+        with self.lock:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+
+    def last_record(self):
+        """Return the newest complete record in the journal, or None"""
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, "rb") as f:
+            # Checkpoints are small, the tail of the file is enough
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 8192))
+            lines = f.read().splitlines()
+
+        for line in reversed(lines):
+            try:
+                return json.loads(line)
+            except ValueError:
+                # Torn write from a crash, or the cut-off first line of the tail
+                continue
+        return None
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+from TemplateMatcher import TemplateMatcher
+
+# Probe files (detector.json in the config folder) look like:
+# {
+#   "capture_region": [0, 0, 1920, 1080],
+#   "budget_ms": 2.0,
+#   "states": {
+#     "loading": {"mode": "all", "probes": [
+#       {"region": [0, 0, 1920, 40], "color": [0, 0, 0], "tolerance": 12, "min_fraction": 0.95, "step": 4}
+#     ]},
+#     "enemies_present": {"mode": "any", "probes": [
+#       {"region": [900, 60, 120, 8], "color": [200, 30, 30]}
+#     ]},
+#     "elevator_prompt": {"templates": [
+#       {"template": "use_prompt.png", "roi": [860, 600, 400, 200], "threshold": 0.8}
+#     ]}
+#   }
+# }
+# Regions are [x, y, width, height] in capture coordinates and colours are RGB.
+# Template paths are relative to the probe file.
+
+
+class ArrayFrameSource:
+    """Frame source that replays a list of HxWx3 RGB NumPy arrays"""
+
+    def __init__(self, frames, loop=True):
+        self.frames = list(frames)
+        self.loop = loop
+        self.index = 0
+
+    def grab(self):
+        """Return the next frame, or None once a non-looping source runs out"""
+        if not self.frames:
+            return None
+        if self.index >= len(self.frames):
+            if not self.loop:
+                return None
+            self.index = 0
+        frame = self.frames[self.index]
+        self.index += 1
+        return frame
+
+    def close(self):
+        """Release the source"""
+        pass
+
+
+class DirectoryFrameSource(ArrayFrameSource):
+    """Frame source that replays the PNG files in a folder in name order"""
+
+    def __init__(self, folder, loop=True):
+        self.folder = folder
+        self.paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(".png")
+        )
+        super().__init__([load_png(path) for path in self.paths], loop)
+
+
+class ScreenFrameSource:
+    """Frame source that captures the screen (or a region of it) with mss"""
+
+    def __init__(self, region=None, monitor=1):
+        # Imported here so tests and offline tools do not need a display
+        import mss
+
+        self.sct = mss.mss()
+        if region:
+            x, y, width, height = region
+            self.monitor = {"left": x, "top": y, "width": width, "height": height}
+        else:
+            self.monitor = self.sct.monitors[monitor]
+
+    def grab(self):
+        """Capture a frame as an RGB view over the BGRA screenshot buffer"""
+        shot = np.asarray(self.sct.grab(self.monitor))
+        return shot[:, :, 2::-1]
+
+    def close(self):
+        """Release the capture handle"""
+        self.sct.close()
+
+
+def load_png(path):
+    """Load a PNG file as an HxWx3 uint8 RGB array"""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+class PixelProbe:
+    """Check that enough pixels in a screen region are close to a reference colour"""
+
+    def __init__(self, region, color, tolerance=20, min_fraction=0.8, step=1):
+        x, y, width, height = region
+        self.region = (x, y, width, height)
+        # Large regions can be sampled on a grid of every step-th pixel
+        self.rows = slice(y, y + height, step)
+        self.cols = slice(x, x + width, step)
+        self.color = np.array(color[:3], dtype=np.int16)
+        self.tolerance = tolerance
+
+        sampled_height = len(range(y, y + height, step))
+        sampled_width = len(range(x, x + width, step))
+        # Compare against a pixel count instead of dividing every frame
+        self.min_pixels = max(1, int(np.ceil(min_fraction * sampled_width * sampled_height)))
+
+        # Preallocated work buffers, so matching a frame does not allocate
+        self.diff = np.empty((sampled_height, sampled_width, 3), dtype=np.int16)
+        self.within = np.empty((sampled_height, sampled_width, 3), dtype=bool)
+        self.hits = np.empty((sampled_height, sampled_width), dtype=bool)
+
+    def matches(self, frame):
+        """Return True if the probe region of frame matches the reference colour"""
+        patch = frame[self.rows, self.cols, :3]
+        if patch.shape != self.diff.shape:
+            # Region falls outside this frame
+            return False
+        np.subtract(patch, self.color, out=self.diff)
+        np.abs(self.diff, out=self.diff)
+        np.less_equal(self.diff, self.tolerance, out=self.within)
+        np.logical_and.reduce(self.within, axis=2, out=self.hits)
+        return np.count_nonzero(self.hits) >= self.min_pixels
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a probe from its JSON description"""
+        return cls(config["region"], config["color"], config.get("tolerance", 20),
+                   config.get("min_fraction", 0.8), config.get("step", 1))
+
+
+class GameStateDetector:
+    """Detect game states such as "loading" or "enemies_present" from screen frames"""
+
+    def __init__(self, frame_source, states=None, budget_ms=2.0, base_folder=""):
+        self.frame_source = frame_source
+        self.states = {}  # state name -> (mode, checks), each check has matches(frame)
+        self.budget = budget_ms / 1000
+
+        # Last poll results and analysis timing
+        self.current_states = frozenset()
+        self.last_poll_time = None
+        self.frames_analyzed = 0
+        self.frames_over_budget = 0
+        self.last_analysis_time = 0.0
+        self.max_analysis_time = 0.0
+
+        for name, state in (states or {}).items():
+            # Pixel probes and template matches can be mixed in one state
+            checks = [PixelProbe.from_config(probe) for probe in state.get("probes", [])]
+            checks += [TemplateMatcher.from_config(template, base_folder)
+                       for template in state.get("templates", [])]
+            self.add_state(name, checks, state.get("mode", "all"))
+
+    def add_state(self, name, checks, mode="all"):
+        """Add a state that is present when all (or any) of its probes or templates match"""
+        if mode not in ("all", "any"):
+            raise ValueError(f"Unknown probe mode for {name}: {mode}")
+        if not checks:
+            raise ValueError(f"State {name} has no probes or templates")
+        self.states[name] = (mode, checks)
+
+    def has_state(self, name):
+        """Check whether the detector knows how to detect a state"""
+        return name in self.states
+
+    def detect(self, frame):
+        """Return the set of states present in a frame"""
+        start = time.perf_counter()
+        present = set()
+        for name, (mode, checks) in self.states.items():
+            if mode == "all":
+                if all(check.matches(frame) for check in checks):
+                    present.add(name)
+            elif any(check.matches(frame) for check in checks):
+                present.add(name)
+
+        # Keep track of the per-frame CPU budget
+        elapsed = time.perf_counter() - start
+        self.frames_analyzed += 1
+        self.last_analysis_time = elapsed
+        self.max_analysis_time = max(self.max_analysis_time, elapsed)
+        if elapsed > self.budget:
+            self.frames_over_budget += 1
+        return present
+
+    def poll(self):
+        """Grab a frame and detect its states, keeping the last result when no frame arrives"""
+        frame = self.frame_source.grab()
+        if frame is not None:
+            self.current_states = frozenset(self.detect(frame))
+            self.last_poll_time = time.monotonic()
+        return self.current_states
+
+    def is_present(self, name):
+        """Poll a frame and check whether a state is present"""
+        return name in self.poll()
+
+    def wait_for(self, name, timeout, present=True, interval=0.05, sleep=time.sleep):
+        """Poll until a state appears (or disappears), returning False on timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            if (name in self.poll()) == present:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            sleep(min(interval, remaining))
+
+    def stats(self):
+        """Return analysis timing statistics"""
+        return {
+            "frames": self.frames_analyzed,
+            "over_budget": self.frames_over_budget,
+            "last_ms": self.last_analysis_time * 1000,
+            "max_ms": self.max_analysis_time * 1000
+        }
+
+    def close(self):
+        """Release the frame source"""
+        self.frame_source.close()
+
+
+def load_detector(config_path, frame_source=None):
+    """Build a detector from a JSON probe file, capturing the screen if no source is given"""
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+    if frame_source is None:
+        frame_source = ScreenFrameSource(config.get("capture_region"))
+    return GameStateDetector(frame_source, config.get("states"), config.get("budget_ms", 2.0),
+                             os.path.dirname(os.path.abspath(config_path)))
+
+
+# If this script is run directly, run a probe file over a folder of PNG frames
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python GameStateDetector.py <probes.json> <frames folder>")
+        sys.exit(1)
+
+    source = DirectoryFrameSource(sys.argv[2], loop=False)
+    detector = load_detector(sys.argv[1], source)
+    for path in source.paths:
+        states = detector.poll()
+        print(f"{os.path.basename(path)}: {', '.join(sorted(states)) or '-'} "
+              f"({detector.last_analysis_time * 1000:.3f} ms)")
+    stats = detector.stats()
+    print(f"{stats['frames']} frames, max {stats['max_ms']:.3f} ms, {stats['over_budget']} over budget")
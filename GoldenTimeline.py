@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import argparse
+
+import RoutineFactory
+from AsyncLogger import AsyncLogger
+from RoutineClock import SimClock
+from SoakTest import FakeInput
+
+GOLDEN_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+# Fixed start for the simulated clock (2026-01-01 00:00:00 UTC) so the minute countdown is the same every run
+SIM_START = 1767225600.0
+
+# Allowed timing drift per phase in milliseconds, written into new golden files and editable there
+DEFAULT_TOLERANCES = {
+    "default": 1,
+    "wait": 5,  # Polls once a second until the respawn time has passed
+    "load": 5
+}
+
+
+class TimelineInput(FakeInput):
+    """Fake input backend that records every key press and release with the simulated time and phase"""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+        self.routine = None
+        self.events = []
+
+    def record(self, action, key=None):
+        self.events.append({
+            "t": round(self.clock.perf_counter() * 1000, 3),
+            "action": action,
+            "key": key,
+            "phase": self.routine.phase if self.routine is not None else None
+        })
+
+    def press(self, key):
+        super().press(key)
+        self.record("press", key)
+
+    def release(self, key):
+        super().release(key)
+        self.record("release", key)
+
+
+def record_timeline(routine_name, cycles, seed, logger, overrides=None):
+    """Run a routine for some cycles under a simulated clock and return its action timeline"""
+    config = RoutineFactory.default_config(routine_name)
+    config.update({
+        "seed": seed,
+        "watchdog": 0,  # No game process to watch
+        "adaptive_load_screen": 0,
+        "checkpoint": 0,
+        "trace": 0
+    })
+    config.update(overrides or {})
+    clock = SimClock(SIM_START)
+    timeline_input = TimelineInput(clock)
+    routine = RoutineFactory.create_routine(routine_name, config, logger=logger, clock=clock,
+                                            input_backend=timeline_input)
+    timeline_input.routine = routine
+    routine.process_exists = lambda process_name: True
+    routine.max_cycles = cycles
+
+    # Mark the end of each cycle in the timeline
+    finish_cycle = routine.finish_cycle
+
+    def finish_and_mark(cycle_start):
+        finish_cycle(cycle_start)
+        timeline_input.record("cycle_end")
+
+    routine.finish_cycle = finish_and_mark
+    routine.start_automation()
+
+    return {"routine": routine_name, "seed": seed, "cycles": cycles, "events": timeline_input.events}
+
+
+def cycle_durations(events):
+    """Duration of each cycle in milliseconds, from the first key press to each cycle end"""
+    durations = []
+    start = events[0]["t"] if events else 0.0
+    for event in events:
+        if event["action"] == "cycle_end":
+            durations.append(round(event["t"] - start, 3))
+            start = event["t"]
+    return durations
+
+
+def relative_times(events):
+    """Event times relative to the start of their cycle, so one drifting step does not fail every later event"""
+    times = []
+    start = events[0]["t"] if events else 0.0
+    for event in events:
+        times.append(event["t"] - start)
+        if event["action"] == "cycle_end":
+            start = event["t"]
+    return times
+
+
+def compare(golden, current, max_report=20):
+    """Return (ok, report lines) for a recorded timeline against its golden one"""
+    tolerances = golden.get("tolerances", DEFAULT_TOLERANCES)
+    expected, actual = golden["events"], current["events"]
+    lines = []
+    mismatches = 0
+
+    expected_times, actual_times = relative_times(expected), relative_times(actual)
+    for index in range(max(len(expected), len(actual))):
+        if index >= len(expected) or index >= len(actual):
+            extra = actual[index] if index < len(actual) else expected[index]
+            which = "unexpected" if index < len(actual) else "missing"
+            lines.append(f"  #{index}: {which} {extra['action']} {extra['key'] or ''} in {extra['phase']}")
+            mismatches += 1
+        else:
+            want, got = expected[index], actual[index]
+            if (want["action"], want["key"], want["phase"]) != (got["action"], got["key"], got["phase"]):
+                lines.append(f"  #{index}: expected {want['action']} {want['key'] or ''} in {want['phase']}, "
+                             f"got {got['action']} {got['key'] or ''} in {got['phase']}")
+                mismatches += 1
+            else:
+                drift = actual_times[index] - expected_times[index]
+                tolerance = tolerances.get(want["phase"], tolerances["default"])
+                if abs(drift) > tolerance:
+                    lines.append(f"  #{index}: {want['action']} {want['key'] or ''} in {want['phase']} "
+                                 f"at {actual_times[index]:.1f} ms into the cycle, expected {expected_times[index]:.1f} "
+                                 f"({drift:+.1f} ms, tolerance {tolerance} ms)")
+                    mismatches += 1
+        if mismatches >= max_report:
+            lines.append("  ... (further differences not shown)")
+            break
+
+    expected_cycles, actual_cycles = cycle_durations(expected), cycle_durations(actual)
+    lines.append("  Cycle durations (golden -> current):")
+    for index in range(max(len(expected_cycles), len(actual_cycles))):
+        want = expected_cycles[index] if index < len(expected_cycles) else None
+        got = actual_cycles[index] if index < len(actual_cycles) else None
+        if want is None or got is None:
+            lines.append(f"    cycle {index + 1}: {want} -> {got}")
+        else:
+            lines.append(f"    cycle {index + 1}: {want / 1000:.3f}s -> {got / 1000:.3f}s ({got - want:+.1f} ms)")
+
+    return mismatches == 0, lines
+
+
+def golden_path(routine_name):
+    """Stored golden timeline of a routine"""
+    return os.path.join(GOLDEN_FOLDER, f"{routine_name}.json")
+
+
+def write_golden(path, timeline):
+    """Write a golden timeline with one event per line, so changes read well in a diff"""
+    os.makedirs(GOLDEN_FOLDER, exist_ok=True)
+    header = {key: value for key, value in timeline.items() if key != "events"}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header)[:-1] + ', "events": [\n')
+        f.write(",\n".join(json.dumps(event) for event in timeline["events"]))
+        f.write("\n]}\n")
+
+
+# If this script is run directly, check every routine against its golden timeline
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the routines' action timelines with the stored golden ones")
+    parser.add_argument("--routines", nargs="+", default=list(RoutineFactory.ROUTINES),
+                        choices=list(RoutineFactory.ROUTINES), help="Routines to check")
+    parser.add_argument("--cycles", type=int, default=3, help="Cycles to record for new golden files")
+    parser.add_argument("--seed", type=int, default=1, help="Run seed for new golden files")
+    parser.add_argument("--update", action="store_true", help="Record new golden timelines instead of comparing")
+    args = parser.parse_args()
+
+    logger = AsyncLogger(log_file=None, console=False).start()
+    failed = False
+    try:
+        for name in args.routines:
+            path = golden_path(name)
+            if args.update or not os.path.exists(path):
+                timeline = record_timeline(name, args.cycles, args.seed, logger)
+                previous = None
+                if os.path.exists(path):
+                    with open(path, encoding="utf-8") as f:
+                        previous = json.load(f)
+                timeline["tolerances"] = previous.get("tolerances", DEFAULT_TOLERANCES) if previous else DEFAULT_TOLERANCES
+                write_golden(path, timeline)
+                print(f"{name}: recorded {len(timeline['events'])} events over {args.cycles} cycles to {path}")
+                continue
+
+            with open(path, encoding="utf-8") as f:
+                golden = json.load(f)
+            current = record_timeline(name, golden["cycles"], golden["seed"], logger)
+            ok, lines = compare(golden, current)
+            failed = failed or not ok
+            print(f"{name}: {len(current['events'])} events over {golden['cycles']} cycles - {'PASS' if ok else 'FAIL'}")
+            for line in lines:
+                print(line)
+    finally:
+        logger.stop()
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,110 @@
+import sys
+import time
+
+# Before anything else is imported, so the startup report covers the routine imports
+_import_start = time.perf_counter()
+
+import argparse
+import threading
+import psutil
+
+import RoutineFactory
+from AsyncLogger import AsyncLogger, DEFAULT_LOG_FILE
+
+
+def memory_mb():
+    """Resident set size of this process in MB"""
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def build_routine(args, logger):
+    """Load the routine's config and create it, with screen detection when a probe file is given"""
+    config = RoutineFactory.load_config(args.routine, args.config_folder, profile=args.profile)
+    if args.seed is not None:
+        config["seed"] = args.seed
+
+    kwargs = {"logger": logger}
+    if args.detector and RoutineFactory.routine_info(args.routine).get("detector"):
+        # Imported here so NumPy is only loaded when detection is used
+        from GameStateDetector import load_detector
+        kwargs["detector"] = load_detector(args.detector)
+
+    routine = RoutineFactory.create_routine(args.routine, config, **kwargs)
+    routine.max_cycles = args.cycles
+    return routine
+
+
+def run_routine(routine, duration, sample_at=None):
+    """Run a routine on a worker thread until it finishes, the duration passes or Ctrl+C
+
+    With sample_at, the routine's stack sampler starts that many seconds into the run.
+    """
+    def target():
+        try:
+            routine.start_automation()
+        except SystemExit:
+            # exit_script() ends the routine's thread with SystemExit
+            pass
+
+    thread = threading.Thread(target=target, name="HeadlessRoutine", daemon=True)
+    thread.start()
+
+    started = time.monotonic()
+    deadline = started + duration if duration else None
+    try:
+        # Join in short slices so Ctrl+C reaches the main thread
+        while thread.is_alive():
+            if deadline is not None and time.monotonic() >= deadline:
+                routine.abort("duration reached")
+                break
+            if sample_at is not None and time.monotonic() - started >= sample_at:
+                if hasattr(routine, "toggle_sampler"):
+                    routine.toggle_sampler()
+                sample_at = None
+            thread.join(0.1 if sample_at is not None else 0.5)
+    except KeyboardInterrupt:
+        routine.abort("stopped")
+
+    thread.join(5)
+    sampler = getattr(routine, "sampler", None)
+    if sampler is not None and sampler.thread is not None:
+        # Let the sampler write its file before the logger stops
+        sampler.thread.join(2)
+
+
+# If this script is run directly, run a routine from the console without the Qt GUI
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a WestTek routine without the GUI")
+    parser.add_argument("routine", choices=list(RoutineFactory.available_routines()), help="Routine to run")
+    parser.add_argument("--profile", help="Stored settings profile (default: the GUI's saved settings)")
+    parser.add_argument("--duration", type=float, default=0, help="Stop after this many seconds (0 for no limit)")
+    parser.add_argument("--cycles", type=int, default=0, help="Stop after this many cycles (0 for no limit)")
+    parser.add_argument("--telemetry", default=DEFAULT_LOG_FILE, help="JSON-lines log file (empty to disable)")
+    parser.add_argument("--seed", type=int, help="Run seed for the random timings")
+    parser.add_argument("--detector", help="Screen probe file for the primary and timed run routines")
+    parser.add_argument("--config-folder", default=RoutineFactory.CONFIG_FOLDER, help="Folder of saved settings")
+    parser.add_argument("--sample-at", type=float, help="Sample the automation thread's stack this many seconds in")
+    parser.add_argument("--quiet", action="store_true", help="Only write telemetry, no console log")
+    args = parser.parse_args()
+
+    logger = AsyncLogger(log_file=args.telemetry or None, console=not args.quiet).start()
+
+    try:
+        routine = build_routine(args, logger)
+    except (ValueError, OSError) as e:
+        logger.stop()
+        print(f"Could not start {args.routine}: {e}")
+        sys.exit(1)
+
+    # Startup covers the interpreter boot (from the process start) and our own imports and setup
+    process_start = psutil.Process().create_time()
+    logger.info("Startup {startup:.0f} ms ({imports:.0f} ms imports and setup), RSS {rss:.1f} MB, Qt loaded: {qt}",
+                startup=(time.time() - process_start) * 1000,
+                imports=(time.perf_counter() - _import_start) * 1000,
+                rss=memory_mb(), qt="PyQt5" in sys.modules)
+
+    run_routine(routine, args.duration, args.sample_at)
+
+    logger.info("Finished {cycles} cycles in {seconds:.0f}s of cycle time, RSS {rss:.1f} MB",
+                cycles=routine.cycles_completed, seconds=routine.cycle_seconds, rss=memory_mb())
+    logger.stop()
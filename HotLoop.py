@@ -0,0 +1,62 @@
+import gc
+from itertools import islice
+
+
+class HotLoop:
+    """Preallocated buffers for a routine's timing-critical bursts, and control of the cyclic GC around them
+
+    A burst's timings are drawn into reused lists before it starts and its loop
+    walks a preallocated list of index objects, so the presses and sleeps
+    themselves allocate nothing. The cyclic GC is frozen over everything built
+    during setup, kept off through the bursts and only run in the idle respawn
+    wait, so a collection never lands inside a key hold.
+    """
+
+    def __init__(self):
+        self.buffers = {}  # name -> list of seconds, grown when a burst gets longer
+        self.index = []  # Preallocated int objects for the loops (only -5..256 are cached by Python)
+        self.gc_was_enabled = True
+
+    def start(self):
+        """Collect once and freeze everything allocated during setup out of later collections"""
+        self.gc_was_enabled = gc.isenabled()
+        gc.collect()
+        gc.freeze()
+        return self
+
+    def stop(self):
+        """Hand the cyclic GC back as it was before the run"""
+        gc.unfreeze()
+        if self.gc_was_enabled:
+            gc.enable()
+
+    def burst(self):
+        """A timing-critical burst is starting: no cyclic collections until the next idle window"""
+        gc.disable()
+
+    def idle(self):
+        """The routine is waiting with nothing to time: collect what the cycle left behind and re-enable the GC"""
+        if self.gc_was_enabled:
+            gc.enable()
+            gc.collect(1)
+
+    def buffer(self, name, size):
+        """Reused list of at least size entries"""
+        buffer = self.buffers.get(name)
+        if buffer is None or len(buffer) < size:
+            buffer = self.buffers[name] = [0.0] * size
+        return buffer
+
+    def draw(self, name, stream, low, high, count):
+        """Fill a buffer with count RngStream.randint(low, high) draws, in seconds"""
+        buffer = self.buffer(name, count)
+        randint = stream.randint
+        for index in range(count):
+            buffer[index] = randint(low, high) / 1000
+        return buffer
+
+    def indices(self, count):
+        """Iterator over 0..count-1 that creates no int objects"""
+        if len(self.index) < count:
+            self.index = list(range(count))
+        return islice(self.index, count)
@@ -0,0 +1,126 @@
+import gc
+import sys
+import json
+import tracemalloc
+
+import RoutineFactory
+import GoldenTimeline
+from HotLoop import HotLoop
+from AsyncLogger import AsyncLogger
+from RoutineClock import RoutineClock
+
+
+class ProbeInput:
+    """Input backend that records, at each press, the bytes allocated since the previous press
+
+    tracemalloc's peak is reset at the end of every press, so the peak above the
+    traced memory at the next press counts every block allocated in between, even
+    ones already freed again. The probe's own allocations happen before the reset.
+    """
+
+    def __init__(self, size):
+        self.growth = [0] * size
+        self.size = size
+        self.count = 0
+
+    def press(self, key):
+        # Read first: even len() can allocate an int
+        current, peak = tracemalloc.get_traced_memory()
+        if self.count < self.size:
+            self.growth[self.count] = peak - current
+            self.count += 1
+        current = peak = None
+        tracemalloc.reset_peak()
+
+    def release(self, key):
+        pass
+
+
+class NullClock(RoutineClock):
+    """Clock whose sleeps return at once"""
+
+    def sleep(self, seconds):
+        pass
+
+    def burst_sleep(self, seconds):
+        pass
+
+
+# Step method of each burst and the config key of its length
+BURSTS = {
+    "shot": ("shoot", "shots"),
+    "walk": ("walk", "walk_cycles"),
+    "action press": ("press_action", "action_cycles")
+}
+
+
+def press_allocations(routine_name, burst, logger, hot, count=200):
+    """Bytes allocated between consecutive key presses of one burst, the setup before the first press left out"""
+    step, length_key = BURSTS[burst]
+    config = RoutineFactory.default_config(routine_name)
+    config.update({"hot_loop": int(hot), "seed": 1, length_key: count})
+    probe = ProbeInput(count * 2 + 1)
+    routine = RoutineFactory.create_routine(routine_name, config, logger=logger, clock=NullClock(),
+                                            input_backend=probe)
+    if hot:
+        routine.hot_loop = HotLoop()
+    run = getattr(routine, step)
+    # Warm up so buffers, streams and caches exist before tracing
+    run()
+
+    probe.count = 0
+    tracemalloc.start()
+    try:
+        run()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+    return probe.growth[1:probe.count]
+
+
+def check_allocations(routine_name, logger):
+    """Return (ok, report lines) for the allocations between key presses of each hot burst of a routine"""
+    ok = True
+    lines = []
+    for burst, (step, length_key) in BURSTS.items():
+        if length_key not in RoutineFactory.default_config(routine_name):
+            continue
+        hot = press_allocations(routine_name, burst, logger, hot=True)
+        plain = press_allocations(routine_name, burst, logger, hot=False)
+        allocating = sum(1 for growth in hot if growth)
+        clean = allocating == 0
+        ok = ok and clean
+        lines.append(f"  {burst}: hot loop allocates in {allocating} of {len(hot)} intervals between presses "
+                     f"(plain loop {sum(1 for growth in plain if growth)}, up to {max(plain, default=0)} bytes) - "
+                     f"{'PASS' if clean else 'FAIL'}")
+    return ok, lines
+
+
+def check_timeline(routine_name, logger):
+    """Return (ok, report lines) comparing the hot loop's action timeline with the routine's golden one"""
+    path = GoldenTimeline.golden_path(routine_name)
+    with open(path, encoding="utf-8") as f:
+        golden = json.load(f)
+    current = GoldenTimeline.record_timeline(routine_name, golden["cycles"], golden["seed"], logger,
+                                             overrides={"hot_loop": 1})
+    ok, lines = GoldenTimeline.compare(golden, current)
+    return ok, ([] if ok else lines)
+
+
+# If this script is run directly, check that the hot loop bursts allocate nothing and keep the golden timelines
+if __name__ == "__main__":
+    logger = AsyncLogger(log_file=None, console=False).start()
+    failed = False
+    try:
+        for name in RoutineFactory.ROUTINES:
+            allocations_ok, allocation_lines = check_allocations(name, logger)
+            timeline_ok, timeline_lines = check_timeline(name, logger)
+            failed = failed or not (allocations_ok and timeline_ok)
+            print(f"{name}: allocations {'PASS' if allocations_ok else 'FAIL'}, "
+                  f"golden timeline {'PASS' if timeline_ok else 'FAIL'}")
+            for line in allocation_lines + timeline_lines:
+                print(line)
+    finally:
+        logger.stop()
+
+    sys.exit(1 if failed else 0)
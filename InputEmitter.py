@@ -0,0 +1,257 @@
+import sys
+import time
+import datetime
+import threading
+from collections import deque
+
+import psutil
+
+
+def raise_thread_priority(nice=-10, cpu=-1):
+    """Raise the calling thread's scheduling priority and optionally pin it to a CPU
+
+    Linux schedules threads individually, so psutil's nice and cpu_affinity on
+    the thread id only touch this thread. Windows gets the thread-level calls
+    from kernel32 instead. Returns a list of what could not be applied.
+    """
+    problems = []
+    if sys.platform == "win32":
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetCurrentThread()
+        if nice < 0 and not kernel32.SetThreadPriority(handle, 2):  # THREAD_PRIORITY_HIGHEST
+            problems.append("thread priority")
+        if cpu >= 0 and not kernel32.SetThreadAffinityMask(handle, 1 << cpu):
+            problems.append(f"affinity to CPU {cpu}")
+        return problems
+
+    try:
+        thread = psutil.Process(threading.get_native_id())
+    except psutil.Error:
+        return ["thread lookup"]
+    try:
+        thread.nice(nice)
+    except (psutil.Error, OSError, AttributeError):
+        # Raising priority (a negative nice) needs CAP_SYS_NICE on Linux
+        problems.append(f"nice {nice}")
+    if cpu >= 0:
+        try:
+            thread.cpu_affinity([cpu])
+        except (psutil.Error, OSError, ValueError, AttributeError):
+            problems.append(f"affinity to CPU {cpu}")
+    return problems
+
+
+class EmitterClock:
+    """Routine clock on the emitter's timeline, running up to the lookahead ahead of real time
+
+    Sleeps advance a cursor instead of sleeping, and only sleep for real once the
+    cursor is more than the lookahead ahead. Reads return the cursor, so the
+    routine's own timing stays consistent, and key presses are stamped with it.
+    Aborts, checks and resets go to the real clock.
+    """
+
+    def __init__(self, clock, lookahead=0.02):
+        self.clock = clock
+        self.lookahead = lookahead
+        self.cursor = clock.monotonic()
+
+    def sync(self):
+        """Move the cursor up to real time, dropping any time the routine logic fell behind"""
+        now = self.clock.monotonic()
+        if self.cursor < now:
+            self.cursor = now
+        return self.cursor
+
+    def ahead(self):
+        return max(0.0, self.cursor - self.clock.monotonic())
+
+    def sleep(self, seconds):
+        self.sync()
+        self.cursor += seconds
+        excess = self.cursor - self.clock.monotonic() - self.lookahead
+        if excess > 0:
+            self.clock.sleep(excess)
+        else:
+            self.clock.check()
+
+    def burst_sleep(self, seconds):
+        # Bursts stay on the timeline too
+        self.sleep(seconds)
+
+    def time(self):
+        return self.clock.time() + self.ahead()
+
+    def monotonic(self):
+        return self.clock.monotonic() + self.ahead()
+
+    def perf_counter(self):
+        return self.clock.perf_counter() + self.ahead()
+
+    def now(self):
+        return self.clock.now() + datetime.timedelta(seconds=self.ahead())
+
+    def reset(self):
+        self.clock.reset()
+        self.cursor = self.clock.monotonic()
+
+    def __getattr__(self, name):
+        # abort, check and aborted act on the real clock
+        return getattr(self.clock, name)
+
+
+class InputEmitter:
+    """Sends key presses and releases from a dedicated thread at their timeline times
+
+    The routine thread is the only producer and the emitter thread the only
+    consumer of a deque, whose append and popleft are atomic, so the hand-off
+    takes no lock. Each event carries its due time on the real monotonic clock;
+    the emitter sleeps until then, so jitter in the routine's own logic (config
+    lookups, RNG draws, logging, process scans) up to the lookahead does not
+    reach the game.
+    """
+
+    def __init__(self, backend, clock, lookahead=0.02, nice=-10, cpu=-1, logger=None):
+        self.backend = backend
+        self.clock = EmitterClock(clock, lookahead)  # The routine's clock while the emitter is used
+        self.nice = nice
+        self.cpu = cpu
+        self.logger = logger
+        self.queue = deque()
+        self.wake = threading.Event()
+        self.thread = None
+        self.problems = []
+        self.emitted = 0
+        self.late = 0.0  # Total seconds events went out after their due time
+        self.max_late = 0.0
+        self.error = None
+
+    def start(self):
+        """Start the emitter thread for a run"""
+        if self.thread is not None and self.thread.is_alive():
+            if self.queue and self.queue[-1] is None:
+                # A second consumer on the queue would break the hand-off
+                raise RuntimeError("Input emitter is still sending the previous run (backend blocked?)")
+            return self
+        self.clock.sync()
+        self.thread = threading.Thread(target=self.run, name="InputEmitter", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Send what is queued, then end the emitter thread"""
+        if self.thread is None:
+            return
+        if self.thread.is_alive() and not (self.queue and self.queue[-1] is None):
+            self.queue.append(None)
+        self.wake.set()
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            self.thread = None
+            self.queue.clear()
+        # Otherwise keep the reference, so start() cannot add a second consumer
+
+    def push(self, action, key):
+        self.queue.append((self.clock.sync(), action, key))
+        self.wake.set()
+
+    def press(self, key):
+        self.push("press", key)
+
+    def release(self, key):
+        self.push("release", key)
+
+    def run(self):
+        """Emitter thread: send each queued event at its due time"""
+        self.problems = raise_thread_priority(self.nice, self.cpu)
+        if self.problems and self.logger is not None:
+            self.logger.warning("Input emitter runs without {problems}", problems=", ".join(self.problems))
+
+        monotonic = self.clock.clock.monotonic
+        queue = self.queue
+        while True:
+            self.wake.clear()
+            if not queue:
+                self.wake.wait()
+                continue
+            event = queue[0]
+            if event is None:
+                queue.popleft()
+                return
+            due, action, key = event
+            remaining = due - monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+            queue.popleft()
+            try:
+                if action == "press":
+                    self.backend.press(key)
+                else:
+                    self.backend.release(key)
+            except Exception as e:
+                # Keep sending the rest; the routine reports the first failure when it stops
+                if self.error is None:
+                    self.error = e
+            late = monotonic() - due
+            self.emitted += 1
+            if late > 0:
+                self.late += late
+                self.max_late = max(self.max_late, late)
+
+    def stats(self):
+        """Emission counters, lateness in milliseconds"""
+        return {
+            "emitted": self.emitted,
+            "queued": len(self.queue),
+            "mean_late": self.late / self.emitted * 1000 if self.emitted else 0.0,
+            "max_late": self.max_late * 1000
+        }
+
+    def __getattr__(self, name):
+        # Hotkeys and anything else go straight to the real backend
+        return getattr(self.backend, name)
+
+
+# If this script is run directly, compare press spacing sent inline and through the emitter under logic jitter
+if __name__ == "__main__":
+    import random
+    import statistics
+    from RoutineClock import RoutineClock
+
+    class StampInput:
+        """Backend that records when each press arrives"""
+
+        def __init__(self):
+            self.times = []
+
+        def press(self, key):
+            self.times.append(time.perf_counter())
+
+        def release(self, key):
+            pass
+
+    def burst(backend, clock, presses=200, gap=0.02, jitter=0.008):
+        rng = random.Random(1)
+        for _ in range(presses):
+            # Routine logic that takes a variable time, as scans and logging do
+            busy_until = time.perf_counter() + rng.uniform(0, jitter)
+            while time.perf_counter() < busy_until:
+                pass
+            backend.press("a")
+            clock.sleep(gap / 2)
+            backend.release("a")
+            clock.sleep(gap / 2)
+
+    for label in ("inline", "emitter"):
+        stamps = StampInput()
+        clock = RoutineClock()
+        if label == "inline":
+            burst(stamps, clock)
+        else:
+            emitter = InputEmitter(stamps, clock, lookahead=0.02).start()
+            burst(emitter, emitter.clock)
+            emitter.stop()
+        gaps = [(b - a) * 1000 for a, b in zip(stamps.times, stamps.times[1:])]
+        print(f"{label}: press spacing {statistics.mean(gaps):.2f} ms, std {statistics.pstdev(gaps):.2f} ms, "
+              f"range {min(gaps):.2f}-{max(gaps):.2f} ms")
@@ -0,0 +1,111 @@
+# Tokens short of a whole one by less than this count as whole, so clock rounding cannot keep a press waiting
+EPSILON = 1e-3
+
+
+class TokenBucket:
+    """Token bucket refilled lazily from the time of each request"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate  # Tokens per second
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = None
+
+    def refill(self, now):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now):
+        """Seconds until a token is available"""
+        self.refill(now)
+        return 0.0 if self.tokens >= 1 - EPSILON else (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self.refill(now)
+        self.tokens -= 1
+
+
+def parse_key_rates(text):
+    """ "left mouse=12, e=8:2" into {key: (presses per second, burst)}"""
+    rates = {}
+    for item in text.split(","):
+        if not item.strip():
+            continue
+        key, found, spec = item.partition("=")
+        if not found or not key.strip():
+            raise ValueError(f"Expected KEY=RATE[:BURST], got {item.strip()}")
+        rate, _, burst = spec.partition(":")
+        try:
+            rate, burst = float(rate), int(burst) if burst.strip() else 1
+        except ValueError:
+            raise ValueError(f"Expected KEY=RATE[:BURST], got {item.strip()}") from None
+        if rate <= 0:
+            raise ValueError(f"Rate of {key.strip()} must be positive")
+        rates[key.strip()] = (rate, burst)
+    return rates
+
+
+class PacedInput:
+    """Input backend wrapper that holds key presses back to stay under global and per-key rates
+
+    Only presses take tokens: a press that would overrun a bucket sleeps (on the
+    routine's clock, so aborts still interrupt it) just long enough for a token,
+    and the caller's own hold and release timing follows it unchanged. Releases
+    and hotkeys go straight to the backend.
+    """
+
+    def __init__(self, backend, clock, rate=0, burst=1, key_rates=None):
+        self.backend = backend
+        self.clock = clock
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.key_buckets = {key: TokenBucket(key_rate, key_burst)
+                            for key, (key_rate, key_burst) in (key_rates or {}).items()}
+        self.presses = 0
+        self.throttled = 0  # Presses that had to wait for a token
+        self.delay = 0.0  # Total seconds added
+        self.max_delay = 0.0
+
+    def press(self, key):
+        key_bucket = self.key_buckets.get(key)
+        now = self.clock.monotonic()
+        wait = self.wait_time(key_bucket, now)
+        if wait > 0:
+            self.throttled += 1
+            started = now
+            while wait > 0:
+                self.clock.sleep(wait)
+                now = self.clock.monotonic()
+                wait = self.wait_time(key_bucket, now)
+            added = now - started
+            self.delay += added
+            self.max_delay = max(self.max_delay, added)
+
+        if self.bucket is not None:
+            self.bucket.take(now)
+        if key_bucket is not None:
+            key_bucket.take(now)
+        self.presses += 1
+        self.backend.press(key)
+
+    def wait_time(self, key_bucket, now):
+        wait = self.bucket.delay(now) if self.bucket is not None else 0.0
+        if key_bucket is not None:
+            wait = max(wait, key_bucket.delay(now))
+        return wait
+
+    def release(self, key):
+        self.backend.release(key)
+
+    def stats(self):
+        """Pacing counters, delays in milliseconds"""
+        return {
+            "presses": self.presses,
+            "throttled": self.throttled,
+            "delay": self.delay * 1000,
+            "max_delay": self.max_delay * 1000
+        }
+
+    def __getattr__(self, name):
+        # Hotkeys and anything else go straight to the real backend
+        return getattr(self.backend, name)
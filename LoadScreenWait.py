@@ -0,0 +1,200 @@
+import sys
+import time
+import psutil
+
+
+class LoadSettleDetector:
+    """Detect the end of a loading burst from cumulative CPU and I/O counters
+
+    Samples are (timestamp in seconds, cumulative CPU seconds, cumulative I/O bytes),
+    exactly what psutil reports for a process, so recorded or synthetic traces can be
+    replayed through feed() offline.
+    """
+
+    def __init__(self, settle_time=1.0, busy_cpu=0.5, busy_io=5000000,
+                 quiet_ratio=0.5, io_floor=1000000, smoothing=0.5):
+        self.settle_time = settle_time  # Seconds the activity has to stay quiet
+        self.busy_cpu = busy_cpu  # CPU rate (cores) that counts as a loading burst
+        self.busy_io = busy_io  # I/O rate (bytes/s) that counts as a loading burst
+        self.quiet_ratio = quiet_ratio  # Fraction of the burst peak that counts as quiet
+        self.io_floor = io_floor  # I/O rate (bytes/s) that is always quiet
+        self.smoothing = smoothing  # EWMA weight of the newest rate sample
+        self.reset()
+
+    def reset(self):
+        """Forget all samples"""
+        self.last_sample = None
+        self.cpu_rate = None
+        self.io_rate = None
+        self.peak_cpu = 0.0
+        self.peak_io = 0.0
+        self.burst_seen = False
+        self.quiet_since = None
+        self.settled_at = None
+
+    def feed(self, timestamp, cpu_seconds, io_bytes):
+        """Add a counter sample, returning True once the load has settled"""
+        if self.settled_at is not None:
+            return True
+
+        last_sample = self.last_sample
+        self.last_sample = (timestamp, cpu_seconds, io_bytes)
+        if last_sample is None:
+            return False
+
+        elapsed = timestamp - last_sample[0]
+        if elapsed <= 0:
+            return False
+
+        # Smoothed rates so a single quiet sample inside the burst does not count
+        cpu_rate = max(0.0, cpu_seconds - last_sample[1]) / elapsed
+        io_rate = max(0.0, io_bytes - last_sample[2]) / elapsed
+        if self.cpu_rate is None:
+            self.cpu_rate = cpu_rate
+            self.io_rate = io_rate
+        else:
+            self.cpu_rate += self.smoothing * (cpu_rate - self.cpu_rate)
+            self.io_rate += self.smoothing * (io_rate - self.io_rate)
+
+        self.peak_cpu = max(self.peak_cpu, self.cpu_rate)
+        self.peak_io = max(self.peak_io, self.io_rate)
+        if self.cpu_rate >= self.busy_cpu or self.io_rate >= self.busy_io:
+            self.burst_seen = True
+
+        if not self.burst_seen:
+            return False
+
+        quiet = (self.cpu_rate <= self.peak_cpu * self.quiet_ratio
+                 and self.io_rate <= max(self.peak_io * self.quiet_ratio, self.io_floor))
+        if not quiet:
+            self.quiet_since = None
+            return False
+
+        if self.quiet_since is None:
+            self.quiet_since = timestamp
+        if timestamp - self.quiet_since >= self.settle_time:
+            self.settled_at = timestamp
+            return True
+        return False
+
+
+def replay_trace(detector, samples):
+    """Feed a trace through a detector, returning the settle timestamp or None"""
+    detector.reset()
+    for timestamp, cpu_seconds, io_bytes in samples:
+        if detector.feed(timestamp, cpu_seconds, io_bytes):
+            return detector.settled_at
+    return None
+
+
+def load_traces(path):
+    """Load the traces recorded by AdaptiveLoadWait, one list of samples per load"""
+    traces = []
+    samples = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):
+                # A comment line starts the next recorded load
+                if samples:
+                    traces.append(samples)
+                samples = []
+                continue
+            timestamp, cpu_seconds, io_bytes = line.split(",")
+            samples.append((float(timestamp), float(cpu_seconds), float(io_bytes)))
+    if samples:
+        traces.append(samples)
+    return traces
+
+
+def read_counters(process):
+    """Read cumulative CPU seconds and I/O bytes for a psutil process"""
+    cpu_times = process.cpu_times()
+    try:
+        io_counters = process.io_counters()
+        io_bytes = io_counters.read_bytes + io_counters.write_bytes
+    except (AttributeError, psutil.AccessDenied):
+        # Not every platform exposes per-process I/O counters
+        io_bytes = 0
+    return cpu_times.user + cpu_times.system, io_bytes
+
+
+class AdaptiveLoadWait:
+    """Wait for a loading screen by watching the game process settle"""
+
+    def __init__(self, process_name, sample_interval=0.25, settle_time=1.0, trace_file=None):
+        self.process_name = process_name
+        self.sample_interval = sample_interval
+        self.detector = LoadSettleDetector(settle_time=settle_time)
+        self.trace_file = trace_file  # Optional path to append sampled traces to
+        self.process = None
+
+    def find_process(self):
+        """Return a cached psutil handle to the game process"""
+        if self.process is not None and self.process.is_running():
+            return self.process
+
+        self.process = None
+        for proc in psutil.process_iter(['name']):
+            if proc.info['name'] == self.process_name:
+                self.process = proc
+                break
+        return self.process
+
+    def wait(self, min_time, max_time, sleep=time.sleep):
+        """Wait at least min_time and at most max_time seconds, returning the time waited"""
+        start = time.monotonic()
+        deadline = start + max_time
+        earliest = start + min_time
+        self.detector.reset()
+        samples = []
+
+        process = self.find_process()
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            if process is not None:
+                try:
+                    cpu_seconds, io_bytes = read_counters(process)
+                except psutil.Error:
+                    # Process went away, fall back to the plain timed wait
+                    process = None
+                else:
+                    samples.append((now - start, cpu_seconds, io_bytes))
+                    if self.detector.feed(now - start, cpu_seconds, io_bytes) and now >= earliest:
+                        break
+
+            # Sample on a fixed grid so the detector sees evenly spaced counters
+            next_sample = start + (int((now - start) / self.sample_interval) + 1) * self.sample_interval
+            sleep(max(0.0, min(next_sample, deadline) - time.monotonic()))
+
+        if self.trace_file and samples:
+            self.save_trace(samples)
+        return time.monotonic() - start
+
+    def save_trace(self, samples):
+        """Append a sampled trace to the trace file, separated by a comment line"""
+        with open(self.trace_file, 'a') as f:
+            f.write(f"# load {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            for timestamp, cpu_seconds, io_bytes in samples:
+                f.write(f"{timestamp:.3f},{cpu_seconds:.3f},{io_bytes:.0f}\n")
+
+
+# If this script is run directly, replay a recorded trace through the detector
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python LoadScreenWait.py <trace.csv> [settle_time_seconds]")
+        sys.exit(1)
+
+    settle_time = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    detector = LoadSettleDetector(settle_time=settle_time)
+    for index, trace in enumerate(load_traces(sys.argv[1])):
+        settled_at = replay_trace(detector, trace)
+        if settled_at is None:
+            print(f"Load {index + 1}: never settled in {trace[-1][0]:.2f}s of samples")
+        else:
+            print(f"Load {index + 1}: settled at {settled_at:.2f}s of {trace[-1][0]:.2f}s")
@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import ThroughputPlanner
+from RoutineFactory import CONFIG_FOLDER
+
+CACHE_FILE = os.path.join(CONFIG_FOLDER, "sweep_cache.jsonl")
+
+# Shortest respawn time of the game, wait_time below it misses respawns
+DEFAULT_RESPAWN = 60000
+
+CONSTRAINT_OPERATORS = {
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    "==": lambda a, b: a == b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b
+}
+
+
+def model_version():
+    """Hash of the planner's source, so cached results are recomputed when the timing model changes"""
+    with open(ThroughputPlanner.__file__, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def config_hash(routine_name, config, cycles, seed, version):
+    """Cache key of one sweep point: the numeric config values the model reads and the simulation settings"""
+    numeric = {key: value for key, value in config.items() if isinstance(value, int)}
+    key = json.dumps([routine_name, numeric, cycles, seed, version], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def parse_range(text):
+    """KEY=START:STOP[:STEP] (inclusive) or KEY=V1,V2,... into (key, values)"""
+    key, _, spec = text.partition("=")
+    if not key or not spec:
+        raise ValueError(f"Expected KEY=START:STOP[:STEP] or KEY=V1,V2,..., got {text}")
+    if ":" in spec:
+        parts = [int(part) for part in spec.split(":")]
+        start, stop = parts[0], parts[1]
+        step = parts[2] if len(parts) > 2 else 1
+        if step <= 0:
+            raise ValueError(f"Step of {key} must be positive")
+        return key, list(range(start, stop + 1, step))
+    return key, [int(part) for part in spec.split(",")]
+
+
+def parse_constraint(text):
+    """KEY>=VALUE style constraint into (key, operator, value)"""
+    for operator in CONSTRAINT_OPERATORS:
+        key, found, value = text.partition(operator)
+        if found:
+            return key.strip(), operator, int(value)
+    raise ValueError(f"Expected KEY>=VALUE (or <=, ==, >, <), got {text}")
+
+
+def satisfies(config, constraints):
+    """Whether a config meets the constraints and has every min below its max"""
+    for key, operator, value in constraints:
+        if not CONSTRAINT_OPERATORS[operator](config[key], value):
+            return False
+    for key, value in config.items():
+        if key.endswith("_min") and isinstance(value, int) and value > config.get(key[:-4] + "_max", value):
+            return False
+        if key.endswith("_min_time") and isinstance(value, int) and value > config.get(key[:-9] + "_max_time", value):
+            return False
+    return True
+
+
+def evaluate_batch(routine_name, configs, cycles, seed):
+    """Worker: plan a batch of configs (one process pool task)"""
+    results = []
+    for config in configs:
+        result = ThroughputPlanner.plan(routine_name, config, cycles, seed)
+        results.append({key: result[key] for key in ("mean", "p5", "p95", "cycles_per_hour", "idle_share")})
+    return results
+
+
+class SweepCache:
+    """Append-only JSON-lines cache of planned sweep points by config hash"""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.results = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.results[entry["hash"]] = entry["result"]
+                    except (ValueError, KeyError):
+                        # Torn line from an interrupted sweep
+                        continue
+        return self
+
+    def add(self, entries):
+        """Store new (hash, result) pairs"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for point_hash, result in entries:
+                self.results[point_hash] = result
+                f.write(json.dumps({"hash": point_hash, "result": result}, separators=(",", ":")) + "\n")
+
+
+def sweep(routine_name, base_config, ranges, constraints, cycles=20000, seed=0, workers=None,
+          batch_size=32, cache=None):
+    """Plan every combination of the ranges that meets the constraints, returning points sorted by throughput
+
+    Each point is {"values": {key: value}, "result": planner summary, "cached": bool}.
+    """
+    keys = [key for key, _ in ranges]
+    unknown = [key for key in keys + [key for key, _, _ in constraints] if key not in base_config]
+    if unknown:
+        raise ValueError(f"Unknown config keys: {', '.join(unknown)}")
+
+    version = model_version()
+    points = []
+    for values in itertools.product(*(values for _, values in ranges)):
+        config = dict(base_config)
+        config.update(zip(keys, values))
+        if satisfies(config, constraints):
+            points.append({"values": dict(zip(keys, values)), "config": config,
+                           "hash": config_hash(routine_name, config, cycles, seed, version)})
+
+    results = cache.results if cache is not None else {}
+    todo = [point for point in points if point["hash"] not in results]
+    for point in points:
+        point["cached"] = point["hash"] in results
+
+    if todo:
+        batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+        new_entries = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(evaluate_batch, routine_name, [point["config"] for point in batch], cycles, seed)
+                       for batch in batches]
+            for batch, future in zip(batches, futures):
+                new_entries.extend(zip((point["hash"] for point in batch), future.result()))
+        if cache is not None:
+            cache.add(new_entries)
+        else:
+            results.update(new_entries)
+
+    for point in points:
+        point["result"] = results[point["hash"]]
+        del point["config"]
+    points.sort(key=lambda point: -point["result"]["cycles_per_hour"])
+    return points
+
+
+# If this script is run directly, sweep a routine's timing parameters and print the best configs
+if __name__ == "__main__":
+    import RoutineFactory
+
+    parser = argparse.ArgumentParser(description="Rank routine configs by simulated throughput")
+    parser.add_argument("routine", choices=list(ThroughputPlanner.MODELS), help="Routine to sweep")
+    parser.add_argument("ranges", nargs="+", metavar="KEY=START:STOP[:STEP]",
+                        help="Values to sweep, e.g. shots=5:20:5 shot_wait_min=50,100,150")
+    parser.add_argument("--constraint", action="append", default=[], metavar="KEY>=VALUE",
+                        help="Keep only configs meeting this (repeatable)")
+    parser.add_argument("--respawn", type=int, default=DEFAULT_RESPAWN,
+                        help="Respawn time in ms; wait_time below it is ruled out")
+    parser.add_argument("--profile", help="Stored settings profile to start from (default: the GUI's saved settings)")
+    parser.add_argument("--cycles", type=int, default=20000, help="Simulated cycles per config")
+    parser.add_argument("--seed", type=int, default=0, help="Simulation seed, the same for every config")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--top", type=int, default=10, help="Configs to print")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the result cache")
+    args = parser.parse_args()
+
+    try:
+        ranges = [parse_range(text) for text in args.ranges]
+        constraints = [parse_constraint(text) for text in args.constraint]
+    except ValueError as e:
+        parser.error(str(e))
+    base_config = RoutineFactory.load_config(args.routine, profile=args.profile)
+    if "wait_time" in base_config:
+        constraints.append(("wait_time", ">=", args.respawn))
+
+    cache = None if args.no_cache else SweepCache().load()
+    started = time.perf_counter()
+    try:
+        points = sweep(args.routine, base_config, ranges, constraints, args.cycles, args.seed,
+                       args.workers, cache=cache)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+
+    computed = sum(1 for point in points if not point["cached"])
+    print(f"{len(points)} configs meet the constraints, {computed} simulated and "
+          f"{len(points) - computed} from the cache in {elapsed:.1f}s")
+    for rank, point in enumerate(points[:args.top], 1):
+        result = point["result"]
+        values = ", ".join(f"{key}={value}" for key, value in point["values"].items())
+        print(f"{rank:3d}. {result['cycles_per_hour']:6.2f} cycles/hour, cycle {result['mean']:.2f}s "
+              f"(p95 {result['p95']:.2f}s), idle {result['idle_share'] * 100:.0f}%  {values}")
+    sys.exit(0 if points else 1)
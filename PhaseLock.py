@@ -0,0 +1,141 @@
+import math
+
+# Phase errors kept for the report, the oldest are dropped past this
+MAX_HISTORY = 10000
+
+
+class PhaseLock:
+    """Starts cycles on a fixed monotonic timeline: cycle k at T0 + k * period
+
+    Cycles that run back to back drift against the server's respawn timer by
+    whatever each cycle's steps add up to. Locked to the timeline, the slack
+    before each slot absorbs that, and a cycle that overruns its slot starts
+    late (counted as phase error) or, a whole period late, skips to the slot
+    it is in (counted as missed).
+    """
+
+    def __init__(self, period, clock):
+        self.period = period  # in seconds
+        self.clock = clock
+        self.anchor = None  # Monotonic start of slot 0
+        self.slot = 0
+        self.missed = 0
+        self.history = []  # (slot, phase error in seconds) per cycle
+
+    def lock(self, start):
+        """Anchor the timeline at a monotonic cycle start, e.g. the first cycle or a resumed one"""
+        self.anchor = start
+        self.slot = 0
+
+    def wait_for_slot(self):
+        """Sleep until the next cycle's slot and return its scheduled monotonic start"""
+        now = self.clock.monotonic()
+        if self.anchor is None:
+            self.lock(now)
+            self.record(0.0)
+            return now
+
+        self.slot += 1
+        target = self.anchor + self.slot * self.period
+        if now - target >= self.period:
+            # A whole period late, start in the slot we are in instead of chasing the timeline
+            slot = int(math.floor((now - self.anchor) / self.period))
+            self.missed += slot - self.slot
+            self.slot = slot
+            target = self.anchor + slot * self.period
+
+        remaining = target - now
+        if remaining > 0.1:
+            # Long sleeps may use a coarse timer, so stop short of the slot
+            self.clock.sleep(remaining - 0.05)
+            remaining = target - self.clock.monotonic()
+        if remaining > 0:
+            self.clock.sleep(remaining)
+        self.record(self.clock.monotonic() - target)
+        return target
+
+    def record(self, error):
+        self.history.append((self.slot, error))
+        if len(self.history) > MAX_HISTORY:
+            del self.history[:len(self.history) - MAX_HISTORY]
+
+    @property
+    def last_error(self):
+        """Phase error of the latest cycle start in seconds, or None before the first"""
+        return self.history[-1][1] if self.history else None
+
+    def summary(self):
+        """Phase error statistics in milliseconds over the kept history"""
+        errors = [error * 1000 for _, error in self.history]
+        if not errors:
+            return None
+        return {
+            "cycles": len(errors),
+            "missed": self.missed,
+            "mean": sum(errors) / len(errors),
+            "worst": max(errors, key=abs),
+            "last": errors[-1]
+        }
+
+
+def phase_drift(starts, period):
+    """Offset in ms of each cycle start from the first one's phase, wrapped to +-period/2"""
+    if not starts:
+        return []
+    drifts = []
+    for start in starts:
+        offset = (start - starts[0]) % period
+        if offset > period / 2:
+            offset -= period
+        drifts.append(offset * 1000)
+    return drifts
+
+
+# If this script is run directly, compare a routine's cycle phase drift with and without the phase lock
+if __name__ == "__main__":
+    import argparse
+    import RoutineFactory
+    from AsyncLogger import AsyncLogger
+    from RoutineClock import SimClock
+    from SoakTest import FakeInput
+
+    parser = argparse.ArgumentParser(description="Simulate a routine's cycle start drift against a fixed period")
+    parser.add_argument("routine", choices=list(RoutineFactory.ROUTINES), help="Routine to simulate")
+    parser.add_argument("--period", type=int, default=90000, help="Cycle period in ms")
+    parser.add_argument("--cycles", type=int, default=20, help="Cycles to simulate")
+    parser.add_argument("--seed", type=int, default=1, help="Run seed")
+    args = parser.parse_args()
+
+    logger = AsyncLogger(log_file=None, console=False).start()
+    try:
+        for period in (0, args.period):
+            config = RoutineFactory.default_config(args.routine)
+            config.update({"seed": args.seed, "watchdog": 0, "checkpoint": 0, "adaptive_load_screen": 0,
+                           "cycle_period": period})
+            clock = SimClock(1767225600.0)
+            routine = RoutineFactory.create_routine(args.routine, config, logger=logger, clock=clock,
+                                                    input_backend=FakeInput())
+            routine.process_exists = lambda process_name: True
+            routine.max_cycles = args.cycles
+
+            starts = []
+            checkpoint = routine.checkpoint
+
+            def checkpoint_and_mark(phase, checkpoint=checkpoint, routine=routine, starts=starts):
+                if phase == routine.cycle_steps[0][0]:
+                    starts.append(routine.clock.monotonic())
+                checkpoint(phase)
+
+            routine.checkpoint = checkpoint_and_mark
+            routine.start_automation()
+
+            drifts = phase_drift(starts, args.period / 1000)
+            label = f"locked to {period} ms" if period else "back to back"
+            print(f"{label}: drift after {len(drifts)} cycles {drifts[-1]:+.1f} ms, "
+                  f"worst {max(drifts, key=abs):+.1f} ms")
+            if routine.phase_lock is not None:
+                report = routine.phase_lock.summary()
+                print(f"  phase error mean {report['mean']:+.2f} ms, worst {report['worst']:+.2f} ms, "
+                      f"{report['missed']} missed slots")
+    finally:
+        logger.stop()
@@ -1,215 +1,235 @@
 import time
-import random
-import keyboard
-import datetime
 import sys
-import subprocess
-import psutil
+from LoadScreenWait import AdaptiveLoadWait
+from RoutineMixin import RoutineMixin
+from RoutineDefaults import PRIMARY_CONFIG
 
-class PrimaryWestTek:
-    def __init__(self, config=None):
-        # Default configuration
-        self.default_config = {
-            # Random timing values
-            "shot_min_time": 63,
-            "shot_max_time": 88,
-            "quick_min_time": 50,
-            "quick_max_time": 150,
-            "shot_wait_min": 100,
-            "shot_wait_max": 105,
-            "slow_min_time": 1000,
-            "slow_max_time": 1500,
-            "load_screen_min": 10000,
-            "load_screen_max": 12000,
-            "elevator_reset_min": 8000,
-            "elevator_reset_max": 12000,
-            
-            # Shooting config
-            "shots": 60,
-            "wait_time": 60000,  # 60 seconds in milliseconds
-            
-            # Keys
-            "shoot_key": "left mouse",
-            "right_key": "d",
-            "sprint_key": "left shift",
-            "crouch_key": "left ctrl",
-            "use_key": "e",
-            "opk_enable1": "numpad1",
-            "opk_enable2": "numpad2",
-            
-            # Hotkeys
-            "pause_hotkey": "f1",
-            "exit_hotkey": "f2",
-            "start_hotkey": "f3",
-            "reload_hotkey": "f4",
-            
-            # Process
-            "game_process": "Fallout76.exe"
-        }
-        
-        # Use provided config or default
-        self.config = config if config else self.default_config
-        self.running = False
-        self.paused = False
-        self.hotkeys_registered = False
-    
-    def display_tooltip(self, message=None):
-        """Display a message (equivalent to ToolTip in AHK)"""
-        if message:
-            print(f"\rCountdown: {message}", end="")
-        else:
-            print("\r" + " " * 20 + "\r", end="")  # Clear the line
+class PrimaryWestTek(RoutineMixin):
+    default_config = PRIMARY_CONFIG
     
-    def process_exists(self, process_name):
-        """Check if a process exists by name"""
-        for proc in psutil.process_iter(['name']):
-            if proc.info['name'] == process_name:
-                return True
-        return False
+    def __init__(self, config=None, logger=None, detector=None, clock=None, rng=None, input_backend=None):
+        RoutineMixin.__init__(self, config, logger, detector, clock, rng, input_backend)
+        self.load_waiter = None
+        
+        # Cycle steps in order, a checkpoint is journaled before each one
+        self.cycle_steps = [
+            ("shoot", self.shoot),
+            ("opk_off", self.toggle_opk),
+            ("run", self.run_right),
+            ("crouch", self.crouch),
+            ("wait", self.wait_for_respawn),
+            ("elevator", self.use_elevator),
+            ("opk_on", self.enable_opk),
+            ("load", self.wait_for_load_screen)
+        ]
     
     def pause_toggle(self):
         """Toggle pause state"""
         self.paused = not self.paused
         if self.paused:
-            print("Script paused. Press F1 to resume.")
+            self.logger.info("Script paused. Press F1 to resume.")
         else:
-            print("Script resumed.")
+            self.logger.info("Script resumed.")
     
     def exit_script(self):
         """Exit the script"""
-        print("Exiting script...")
-        self.running = False
+        self.logger.info("Exiting script...")
+        self.abort("exit")
         self.unregister_hotkeys()
         sys.exit()
     
     def reload_script(self):
         """Reload the script"""
-        print("Reloading script...")
+        self.logger.info("Reloading script...")
         self.unregister_hotkeys()
         # In Python, we'd typically restart the process
         # This is a simplified version
         python = sys.executable
         os.execl(python, python, *sys.argv)
     
-    def start_automation(self):
-        """Function for the main automation workflow"""
-        self.running = True
-        
-        # First loop - countdown until seconds = 01
-        while self.running and not self.paused:
-            # Get current time seconds
-            current_seconds = datetime.datetime.now().strftime("%S")
-            
-            if int(current_seconds) > 1:
-                countdown = 60 - int(current_seconds)
-            else:
-                countdown = 1
-                
-            self.display_tooltip(countdown)
-            
-            if current_seconds == "01":
-                self.display_tooltip()  # Clear tooltip
-                break
-            
-            time.sleep(0.1)  # Small delay to prevent high CPU usage
+    def automation_loop(self, resume=None):
+        """Countdown to the respawn minute (or resume a checkpoint), then run cycles until stopped"""
+        if resume is None:
+            self.wait_for_start()
+            start_phase, start_time = self.cycle_steps[0][0], None
+        else:
+            start_phase, start_time = resume
         
         # Main automation loop
         while self.running and not self.paused:
             # Check if game is running
             if not self.process_exists(self.config["game_process"]):
-                print(f"{self.config['game_process']} not running. Exiting script...")
+                self.logger.error("{process} not running. Exiting script...", process=self.config["game_process"])
                 self.exit_script()
                 return
             
-            # Get start time for timing
-            start_time = time.time()
-            
-            # Shooting loop
-            for _ in range(self.config["shots"]):
-                shot_time = random.randint(self.config["shot_min_time"], self.config["shot_max_time"]) / 1000
-                wait_time = random.randint(self.config["shot_wait_min"], self.config["shot_wait_max"]) / 1000
-                
-                keyboard.press(self.config["shoot_key"])
-                time.sleep(shot_time)
-                keyboard.release(self.config["shoot_key"])
-                time.sleep(wait_time)
-            
-            # Deactivate OPK
-            keyboard.press(self.config["opk_enable1"])
-            time.sleep(0.03)
-            keyboard.release(self.config["opk_enable1"])
-            time.sleep(1)
-            keyboard.press(self.config["opk_enable2"])
-            time.sleep(0.03)
-            keyboard.release(self.config["opk_enable2"])
-            time.sleep(1)
-            
-            # Run to the right, get in standing position
-            for _ in range(4):
-                keyboard.press(self.config["right_key"])
-                time.sleep(0.03)
-                keyboard.press(self.config["sprint_key"])
-                time.sleep(0.4)
-                keyboard.release(self.config["right_key"])
-                time.sleep(0.03)
-                keyboard.release(self.config["sprint_key"])
-            
-            # Crouch
-            time.sleep(0.03)
-            keyboard.press(self.config["crouch_key"])
-            time.sleep(0.03)
-            keyboard.release(self.config["crouch_key"])
-            time.sleep(0.1)
-            
-            # Wait until configured time has passed
-            while self.running and not self.paused:
-                elapsed_time = (time.time() - start_time) * 1000  # Convert to ms
-                if elapsed_time >= self.config["wait_time"]:
-                    break
-                time.sleep(1)
-            
-            # Press E to use elevator
-            keyboard.press(self.config["use_key"])
-            time.sleep(0.06)
-            keyboard.release(self.config["use_key"])
-            time.sleep(1)
-            
-            # Check if game is still running
-            if not self.process_exists(self.config["game_process"]):
-                print(f"{self.config['game_process']} not running. Exiting script...")
-                self.exit_script()
-                return
+            self.run_cycle(start_phase, start_time)
+            start_phase, start_time = self.cycle_steps[0][0], None
+        
+        if self.max_cycles and self.cycles_completed >= self.max_cycles:
+            self.checkpoint("stopped")
+    
+    def shoot(self):
+        """Shooting loop"""
+        if self.hot_loop is not None:
+            self.shoot_hot()
+            return
+        
+        for shot in range(self.config["shots"]):
+            # Stop shooting early once the screen shows no enemies left
+            if (shot and self.detector is not None
+                    and shot % self.config["detector_check_shots"] == 0
+                    and self.detector.has_state("enemies_present")
+                    and not self.detector.is_present("enemies_present")):
+                self.logger.debug("No enemies left after {shots} shots", shots=shot)
+                break
             
-            # Enable OPK
-            keyboard.press(self.config["opk_enable1"])
-            time.sleep(0.03)
-            keyboard.release(self.config["opk_enable1"])
-            time.sleep(1)
-            keyboard.press(self.config["opk_enable2"])
-            time.sleep(0.03)
-            keyboard.release(self.config["opk_enable2"])
-            time.sleep(1)
+            shot_time = self.rng.randint("shot_hold", self.config["shot_min_time"], self.config["shot_max_time"]) / 1000
+            wait_time = self.rng.randint("shot_gap", self.config["shot_wait_min"], self.config["shot_wait_max"]) / 1000
             
-            # Wait for loading screen
-            load_time = random.randint(self.config["load_screen_min"], self.config["load_screen_max"]) / 1000
-            time.sleep(load_time)
+            self.input.press(self.config["shoot_key"])
+            self.clock.sleep(shot_time)
+            self.input.release(self.config["shoot_key"])
+            self.clock.sleep(wait_time)
+    
+    def shoot_hot(self):
+        """Shooting loop with every shot's timing drawn up front, so the shots themselves allocate nothing"""
+        shots = self.config["shots"]
+        holds = self.hot_loop.draw("shot_hold", self.rng.stream("shot_hold"),
+                                   self.config["shot_min_time"], self.config["shot_max_time"], shots)
+        gaps = self.hot_loop.draw("shot_gap", self.rng.stream("shot_gap"),
+                                  self.config["shot_wait_min"], self.config["shot_wait_max"], shots)
+        
+        self.hot_loop.burst()
+        fired = self.fire_shots(holds, gaps, shots)
+        if fired < shots:
+            # Hand back the draws of the shots not fired, so the streams end where the plain loop leaves them
+            self.rng.stream("shot_hold").counter -= shots - fired
+            self.rng.stream("shot_gap").counter -= shots - fired
+            self.logger.debug("No enemies left after {shots} shots", shots=fired)
+    
+    def fire_shots(self, holds, gaps, shots):
+        """Timing-critical part of the hot shooting loop, returning the shots fired"""
+        key = self.config["shoot_key"]
+        press, release, sleep = self.input.press, self.input.release, self.clock.burst_sleep
+        detector = self.detector
+        if detector is not None and not detector.has_state("enemies_present"):
+            detector = None
+        check_shots = self.config["detector_check_shots"]
+        
+        for shot in self.hot_loop.indices(shots):
+            # Stop shooting early once the screen shows no enemies left
+            if shot and detector is not None and shot % check_shots == 0 and not detector.is_present("enemies_present"):
+                return shot
+            press(key)
+            sleep(holds[shot])
+            release(key)
+            sleep(gaps[shot])
+        return shots
+    
+    def toggle_opk(self):
+        """Toggle OPK with both hotkeys"""
+        self.input.press(self.config["opk_enable1"])
+        self.clock.sleep(0.03)
+        self.input.release(self.config["opk_enable1"])
+        self.clock.sleep(1)
+        self.input.press(self.config["opk_enable2"])
+        self.clock.sleep(0.03)
+        self.input.release(self.config["opk_enable2"])
+        self.clock.sleep(1)
+    
+    def run_right(self):
+        """Run to the right, get in standing position"""
+        for _ in range(4):
+            self.input.press(self.config["right_key"])
+            self.clock.sleep(0.03)
+            self.input.press(self.config["sprint_key"])
+            self.clock.sleep(0.4)
+            self.input.release(self.config["right_key"])
+            self.clock.sleep(0.03)
+            self.input.release(self.config["sprint_key"])
+    
+    def crouch(self):
+        """Crouch"""
+        self.clock.sleep(0.03)
+        self.input.press(self.config["crouch_key"])
+        self.clock.sleep(0.03)
+        self.input.release(self.config["crouch_key"])
+        self.clock.sleep(0.1)
+    
+    def use_elevator(self):
+        """Press E to use elevator"""
+        self.input.press(self.config["use_key"])
+        self.clock.sleep(0.06)
+        self.input.release(self.config["use_key"])
+        self.clock.sleep(1)
+    
+    def enable_opk(self):
+        """Check the game is still running, then enable OPK"""
+        if not self.process_exists(self.config["game_process"]):
+            self.logger.error("{process} not running. Exiting script...", process=self.config["game_process"])
+            self.exit_script()
+        self.toggle_opk()
+    
+    def wait_for_load_screen(self):
+        """Wait for the loading screen, ending early in adaptive mode once the game settles"""
+        if self.detector is not None and self.detector.has_state("loading"):
+            # Wait for the loading screen to show up, then for it to clear
+            start = self.clock.monotonic()
+            self.detector.wait_for("loading", self.config["load_screen_adaptive_min"] / 1000,
+                                   sleep=self.clock.sleep)
+            remaining = self.config["load_screen_max"] / 1000 - (self.clock.monotonic() - start)
+            self.detector.wait_for("loading", max(0.0, remaining), present=False, sleep=self.clock.sleep)
+            return
+        
+        if not self.config["adaptive_load_screen"]:
+            load_time = self.rng.randint("load_screen", self.config["load_screen_min"], self.config["load_screen_max"]) / 1000
+            self.clock.sleep(load_time)
+            return
+        
+        if self.load_waiter is None:
+            self.load_waiter = AdaptiveLoadWait(
+                self.config["game_process"],
+                sample_interval=self.config["load_sample_interval"] / 1000,
+                settle_time=self.config["load_settle_time"] / 1000
+            )
+        
+        # The configured max stays a hard cap
+        waited = self.load_waiter.wait(
+            self.config["load_screen_adaptive_min"] / 1000,
+            self.config["load_screen_max"] / 1000,
+            sleep=self.clock.sleep
+        )
+        self.logger.debug("Load screen wait {waited:.2f}s", waited=waited)
+    
+    def release_keys(self):
+        """Release every key a cycle may be holding down"""
+        try:
+            for key in ("shoot_key", "right_key", "sprint_key", "crouch_key", "use_key"):
+                self.input.release(self.config[key])
+        except Exception as e:
+            self.logger.error("Error releasing keys: {error}", error=e)
     
     def register_hotkeys(self):
         """Register hotkeys for controlling the script"""
         if not self.hotkeys_registered:
-            keyboard.add_hotkey(self.config["pause_hotkey"], self.pause_toggle)
-            keyboard.add_hotkey(self.config["exit_hotkey"], self.exit_script)
-            keyboard.add_hotkey(self.config["start_hotkey"], self.start_automation)
-            keyboard.add_hotkey(self.config["reload_hotkey"], self.reload_script)
+            self.input.add_hotkey(self.config["pause_hotkey"], self.pause_toggle)
+            self.input.add_hotkey(self.config["exit_hotkey"], self.exit_script)
+            self.input.add_hotkey(self.config["start_hotkey"], self.start_automation)
+            self.input.add_hotkey(self.config["reload_hotkey"], self.reload_script)
+            self.input.add_hotkey(self.config["sampler_hotkey"], self.toggle_sampler)
+            self.input.add_hotkey(self.config["respawn_hotkey"], self.mark_respawn)
             self.hotkeys_registered = True
     
     def unregister_hotkeys(self):
         """Unregister hotkeys"""
         if self.hotkeys_registered:
-            keyboard.remove_hotkey(self.config["pause_hotkey"])
-            keyboard.remove_hotkey(self.config["exit_hotkey"])
-            keyboard.remove_hotkey(self.config["start_hotkey"])
-            keyboard.remove_hotkey(self.config["reload_hotkey"])
+            self.input.remove_hotkey(self.config["pause_hotkey"])
+            self.input.remove_hotkey(self.config["exit_hotkey"])
+            self.input.remove_hotkey(self.config["start_hotkey"])
+            self.input.remove_hotkey(self.config["reload_hotkey"])
+            self.input.remove_hotkey(self.config["sampler_hotkey"])
+            self.input.remove_hotkey(self.config["respawn_hotkey"])
             self.hotkeys_registered = False
     
     def run(self):
@@ -217,8 +237,9 @@ class PrimaryWestTek:
         self.register_hotkeys()
         
         try:
-            # Keep the script running
-            keyboard.wait()
+            # Keep the script running until the hotkeys are unregistered (the GUI's stop button)
+            while self.hotkeys_registered:
+                time.sleep(0.2)
         except KeyboardInterrupt:
             # Handle Ctrl+C
             pass
@@ -0,0 +1,201 @@
+import sys
+import time
+import threading
+import psutil
+
+
+def find_process(process_name):
+    """Return a psutil handle to the first process with this name, or None"""
+    for proc in psutil.process_iter(['name']):
+        if proc.info['name'] == process_name:
+            return proc
+    return None
+
+
+def windows_hung(pid):
+    """Check the process's visible top-level windows with IsHungAppWindow (Windows only)"""
+    import ctypes
+    from ctypes import wintypes
+
+    user32 = ctypes.windll.user32
+    found = {"windows": 0, "hung": 0}
+
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def check_window(hwnd, lparam):
+        owner = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+        if owner.value == pid and user32.IsWindowVisible(hwnd):
+            found["windows"] += 1
+            if user32.IsHungAppWindow(hwnd):
+                found["hung"] += 1
+        return True
+
+    user32.EnumWindows(check_window, 0)
+    return found["windows"] > 0 and found["hung"] == found["windows"]
+
+
+class ProcessWatchdog:
+    """Background thread that aborts a routine when the game process exits or hangs"""
+
+    def __init__(self, process, on_abort, sample_interval=0.1, hang_timeout=15.0,
+                 check_cpu=True, logger=None):
+        self.process = process  # psutil.Process handle held for the whole run
+        self.on_abort = on_abort  # Called once with the reason from the watchdog thread
+        self.sample_interval = sample_interval
+        self.hang_timeout = hang_timeout
+        self.check_cpu = check_cpu  # Count zero CPU progress as unresponsive
+        self.logger = logger
+        self.check_windows = sys.platform == "win32"
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.triggered = None  # Reason once the watchdog has fired
+
+        # Latest sample, for status displays
+        self.last_status = None
+        self.last_cpu_seconds = None
+        self.cpu_percent = 0.0
+        self.unresponsive_since = None
+        self.last_sample_time = None
+
+    @classmethod
+    def for_name(cls, process_name, on_abort, **kwargs):
+        """Create a watchdog for a process found by name, or None if it is not running"""
+        process = find_process(process_name)
+        if process is None:
+            return None
+        return cls(process, on_abort, **kwargs)
+
+    def start(self):
+        """Start watching in a daemon thread"""
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.watch, name="ProcessWatchdog", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(self.sample_interval * 2 + 1)
+        self.thread = None
+
+    def watch(self):
+        """Watchdog loop: block on process exit for one interval, then sample health"""
+        while not self.stop_event.is_set():
+            try:
+                # Returns as soon as the process exits, so exits are caught immediately
+                self.process.wait(self.sample_interval)
+            except psutil.TimeoutExpired:
+                pass
+            except psutil.Error:
+                # Process handle is gone, treat it like an exit
+                self.trigger("game process exited")
+                return
+            else:
+                self.trigger("game process exited")
+                return
+
+            if self.stop_event.is_set():
+                return
+
+            try:
+                responsive = self.sample()
+            except psutil.NoSuchProcess:
+                self.trigger("game process exited")
+                return
+            except psutil.Error:
+                continue
+
+            now = time.monotonic()
+            if responsive:
+                self.unresponsive_since = None
+            elif self.unresponsive_since is None:
+                self.unresponsive_since = now
+            elif now - self.unresponsive_since >= self.hang_timeout:
+                self.trigger(f"game process not responding for {now - self.unresponsive_since:.1f}s")
+                return
+
+    def sample(self):
+        """Sample status and CPU, returning False if the process looks unresponsive"""
+        now = time.monotonic()
+        with self.process.oneshot():
+            status = self.process.status()
+            cpu_times = self.process.cpu_times()
+        cpu_seconds = cpu_times.user + cpu_times.system
+
+        if status == psutil.STATUS_ZOMBIE:
+            raise psutil.NoSuchProcess(self.process.pid)
+
+        cpu_stalled = False
+        if self.last_cpu_seconds is not None and self.last_sample_time is not None:
+            elapsed = now - self.last_sample_time
+            if elapsed > 0:
+                self.cpu_percent = (cpu_seconds - self.last_cpu_seconds) / elapsed * 100
+            cpu_stalled = cpu_seconds == self.last_cpu_seconds
+        self.last_status = status
+        self.last_cpu_seconds = cpu_seconds
+        self.last_sample_time = now
+
+        if status == psutil.STATUS_STOPPED:
+            return False
+        if self.check_cpu and cpu_stalled:
+            return False
+        if self.check_windows and windows_hung(self.process.pid):
+            return False
+        return True
+
+    def trigger(self, reason):
+        """Fire the abort callback once"""
+        if self.triggered is not None:
+            return
+        self.triggered = reason
+        if self.logger is not None:
+            self.logger.error("Watchdog: {reason}", reason=reason)
+        self.on_abort(reason)
+
+    def snapshot(self):
+        """Return the latest health sample"""
+        return {
+            "pid": self.process.pid,
+            "status": self.last_status,
+            "cpu_percent": self.cpu_percent,
+            "unresponsive_for": (time.monotonic() - self.unresponsive_since
+                                 if self.unresponsive_since is not None else 0.0),
+            "triggered": self.triggered
+        }
+
+
+# If this script is run directly, watch a dummy child process as a stand-in for the game
+if __name__ == "__main__":
+    import signal
+    import subprocess
+
+    mode = sys.argv[1] if len(sys.argv) > 1 else "exit"
+    # A busy child, so zero CPU progress only happens once it is stopped
+    child = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+    fired = threading.Event()
+    fired_at = []
+
+    def on_abort(reason):
+        fired_at.append(time.monotonic())
+        print(f"Abort: {reason}")
+        fired.set()
+
+    watchdog = ProcessWatchdog(psutil.Process(child.pid), on_abort, hang_timeout=1.0).start()
+    time.sleep(1)
+    event_at = time.monotonic()
+    if mode == "hang" and hasattr(signal, "SIGSTOP"):
+        child.send_signal(signal.SIGSTOP)
+        event_at += watchdog.hang_timeout
+    else:
+        child.kill()
+
+    fired.wait(5)
+    watchdog.stop()
+    if fired_at:
+        print(f"Watchdog fired {(fired_at[0] - event_at) * 1000:.0f} ms after the {mode}")
+    else:
+        print("Watchdog did not fire")
+    child.kill()
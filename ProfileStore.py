@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import sqlite3
+
+
+class ProfileStore:
+    """SQLite-backed store of named configuration profiles for each routine"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+        # check_same_thread is off so the GUI and script threads can share the handle
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+
+    def create_tables(self):
+        """Create the profile table and its lookup index"""
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS profiles ("
+                "  name TEXT NOT NULL,"
+                "  routine TEXT NOT NULL,"
+                "  config TEXT NOT NULL,"
+                "  updated REAL NOT NULL"
+                ")"
+            )
+            # Unique index on (name, routine) serves both per-routine loads and
+            # whole-profile switches, and makes listing names an index-only scan
+            self.connection.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_profiles_name_routine "
+                "ON profiles (name, routine)"
+            )
+            # Listing the profiles available for one routine
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_profiles_routine "
+                "ON profiles (routine, name)"
+            )
+
+    def list_profiles(self, routine=None):
+        """List profile names, optionally only those holding a config for routine"""
+        if routine is None:
+            rows = self.connection.execute(
+                "SELECT DISTINCT name FROM profiles ORDER BY name"
+            )
+        else:
+            rows = self.connection.execute(
+                "SELECT name FROM profiles WHERE routine = ? ORDER BY name",
+                (routine,)
+            )
+        return [row[0] for row in rows]
+
+    def load_profile(self, name):
+        """Load every routine config stored under a profile name"""
+        rows = self.connection.execute(
+            "SELECT routine, config FROM profiles WHERE name = ?",
+            (name,)
+        )
+        return {routine: json.loads(config) for routine, config in rows}
+
+    def load_config(self, name, routine):
+        """Load a single routine config from a profile, or None if it is missing"""
+        row = self.connection.execute(
+            "SELECT config FROM profiles WHERE name = ? AND routine = ?",
+            (name, routine)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_config(self, name, routine, config):
+        """Insert or replace a single routine config in a profile"""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO profiles (name, routine, config, updated) "
+                "VALUES (?, ?, ?, ?)",
+                (name, routine, json.dumps(config), time.time())
+            )
+
+    def save_profile(self, name, configs):
+        """Save several routine configs under a profile name in one transaction"""
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO profiles (name, routine, config, updated) "
+                "VALUES (?, ?, ?, ?)",
+                [(name, routine, json.dumps(config), now) for routine, config in configs.items()]
+            )
+
+    def delete_profile(self, name):
+        """Delete every routine config stored under a profile name"""
+        with self.connection:
+            self.connection.execute("DELETE FROM profiles WHERE name = ?", (name,))
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+
+# If this script is run directly, list the stored profiles
+if __name__ == "__main__":
+    import sys
+    from RoutineFactory import CONFIG_FOLDER
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(CONFIG_FOLDER, "profiles.db")
+    store = ProfileStore(db_path)
+    for profile_name in store.list_profiles():
+        print(f"{profile_name}: {', '.join(sorted(store.load_profile(profile_name)))}")
+    store.close()
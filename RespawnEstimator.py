@@ -0,0 +1,127 @@
+import os
+import json
+import math
+from statistics import NormalDist
+
+from RoutineFactory import CONFIG_FOLDER
+
+# How far past wait_time a detector-driven wait keeps looking for the respawn, in seconds,
+# so a respawn slower than wait_time is still measured instead of cut off
+MAX_EXTRA_WAIT = 30.0
+
+# Confidences are clamped to [1 - MAX_CONFIDENCE, MAX_CONFIDENCE], the normal quantile of 0 or 1 is infinite
+MAX_CONFIDENCE = 0.999
+
+
+def estimate_path(routine_name):
+    """Saved respawn estimate of a routine"""
+    return os.path.join(CONFIG_FOLDER, f"{routine_name}_respawn.json")
+
+
+class RespawnEstimator:
+    """Running estimate of the respawn period from observed respawns
+
+    Welford's algorithm keeps the mean and variance of every sample; an EWMA of
+    the mean and variance follows drift in the server's timer. The safe wait is an
+    upper prediction bound on the next respawn: the larger of the two means plus
+    z standard deviations, widened for the sample count.
+    """
+
+    def __init__(self, alpha=0.1):
+        self.alpha = alpha  # EWMA weight of a new sample
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean (Welford)
+        self.ewma_mean = None
+        self.ewma_var = 0.0
+        self.last = None
+
+    def observe(self, seconds):
+        """Add a measured respawn period"""
+        self.count += 1
+        delta = seconds - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (seconds - self.mean)
+
+        if self.ewma_mean is None:
+            self.ewma_mean = seconds
+        else:
+            diff = seconds - self.ewma_mean
+            increment = self.alpha * diff
+            self.ewma_mean += increment
+            self.ewma_var = (1 - self.alpha) * (self.ewma_var + diff * increment)
+        self.last = seconds
+
+    @property
+    def variance(self):
+        """Sample variance of every observation"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def bounds(self, confidence=0.99):
+        """(low, high) prediction bounds in seconds on the next respawn, or None before two samples"""
+        if self.count < 2:
+            return None
+        confidence = max(-MAX_CONFIDENCE, min(confidence, MAX_CONFIDENCE))
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        centre = max(self.mean, self.ewma_mean)
+        spread = math.sqrt(max(self.variance, self.ewma_var)) * math.sqrt(1 + 1 / self.count)
+        return centre - z * spread, centre + z * spread
+
+    def safe_wait(self, confidence=0.99, min_samples=5, step_ms=100):
+        """Smallest wait_time in ms that covers the next respawn at the given one-sided confidence, or None"""
+        if self.count < max(2, min_samples):
+            return None
+        # A respawn_confidence of 100 (or 0) has no finite bound, use the closest one that does
+        confidence = max(1 - MAX_CONFIDENCE, min(confidence, MAX_CONFIDENCE))
+        # The upper end of a two-sided interval at 2c - 1 is a one-sided bound at c
+        high = self.bounds(2 * confidence - 1)[1]
+        return int(math.ceil(high * 1000 / step_ms) * step_ms)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean, "m2": self.m2, "ewma_mean": self.ewma_mean,
+                "ewma_var": self.ewma_var, "last": self.last, "alpha": self.alpha}
+
+    @classmethod
+    def from_dict(cls, data):
+        estimator = cls(data.get("alpha", 0.1))
+        for key in ("count", "mean", "m2", "ewma_mean", "ewma_var", "last"):
+            setattr(estimator, key, data[key])
+        return estimator
+
+    @classmethod
+    def load(cls, path):
+        """Saved estimate, or a new one when there is none (or it is unreadable)"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return cls()
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_path, path)
+
+
+# If this script is run directly, show a routine's saved estimate
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show the saved respawn estimate of a routine")
+    parser.add_argument("routine", help="Routine class name, e.g. PrimaryWestTek, or CLASS-ID for a control server instance")
+    parser.add_argument("--confidence", type=float, default=0.99, help="One-sided confidence of the safe wait")
+    args = parser.parse_args()
+
+    estimator = RespawnEstimator.load(estimate_path(args.routine))
+    if not estimator.count:
+        print(f"No respawns observed for {args.routine}")
+    else:
+        print(f"{estimator.count} respawns, mean {estimator.mean:.3f}s (std {math.sqrt(estimator.variance):.3f}s), "
+              f"EWMA {estimator.ewma_mean:.3f}s (std {math.sqrt(estimator.ewma_var):.3f}s), last {estimator.last:.3f}s")
+        bounds = estimator.bounds(args.confidence)
+        if bounds:
+            print(f"{args.confidence * 100:.0f}% prediction interval: {bounds[0]:.3f}-{bounds[1]:.3f}s")
+        safe = estimator.safe_wait(args.confidence)
+        print(f"Safe wait_time: {safe} ms" if safe else "Too few respawns for a safe wait_time yet")
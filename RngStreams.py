@@ -0,0 +1,62 @@
+import hashlib
+import secrets
+
+
+class RngStream:
+    """Counter-based random stream: draw n is a keyed hash of n, so streams never interfere"""
+
+    def __init__(self, seed, name):
+        self.name = name
+        self.key = hashlib.blake2b(f"{seed}:{name}".encode(), digest_size=32).digest()
+        self.counter = 0
+
+    def next_u64(self):
+        """Return the next 64-bit draw and advance the counter"""
+        digest = hashlib.blake2b(self.counter.to_bytes(8, "little"), key=self.key, digest_size=8).digest()
+        self.counter += 1
+        return int.from_bytes(digest, "little")
+
+    def randint(self, a, b):
+        """Random integer in [a, b], including both end points like random.randint"""
+        span = b - a + 1
+        if span <= 0:
+            raise ValueError(f"Empty range for randint({a}, {b}) in stream {self.name}")
+        # Multiply-shift maps the 64-bit draw onto the range without a modulo
+        return a + ((self.next_u64() * span) >> 64)
+
+    def random(self):
+        """Random float in [0, 1)"""
+        return (self.next_u64() >> 11) * (1.0 / (1 << 53))
+
+
+class RunRng:
+    """Independent random streams for each action class, all derived from one run seed"""
+
+    def __init__(self, seed=None):
+        # A seed of 0 or None picks a fresh one, which is logged so the run can be replayed
+        self.seed = int(seed) if seed else secrets.randbits(63)
+        self.streams = {}
+
+    def stream(self, name):
+        """Return the stream for an action class, creating it on first use"""
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = self.streams[name] = RngStream(self.seed, name)
+        return stream
+
+    def randint(self, name, a, b):
+        """Random integer in [a, b] from the named stream"""
+        return self.stream(name).randint(a, b)
+
+    def random(self, name):
+        """Random float in [0, 1) from the named stream"""
+        return self.stream(name).random()
+
+    def state(self):
+        """Return the draw counters of every stream"""
+        return {name: stream.counter for name, stream in self.streams.items()}
+
+    def restore(self, state):
+        """Move streams to previously saved draw counters"""
+        for name, counter in state.items():
+            self.stream(name).counter = counter
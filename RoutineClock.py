@@ -0,0 +1,108 @@
+import time
+import datetime
+import threading
+
+
+class RoutineAborted(Exception):
+    """Raised inside a routine's thread when its run is aborted"""
+
+    def __init__(self, reason="aborted"):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class RoutineClock:
+    """Time source for the routines whose sleeps end early when the run is aborted"""
+
+    def __init__(self, short_sleep=0.1):
+        # Sleeps shorter than this use time.sleep for input timing precision
+        # (Event.wait is limited to the system timer tick on Windows)
+        self.short_sleep = short_sleep
+        self.abort_event = threading.Event()
+        self.abort_reason = None
+
+    def time(self):
+        """Wall clock time in seconds"""
+        return time.time()
+
+    def monotonic(self):
+        """Monotonic time in seconds"""
+        return time.monotonic()
+
+    def perf_counter(self):
+        """High resolution timer in seconds, for measuring short spans"""
+        return time.perf_counter()
+
+    def now(self):
+        """Current local date and time"""
+        return datetime.datetime.now()
+
+    def sleep(self, seconds):
+        """Sleep, raising RoutineAborted as soon as the run is aborted"""
+        if seconds < self.short_sleep:
+            time.sleep(seconds)
+            if self.abort_event.is_set():
+                raise RoutineAborted(self.abort_reason)
+        elif self.abort_event.wait(seconds):
+            raise RoutineAborted(self.abort_reason)
+
+    def burst_sleep(self, seconds):
+        """Sleep with time.sleep however long, for bursts that must not allocate; an abort is seen when it ends"""
+        time.sleep(seconds)
+        if self.abort_event.is_set():
+            raise RoutineAborted(self.abort_reason)
+
+    def check(self):
+        """Raise RoutineAborted if the run has been aborted"""
+        if self.abort_event.is_set():
+            raise RoutineAborted(self.abort_reason)
+
+    def abort(self, reason="aborted"):
+        """Abort the run, waking any sleep in progress"""
+        if not self.abort_event.is_set():
+            self.abort_reason = reason
+            self.abort_event.set()
+
+    def reset(self):
+        """Clear an abort so the next run can start"""
+        self.abort_reason = None
+        self.abort_event.clear()
+
+    @property
+    def aborted(self):
+        """Whether the run has been aborted"""
+        return self.abort_event.is_set()
+
+
+class SimClock(RoutineClock):
+    """Simulated clock whose sleeps advance virtual time instantly, for soak and replay runs"""
+
+    def __init__(self, start=None):
+        super().__init__()
+        self.start = start if start is not None else time.time()
+        self.current = self.start
+
+    def time(self):
+        """Simulated wall clock time in seconds"""
+        return self.current
+
+    def monotonic(self):
+        """Simulated seconds since the clock was created"""
+        return self.current - self.start
+
+    def perf_counter(self):
+        """Simulated seconds since the clock was created"""
+        return self.current - self.start
+
+    def now(self):
+        """Simulated local date and time"""
+        return datetime.datetime.fromtimestamp(self.current)
+
+    def sleep(self, seconds):
+        """Advance simulated time, raising RoutineAborted if the run has been aborted"""
+        self.check()
+        self.current += seconds
+
+    def burst_sleep(self, seconds):
+        """Advance simulated time like sleep"""
+        self.sleep(seconds)
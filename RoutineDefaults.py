@@ -0,0 +1,322 @@
+# Default configurations and settings help of the built-in routines, kept free of imports so the
+# registry and the GUI read them without importing a routine (or its instrumentation modules)
+
+# Default configuration of PrimaryAltWestTek (primary)
+PRIMARY_CONFIG = {
+    # Random timing values
+    "shot_min_time": 63,
+    "shot_max_time": 88,
+    "quick_min_time": 50,
+    "quick_max_time": 150,
+    "shot_wait_min": 100,
+    "shot_wait_max": 105,
+    "slow_min_time": 1000,
+    "slow_max_time": 1500,
+    "load_screen_min": 10000,
+    "load_screen_max": 12000,
+    "elevator_reset_min": 8000,
+    "elevator_reset_max": 12000,
+
+    # Adaptive load screen wait
+    "adaptive_load_screen": 0,  # 1 to stop waiting once the game settles
+    "load_screen_adaptive_min": 3000,
+    "load_sample_interval": 250,
+    "load_settle_time": 1000,
+
+    # Shooting config
+    "shots": 60,
+    "wait_time": 60000,  # 60 seconds in milliseconds
+    "seed": 0,  # Run seed for the random timings, 0 for a new seed each run
+    "detector_check_shots": 10,  # Shots between screen checks for enemies
+
+    # Keys
+    "shoot_key": "left mouse",
+    "right_key": "d",
+    "sprint_key": "left shift",
+    "crouch_key": "left ctrl",
+    "use_key": "e",
+    "opk_enable1": "numpad1",
+    "opk_enable2": "numpad2",
+
+    # Hotkeys
+    "pause_hotkey": "f1",
+    "exit_hotkey": "f2",
+    "start_hotkey": "f3",
+    "reload_hotkey": "f4",
+    "sampler_hotkey": "f6",  # Sample the automation thread's stack for sampler_window
+    "respawn_hotkey": "f7",  # Mark a respawn you saw, for respawn tuning
+
+    # Process
+    "game_process": "Fallout76.exe",
+    "watchdog": 1,  # Abort when the game exits or stops responding
+    "watchdog_interval": 100,  # in milliseconds
+    "hang_timeout": 15000,  # in milliseconds
+
+    # Checkpoints
+    "checkpoint": 1,  # Journal each cycle step so a restart resumes where it left off
+    "resume_max_age": 300000,  # in milliseconds, older checkpoints start a fresh run
+    "trace": 0,  # 1 to write a Chrome trace of every phase and key press when the run stops
+    "sampler_window": 10000,  # in milliseconds, for the sampler hotkey
+    "respawn_tuning": 0,  # 0 off, 1 to log the smallest safe wait_time from observed respawns, 2 to apply it
+    "respawn_confidence": 99,  # in percent, chance that wait_time covers the next respawn
+    "respawn_min_samples": 5,  # Respawns to observe before proposing a wait_time
+    "cycle_period": 0,  # in milliseconds, 0 to start each cycle when the last ends, else cycle k starts at T0 + k * cycle_period
+    "input_rate": 0,  # Key presses per second across all keys, 0 for no limit
+    "input_burst": 3,  # Presses let through back to back under input_rate
+    "key_rates": "",  # Per-key press limits as KEY=RATE[:BURST], e.g. "action_key=8, e=4:2"
+    "input_emitter": 0,  # 1 to send input from a dedicated high-priority thread, on a timeline ahead of the routine
+    "emitter_lookahead": 20,  # in milliseconds, how far the routine logic may run ahead of the input it sends
+    "emitter_nice": -10,  # Priority of the emitter thread, lower is higher (negative needs privileges on Linux)
+    "emitter_cpu": -1,  # CPU to pin the emitter thread to, -1 for any
+    "hot_loop": 0,  # 1 to draw each burst's timings up front and keep the cyclic GC out of the bursts
+    "status_block": 0,  # 1 to publish live status to a memory-mapped file for overlays and monitors
+
+    # Sync with other instances
+    "sync_barrier": 0,  # 1 to start on a shared go from the sync coordinator instead of the local :01
+    "sync_address": "127.0.0.1:8777",
+    "sync_group": "westtek",
+    "sync_parties": 2,  # Instances that start together
+    "sync_timeout": 120000  # in milliseconds, then fall back to the local clock
+}
+
+# Default configuration of TimedRunWestTek (timed_run)
+TIMED_RUN_CONFIG = {
+    # Random timing values
+    "shot_min_time": 63,
+    "shot_max_time": 88,
+    "quick_min_time": 50,
+    "quick_max_time": 150,
+    "shot_wait_min": 100,
+    "shot_wait_max": 105,
+    "slow_min_time": 1000,
+    "slow_max_time": 1500,
+    "load_screen_min": 10000,
+    "load_screen_max": 12000,
+    "elevator_reset_min": 8000,
+    "elevator_reset_max": 12000,
+
+    # Adaptive load screen wait
+    "adaptive_load_screen": 0,  # 1 to stop waiting once the game settles
+    "load_screen_adaptive_min": 3000,
+    "load_sample_interval": 250,
+    "load_settle_time": 1000,
+
+    # Shooting config
+    "shots": 60,
+    "wait_time": 60000,  # 60 seconds in milliseconds
+    "seed": 0,  # Run seed for the random timings, 0 for a new seed each run
+    "detector_check_shots": 10,  # Shots between screen checks for enemies
+
+    # Keys
+    "shoot_key": "left mouse",
+    "right_key": "d",
+    "sprint_key": "left shift",
+    "crouch_key": "left ctrl",
+    "use_key": "e",
+    "opk_enable1": "numpad1",
+    "opk_enable2": "numpad2",
+
+    # Hotkeys
+    "pause_hotkey": "f1",
+    "exit_hotkey": "f2",
+    "start_hotkey": "f3",
+    "reload_hotkey": "f4",
+    "sampler_hotkey": "f6",  # Sample the automation thread's stack for sampler_window
+    "respawn_hotkey": "f7",  # Mark a respawn you saw, for respawn tuning
+
+    # Process
+    "game_process": "Fallout76.exe",
+    "watchdog": 1,  # Abort when the game exits or stops responding
+    "watchdog_interval": 100,  # in milliseconds
+    "hang_timeout": 15000,  # in milliseconds
+
+    # Checkpoints
+    "checkpoint": 1,  # Journal each cycle step so a restart resumes where it left off
+    "resume_max_age": 300000,  # in milliseconds, older checkpoints start a fresh run
+    "trace": 0,  # 1 to write a Chrome trace of every phase and key press when the run stops
+    "sampler_window": 10000,  # in milliseconds, for the sampler hotkey
+    "respawn_tuning": 0,  # 0 off, 1 to log the smallest safe wait_time from observed respawns, 2 to apply it
+    "respawn_confidence": 99,  # in percent, chance that wait_time covers the next respawn
+    "respawn_min_samples": 5,  # Respawns to observe before proposing a wait_time
+    "cycle_period": 0,  # in milliseconds, 0 to start each cycle when the last ends, else cycle k starts at T0 + k * cycle_period
+    "input_rate": 0,  # Key presses per second across all keys, 0 for no limit
+    "input_burst": 3,  # Presses let through back to back under input_rate
+    "key_rates": "",  # Per-key press limits as KEY=RATE[:BURST], e.g. "action_key=8, e=4:2"
+    "input_emitter": 0,  # 1 to send input from a dedicated high-priority thread, on a timeline ahead of the routine
+    "emitter_lookahead": 20,  # in milliseconds, how far the routine logic may run ahead of the input it sends
+    "emitter_nice": -10,  # Priority of the emitter thread, lower is higher (negative needs privileges on Linux)
+    "emitter_cpu": -1,  # CPU to pin the emitter thread to, -1 for any
+    "hot_loop": 0,  # 1 to draw each burst's timings up front and keep the cyclic GC out of the bursts
+    "status_block": 0  # 1 to publish live status to a memory-mapped file for overlays and monitors
+}
+
+# Default configuration of AltWestTek (alt)
+ALT_CONFIG = {
+    "walk_min_time": 63,
+    "walk_max_time": 88,
+    "sleep_min_time": 80,
+    "sleep_max_time": 100,
+    "walk_cycles": 8,
+    "seed": 0,  # Run seed for the random timings, 0 for a new seed each run
+    "wait_time": 60000,  # 60 seconds in milliseconds
+    "action_key": "e",
+    "action_press_time": 60,  # in milliseconds
+    "action_cycles": 15,
+    "backward_key": "s",  # The parameter name in your original code
+    "right_key": "d",
+    "start_hotkey": "f3",
+    "stop_hotkey": "f2",
+    "sampler_hotkey": "f6",  # Sample the automation thread's stack for sampler_window
+    "respawn_hotkey": "f7",  # Mark a respawn you saw, for respawn tuning
+    "game_process": "Fallout76.exe",  # Added game process check
+    "watchdog": 1,  # Abort when the game exits or stops responding
+    "watchdog_interval": 100,  # in milliseconds
+    "hang_timeout": 15000,  # in milliseconds
+    "checkpoint": 1,  # Journal each cycle step so a restart resumes where it left off
+    "resume_max_age": 300000,  # in milliseconds, older checkpoints start a fresh run
+    "trace": 0,  # 1 to write a Chrome trace of every phase and key press when the run stops
+    "sampler_window": 10000,  # in milliseconds
+    "respawn_tuning": 0,  # 0 off, 1 to log the smallest safe wait_time from observed respawns, 2 to apply it
+    "respawn_confidence": 99,  # in percent, chance that wait_time covers the next respawn
+    "respawn_min_samples": 5,  # Respawns to observe before proposing a wait_time
+    "cycle_period": 0,  # in milliseconds, 0 to start each cycle when the last ends, else cycle k starts at T0 + k * cycle_period
+    "input_rate": 0,  # Key presses per second across all keys, 0 for no limit
+    "input_burst": 3,  # Presses let through back to back under input_rate
+    "key_rates": "",  # Per-key press limits as KEY=RATE[:BURST], e.g. "action_key=8, e=4:2"
+    "input_emitter": 0,  # 1 to send input from a dedicated high-priority thread, on a timeline ahead of the routine
+    "emitter_lookahead": 20,  # in milliseconds, how far the routine logic may run ahead of the input it sends
+    "emitter_nice": -10,  # Priority of the emitter thread, lower is higher (negative needs privileges on Linux)
+    "emitter_cpu": -1,  # CPU to pin the emitter thread to, -1 for any
+    "hot_loop": 0,  # 1 to draw each burst's timings up front and keep the cyclic GC out of the bursts
+    "status_block": 0,  # 1 to publish live status to a memory-mapped file for overlays and monitors
+    "sync_barrier": 0,  # 1 to start on a shared go from the sync coordinator instead of the local :01
+    "sync_address": "127.0.0.1:8777",
+    "sync_group": "westtek",
+    "sync_parties": 2,  # Instances that start together
+    "sync_timeout": 120000  # in milliseconds, then fall back to the local clock
+}
+
+# Settings that are keys without ending in _key or _hotkey, captured like the other key fields
+SHOOTER_KEY_FIELDS = ["opk_enable1", "opk_enable2"]
+
+# Settings dialog groups as (title, keys), the keys left out are listed under Process Settings
+SHOOTER_GROUPS = [
+    ("Timing Settings", ["shot_min_time", "shot_max_time", "quick_min_time", "quick_max_time",
+                         "shot_wait_min", "shot_wait_max", "slow_min_time", "slow_max_time",
+                         "load_screen_min", "load_screen_max", "elevator_reset_min", "elevator_reset_max",
+                         "adaptive_load_screen", "load_screen_adaptive_min", "load_sample_interval",
+                         "load_settle_time"]),
+    ("Config Settings", ["shots", "wait_time", "detector_check_shots", "seed"]),
+    ("Key Settings", ["shoot_key", "right_key", "sprint_key", "crouch_key", "use_key",
+                      "opk_enable1", "opk_enable2"]),
+    ("Hotkey Settings", ["pause_hotkey", "exit_hotkey", "start_hotkey", "reload_hotkey",
+                         "sampler_hotkey", "respawn_hotkey"])
+]
+
+ALT_GROUPS = [
+    ("Movement Settings", ["walk_min_time", "walk_max_time", "sleep_min_time", "sleep_max_time",
+                           "walk_cycles", "wait_time", "seed"]),
+    ("Action Settings", ["action_key", "action_press_time", "action_cycles"]),
+    ("Key Settings", ["backward_key", "right_key"]),
+    ("Hotkey Settings", ["start_hotkey", "stop_hotkey", "sampler_hotkey", "respawn_hotkey"])
+]
+
+# Settings dialog help for the built-in routines' config keys
+TOOLTIPS = {
+    "shot_min_time": "Minimum time to hold down the shoot button (in milliseconds)",
+    "shot_max_time": "Maximum time to hold down the shoot button (in milliseconds)",
+    "quick_min_time": "Minimum time for quick actions (in milliseconds)",
+    "quick_max_time": "Maximum time for quick actions (in milliseconds)",
+    "shot_wait_min": "Minimum wait time between shots (in milliseconds)",
+    "shot_wait_max": "Maximum wait time between shots (in milliseconds)",
+    "slow_min_time": "Minimum time for slow actions (in milliseconds)",
+    "slow_max_time": "Maximum time for slow actions (in milliseconds)",
+    "load_screen_min": "Minimum wait time for load screens (in milliseconds)",
+    "load_screen_max": "Maximum wait time for load screens (in milliseconds)",
+    "elevator_reset_min": "Not used (in milliseconds)",
+    "elevator_reset_max": "Not used (in milliseconds)",
+    "adaptive_load_screen": "1 to end the load screen wait once the game process settles, 0 for a fixed random wait",
+    "load_screen_adaptive_min": "Shortest load screen wait in adaptive mode (in milliseconds)",
+    "load_sample_interval": "How often the game process is sampled in adaptive mode (in milliseconds)",
+    "load_settle_time": "How long the game has to stay quiet before the load counts as done (in milliseconds)",
+    "shots": "Number of shots to fire in sequence",
+    "wait_time": "Has to be above 1 minute for respawn to happen (in milliseconds)",
+    "seed": "Seed for the random timings, logged at each start so a run can be replayed (0 for a new seed each run)",
+    "detector_check_shots": "Shots between screen checks for enemies (only with a detector.json probe file)",
+    "shoot_key": "Key to use for shooting",
+    "right_key": "Key to use for right movement",
+    "sprint_key": "Key to use for sprinting",
+    "crouch_key": "Key to use for crouching",
+    "use_key": "Key to use for interactions",
+    "opk_enable1": "First key for OPK sequence",
+    "opk_enable2": "Second key for OPK sequence",
+    "pause_hotkey": "Hotkey to pause the script",
+    "exit_hotkey": "Hotkey to exit the script",
+    "start_hotkey": "Hotkey to start the script",
+    "reload_hotkey": "Hotkey to reload the script",
+    "sampler_hotkey": "Hotkey to sample the running automation's stack for the sampler window (press again to stop early)",
+    "respawn_hotkey": "Hotkey to mark a respawn you saw, measured from the cycle start, for respawn tuning",
+    "game_process": "Process name to monitor for the game",
+    "watchdog": "1 to abort as soon as the game exits or stops responding, 0 to only check between steps",
+    "watchdog_interval": "How often the watchdog samples the game process (in milliseconds)",
+    "hang_timeout": "How long the game may stay unresponsive before the script aborts (in milliseconds)",
+    "checkpoint": "1 to journal each cycle step so a restarted run resumes at the right point of the respawn timer",
+    "resume_max_age": "How old the last checkpoint may be for a start to resume it instead of aligning to the minute again (in milliseconds)",
+    "trace": "1 to record every phase and key press and write them as a Chrome trace (open in Perfetto or chrome://tracing) when the run stops",
+    "sampler_window": "How long the sampler hotkey samples the automation thread; the collapsed stacks go to Documents/WestTekAuto/stack_samples (in milliseconds)",
+    "respawn_tuning": "0 off, 1 to log the smallest safe wait time estimated from observed respawns (screen detection or the respawn hotkey), 2 to apply it as the run goes",
+    "respawn_confidence": "Chance, in percent, that the tuned wait time covers the next respawn",
+    "respawn_min_samples": "Respawns to observe before a wait time is proposed",
+    "cycle_period": "Start cycles on a fixed timeline, one every cycle period from the first cycle, so they hold their phase against the respawn timer; the respawn wait is timed from each cycle's slot (0 to run cycles back to back, in milliseconds)",
+    "input_rate": "Most key presses per second across all keys; presses over it wait just long enough for the limit (0 for no limit)",
+    "input_burst": "Key presses let through back to back before input rate pacing starts",
+    "key_rates": "Per-key press limits as KEY=RATE[:BURST] separated by commas, e.g. action_key=8, e=4:2; a key setting name such as action_key stands for the key it is set to",
+    "input_emitter": "1 to send key presses from a dedicated high-priority thread at their scheduled times, so the routine's own work does not shift them",
+    "emitter_lookahead": "How far the routine may run ahead of the input it sends; delays in its own work up to this long do not reach the game (in milliseconds)",
+    "emitter_nice": "Priority of the emitter thread, lower is higher; on Linux a negative value needs privileges, on Windows any negative value raises it",
+    "emitter_cpu": "CPU core to pin the emitter thread to (-1 for any)",
+    "hot_loop": "1 to draw the timings of each shot, walk or action burst before it starts and keep Python's cyclic garbage collector off during the bursts (it runs in the respawn wait instead)",
+    "status_block": "1 to publish the live state, cycle, phase, countdown and last cycle time to Documents/WestTekAuto/status/<routine>.status, a memory-mapped file stream overlays and monitors can read",
+    "sync_barrier": "1 to start together with the other instances of the sync group on a shared go instead of each on its own :01",
+    "sync_address": "host:port of the sync coordinator (the first instance to start hosts it when the address is local)",
+    "sync_group": "Name of the barrier; instances with the same group start together",
+    "sync_parties": "How many instances start together",
+    "sync_timeout": "How long to wait for the other instances before starting on the local minute (in milliseconds)",
+    "walk_min_time": "Minimum walking time in milliseconds",
+    "walk_max_time": "Maximum walking time in milliseconds",
+    "sleep_min_time": "Minimum sleep time in milliseconds",
+    "sleep_max_time": "Maximum sleep time in milliseconds",
+    "walk_cycles": "Number of walking cycles to perform",
+    "action_key": "Key to press for interactions",
+    "action_press_time": "Time to hold the action key (in milliseconds)",
+    "action_cycles": "Number of times to press the action key",
+    "backward_key": "Key to use for backward movement",
+    "stop_hotkey": "Hotkey to stop the script"
+}
+
+# Labels that differ from the key name in title case
+LABELS = {
+    "load_screen_adaptive_min": "Adaptive Load Min:",
+    "shots": "Number of Shots:",
+    "wait_time": "Wait Time (ms):",
+    "seed": "Random Seed:",
+    "right_key": "Right Movement Key:",
+    "use_key": "Use/Interact Key:",
+    "opk_enable1": "OPK Enable Key 1:",
+    "opk_enable2": "OPK Enable Key 2:",
+    "game_process": "Game Process Name:",
+    "watchdog_interval": "Watchdog Interval (ms):",
+    "hang_timeout": "Hang Timeout (ms):",
+    "checkpoint": "Checkpoint Cycles:",
+    "resume_max_age": "Resume Max Age (ms):",
+    "sampler_window": "Sampler Window (ms):",
+    "respawn_confidence": "Respawn Confidence (%):",
+    "cycle_period": "Cycle Period (ms):",
+    "input_rate": "Input Rate (presses/s):",
+    "emitter_lookahead": "Emitter Lookahead (ms):",
+    "emitter_nice": "Emitter Priority:",
+    "emitter_cpu": "Emitter CPU:",
+    "sync_timeout": "Sync Timeout (ms):",
+    "action_press_time": "Action Press Time (ms):",
+    "backward_key": "Backward Movement Key:"
+}
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import glob
+import importlib
+
+import RoutineDefaults
+
+# Folder the controller GUI saves its configurations to, the other modules keep their files under it too
+CONFIG_FOLDER = os.path.join(os.path.expanduser("~"), "Documents", "WestTekAuto")
+PLUGIN_FOLDER = os.path.join(CONFIG_FOLDER, "plugins")
+ENTRY_POINT_GROUP = "westtek.routines"
+
+# Built-in routines, in the order the GUI lists them; like plugins, their defaults and settings help
+# are metadata (RoutineDefaults), so modules are only imported when launched
+ROUTINES = {
+    "primary": {
+        "title": "PrimaryAltWestTek",
+        "subtitle": "For Main Character with AFK Player",
+        "description": "PrimaryAltWestTek is for your main character with AFK players. It handles shooting, OPK toggling, and elevator usage.",
+        "module": "PrimaryAltWestTek",
+        "class": "PrimaryWestTek",
+        "config_file": "primary_config.json",
+        "detector": True,  # Takes a GameStateDetector
+        "config": RoutineDefaults.PRIMARY_CONFIG,
+        "tooltips": RoutineDefaults.TOOLTIPS,
+        "labels": RoutineDefaults.LABELS,
+        "key_fields": RoutineDefaults.SHOOTER_KEY_FIELDS,
+        "groups": RoutineDefaults.SHOOTER_GROUPS
+    },
+    "alt": {
+        "title": "AltWestTek",
+        "subtitle": "For AFK Players",
+        "description": "AltWestTek is designed for AFK players. It performs automated movement patterns and key presses to keep your character active.",
+        "module": "AltWestTek",
+        "class": "Alt",
+        "config_file": "alt_config.json",
+        "detector": False,
+        "config": RoutineDefaults.ALT_CONFIG,
+        "tooltips": RoutineDefaults.TOOLTIPS,
+        "labels": RoutineDefaults.LABELS,
+        "groups": RoutineDefaults.ALT_GROUPS
+    },
+    "timed_run": {
+        "title": "TimedRun",
+        "subtitle": "For Single Player",
+        "description": "TimedRun is optimized for single player mode. It focuses on efficient shooting and movement without waiting for other players.",
+        "module": "TimedRunWestTek",
+        "class": "TimedRunWestTek",
+        "config_file": "timed_run_config.json",
+        "detector": True,
+        "config": RoutineDefaults.TIMED_RUN_CONFIG,
+        "tooltips": RoutineDefaults.TOOLTIPS,
+        "labels": RoutineDefaults.LABELS,
+        "key_fields": RoutineDefaults.SHOOTER_KEY_FIELDS,
+        "groups": RoutineDefaults.SHOOTER_GROUPS
+    }
+}
+
+# Plugin metadata looks like a ROUTINES entry; "config" holds the default configuration (the
+# settings schema, each value's type is the type of its default), "tooltips" optional help text
+# per key, "labels" optional field labels, "key_fields" settings captured as keys that do not end
+# in _key or _hotkey, and "groups" optional (title, keys) settings groups, the keys left out are
+# listed under a group named after the title. A plugin is either a JSON file in the plugins folder,
+# whose "module" is imported from that folder, or an entry point in the "westtek.routines" group
+# that names the metadata dict, which should live in a small module apart from the routine itself:
+#
+#   [project.entry-points."westtek.routines"]
+#   farm_run = "farm_run_meta:ROUTINE"
+#
+# The class is created as cls(config, logger=..., detector=...) (detector only when the metadata
+# says so) and needs the same methods as the built-ins: run(), start_automation(), abort(reason),
+# unregister_hotkeys() and the cycles_completed, cycle_seconds and max_cycles attributes.
+REQUIRED_KEYS = ("title", "module", "class")
+
+_registry = None
+discovery_errors = []
+
+
+def discover_plugins(plugin_folder=PLUGIN_FOLDER):
+    """Read the metadata of every plugin routine without importing the routines"""
+    plugins = {}
+
+    for path in sorted(glob.glob(os.path.join(plugin_folder, "*.json"))):
+        name = os.path.splitext(os.path.basename(path))[0]
+        try:
+            with open(path, 'r') as f:
+                info = json.load(f)
+            info["path"] = plugin_folder
+            plugins[info.get("name", name)] = info
+        except (OSError, ValueError) as e:
+            discovery_errors.append(f"{path}: {e}")
+
+    try:
+        from importlib.metadata import entry_points
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except (ImportError, TypeError):
+        # entry_points(group=...) needs Python 3.10
+        found = []
+    for entry_point in found:
+        try:
+            plugins[entry_point.name] = dict(entry_point.load())
+        except Exception as e:
+            discovery_errors.append(f"{entry_point.name}: {e}")
+
+    for name in list(plugins):
+        missing = [key for key in REQUIRED_KEYS if key not in plugins[name]]
+        if name in ROUTINES or missing:
+            discovery_errors.append(f"{name}: " + (f"missing {', '.join(missing)}" if missing
+                                                   else "clashes with a built-in routine"))
+            del plugins[name]
+        else:
+            plugins[name].setdefault("config_file", f"{name}_config.json")
+    return plugins
+
+
+def available_routines(refresh=False):
+    """Built-in and plugin routines by name, discovered once per process"""
+    global _registry
+    if _registry is None or refresh:
+        del discovery_errors[:]
+        _registry = dict(ROUTINES)
+        _registry.update(discover_plugins())
+    return _registry
+
+
+def routine_info(name):
+    """Return the metadata of a routine name"""
+    routines = available_routines()
+    if name not in routines:
+        raise ValueError(f"Unknown routine: {name} (expected one of {', '.join(routines)})")
+    return routines[name]
+
+
+def routine_class(name):
+    """Import and return the class for a routine name"""
+    info = routine_info(name)
+    if info.get("path") and info["path"] not in sys.path:
+        sys.path.insert(0, info["path"])
+    return getattr(importlib.import_module(info["module"]), info["class"])
+
+
+def default_config(name):
+    """Return the default configuration of a routine (from its metadata, so nothing is imported)"""
+    return dict(routine_info(name).get("config", {}))
+
+
+def settings_schema(name):
+    """Return the defaults, tooltips, labels, key fields and groups of a routine's settings tab"""
+    info = routine_info(name)
+    config = default_config(name)
+    groups = [(title, [key for key in keys if key in config]) for title, keys in info.get("groups", [])]
+    listed = {key for _, keys in groups for key in keys}
+    other_keys = [key for key in config if key not in listed]
+    if other_keys:
+        groups.append(("Process Settings" if name in ROUTINES else f"{info['title']} Settings", other_keys))
+    return {
+        "config": config,
+        "tooltips": info.get("tooltips", {}),
+        "labels": info.get("labels", {}),
+        "key_fields": info.get("key_fields", []),
+        "groups": groups
+    }
+
+
+def merge_config(config, loaded_config):
+    """Copy known keys from a loaded configuration over a default configuration"""
+    if loaded_config:
+        for key in loaded_config:
+            if key in config:
+                config[key] = loaded_config[key]
+    return config
+
+
+def load_config(name, config_folder=CONFIG_FOLDER, profile=None, profile_store=None):
+    """Load a routine config from a stored profile or the GUI's JSON file, over the defaults"""
+    config = default_config(name)
+
+    if profile is not None:
+        from ProfileStore import ProfileStore
+
+        store = profile_store or ProfileStore(os.path.join(config_folder, "profiles.db"))
+        loaded_config = store.load_config(profile, name)
+        if profile_store is None:
+            store.close()
+        if loaded_config is None:
+            raise ValueError(f"Profile {profile} has no {name} configuration")
+        return merge_config(config, loaded_config)
+
+    config_file = os.path.join(config_folder, routine_info(name)["config_file"])
+    if os.path.exists(config_file):
+        with open(config_file, 'r') as f:
+            merge_config(config, json.load(f))
+    return config
+
+
+def create_routine(name, config=None, **kwargs):
+    """Create a routine from a config (loaded from the config folder if not given)"""
+    if config is None:
+        config = load_config(name)
+    return routine_class(name)(config, **kwargs)
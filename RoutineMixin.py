@@ -0,0 +1,479 @@
+import threading
+import keyboard
+import psutil
+from AsyncLogger import get_logger
+from RoutineClock import RoutineClock, RoutineAborted
+from ProcessWatchdog import ProcessWatchdog
+from RngStreams import RunRng
+from CycleJournal import CycleJournal, journal_path
+from ChromeTrace import ChromeTracer, TracedInput, trace_path
+from StackSampler import StackSampler, samples_path
+from RespawnEstimator import RespawnEstimator, estimate_path, MAX_EXTRA_WAIT
+from PhaseLock import PhaseLock
+from InputPacer import PacedInput, parse_key_rates
+from InputEmitter import InputEmitter
+from HotLoop import HotLoop
+from StatusBlock import StatusBlock, status_path
+from SyncBarrier import SyncCoordinator, SyncClient, sleep_until
+
+class RoutineMixin:
+    """Run, checkpoint and instrumentation steps shared by the routines"""
+    
+    # A routine class sets default_config, sets cycle_steps after calling this, and provides
+    # automation_loop(resume) and release_keys()
+    def __init__(self, config=None, logger=None, detector=None, clock=None, rng=None, input_backend=None):
+        # Use provided config or default
+        self.config = config if config else dict(self.default_config)
+        self.logger = logger if logger else get_logger()
+        self.clock = clock if clock else RoutineClock()  # Sleeps end early when the run is aborted
+        self.input = input_backend if input_backend else keyboard  # Key presses and hotkeys
+        self.watchdog = None
+        # Independent timing streams per action class, replayable from the logged seed
+        self.rng = rng if rng else RunRng(self.config["seed"])
+        self.running = False
+        self.paused = False
+        self.hotkeys_registered = False
+        
+        # Cycle bookkeeping, read by the session scheduler
+        self.max_cycles = 0  # Stop after this many cycles, 0 for no limit
+        self.cycles_completed = 0
+        self.cycle_seconds = 0.0
+        self.detector = detector  # Optional GameStateDetector
+        
+        # Checkpoints and instrumentation, each only created when its config option is on
+        self.journal = None
+        self.phase = None
+        self.cycle_start_time = None
+        self.tracer = None  # Only created when tracing is enabled
+        self.sampler = None  # Stack sampler started by the sampler hotkey
+        self.automation_thread = None  # Thread id of the running automation, for the sampler
+        self.respawn = None  # Respawn period estimate, loaded when respawn tuning is on
+        self.respawn_proposal = None
+        self.phase_lock = None  # Cycle start timeline, only when cycle_period is set
+        self.pacer = None  # Only created when input pacing is configured
+        self.emitter = None  # Only created when the input emitter is enabled
+        self.hot_loop = None  # Burst buffers and GC control, only in hot loop mode
+        self.status = None  # Live status block, only when status_block is set
+        self.sync_coordinator = None  # Hosted here when no other instance runs one
+        self.instance_name = None  # Set by the control server, so instances of one routine keep their own files
+    
+    def file_name(self):
+        """Name of this routine's checkpoint journal, status block, respawn estimate, trace and sample files"""
+        return self.instance_name or type(self).__name__
+    
+    def display_tooltip(self, message=None):
+        """Display a message (equivalent to ToolTip in AHK)"""
+        if self.status is not None:
+            self.status.update(state="countdown" if message else "running", countdown=message or 0.0)
+        if message:
+            self.logger.status("Countdown: {countdown}", countdown=message)
+        else:
+            self.logger.status()  # Clear the line
+    
+    def process_exists(self, process_name):
+        """Check if a process exists by name"""
+        for proc in psutil.process_iter(['name']):
+            if proc.info['name'] == process_name:
+                return True
+        return False
+    
+    def start_automation(self):
+        """Function for the main automation workflow"""
+        self.running = True
+        self.automation_thread = threading.get_ident()
+        self.clock.reset()
+        if self.config["checkpoint"] and self.journal is None:
+            self.journal = CycleJournal(journal_path(self.file_name()), logger=self.logger)
+        if self.config["status_block"] and self.status is None:
+            self.open_status()
+        if self.config["input_emitter"] and self.emitter is None:
+            self.create_emitter()
+        if self.emitter is not None:
+            self.emitter.start()
+        if (self.config["input_rate"] or self.config["key_rates"].strip()) and self.pacer is None:
+            self.create_pacer()
+        if self.config["trace"] and self.tracer is None:
+            self.tracer = ChromeTracer(self.clock.perf_counter)
+            self.input = TracedInput(self.input, self.tracer)
+        if self.config["respawn_tuning"] and self.respawn is None:
+            self.respawn = RespawnEstimator.load(estimate_path(self.file_name()))
+        # A new timeline each start, anchored on the first (or resumed) cycle
+        self.phase_lock = PhaseLock(self.config["cycle_period"] / 1000, self.clock) if self.config["cycle_period"] else None
+        resume = self.load_resume_point()
+        self.logger.info("Run seed {seed}", seed=self.rng.seed, routine=type(self).__name__)
+        self.start_watchdog()
+        if self.config["hot_loop"]:
+            # Last, so the freeze covers everything set up above
+            self.hot_loop = HotLoop().start()
+        
+        try:
+            self.automation_loop(resume)
+        except RoutineAborted as e:
+            self.running = False
+            self.release_keys()
+            self.logger.info("Automation stopped: {reason}", reason=e.reason)
+            # Only a game exit or hang leaves the checkpoint open for a resume
+            if not e.reason.startswith("game process"):
+                self.checkpoint("stopped")
+        finally:
+            if self.hot_loop is not None:
+                self.hot_loop.stop()
+                self.hot_loop = None
+            self.stop_watchdog()
+            if self.emitter is not None:
+                self.stop_emitter()
+            if self.status is not None:
+                self.status.close("paused" if self.paused else "stopped")
+                self.status = None
+            if self.journal is not None:
+                self.journal.close()
+            if self.tracer is not None:
+                self.dump_trace()
+            self.automation_thread = None
+            if self.respawn is not None:
+                self.save_respawn_estimate()
+            if self.phase_lock is not None:
+                self.report_phase_lock()
+            if self.pacer is not None:
+                self.report_pacing()
+            if self.sync_coordinator is not None:
+                # Free the port for the next run (or another instance) to host it
+                self.sync_coordinator.stop()
+                self.sync_coordinator = None
+    
+    def wait_for_start(self):
+        """Start on the shared go of the sync barrier, or on the local minute countdown"""
+        if self.config["sync_barrier"]:
+            deadline = self.wait_for_barrier()
+            if deadline is not None:
+                sleep_until(deadline, self.clock)
+                return
+            self.logger.warning("No sync go within {timeout}s, aligning to the local clock",
+                                timeout=self.config["sync_timeout"] / 1000)
+        self.wait_for_minute()
+    
+    def wait_for_barrier(self):
+        """Join the sync barrier (hosting the coordinator if no instance does yet) and return the local go time"""
+        if self.sync_coordinator is None:
+            self.sync_coordinator = SyncCoordinator.try_start(self.config["sync_address"])
+        
+        client = SyncClient(self.config["sync_address"], type(self).__name__)
+        self.logger.status("Waiting for {parties} instances to sync", parties=self.config["sync_parties"])
+        try:
+            return client.wait_for_go(self.config["sync_group"], self.config["sync_parties"], align_second=1,
+                                      timeout=self.config["sync_timeout"] / 1000, check=self.clock.check)
+        finally:
+            client.close()
+            self.logger.status()
+    
+    def wait_for_minute(self):
+        """Countdown until seconds = 01"""
+        while self.running and not self.paused:
+            # Get current time seconds
+            current_seconds = self.clock.now().strftime("%S")
+            
+            if int(current_seconds) > 1:
+                countdown = 60 - int(current_seconds)
+            else:
+                countdown = 1
+                
+            self.display_tooltip(countdown)
+            
+            if current_seconds == "01":
+                self.display_tooltip()  # Clear tooltip
+                break
+            
+            self.clock.sleep(0.1)  # Small delay to prevent high CPU usage
+    
+    def run_cycle(self, start_phase, start_time=None):
+        """Run the cycle steps from start_phase, checkpointing at each step boundary"""
+        # Get start time for timing (a resumed cycle keeps its original start)
+        if self.phase_lock is None:
+            self.cycle_start_time = start_time if start_time is not None else self.clock.time()
+        else:
+            self.cycle_start_time = self.lock_cycle_start(start_time)
+        cycle_start = self.clock.monotonic()
+        trace_start = self.tracer.now() if self.tracer is not None else 0.0
+        
+        phases = [phase for phase, _ in self.cycle_steps]
+        for phase, step in self.cycle_steps[phases.index(start_phase):]:
+            self.checkpoint(phase)
+            if self.paused:
+                # The next start resumes from this checkpoint
+                return
+            if self.tracer is None:
+                step()
+            else:
+                self.tracer.call(phase, step)
+            if self.paused:
+                # The pause may have cut this step short (the respawn wait ends on it), so resume this step
+                self.checkpoint(phase)
+                return
+        
+        self.finish_cycle(cycle_start)
+        if self.tracer is not None:
+            self.tracer.span("cycle", "cycle", trace_start, self.tracer.now())
+    
+    def wait_for_respawn(self):
+        """Wait until configured time has passed since the cycle started"""
+        # With respawn tuning and a detector, watch the enemies come back to measure the respawn
+        watching = (self.respawn is not None and self.detector is not None
+                    and self.detector.has_state("enemies_present"))
+        cleared = False  # Enemies were gone, so the next sighting is the respawn
+        if self.hot_loop is not None:
+            self.hot_loop.idle()
+        while self.running and not self.paused:
+            elapsed_time = (self.clock.time() - self.cycle_start_time) * 1000  # Convert to ms
+            if self.status is not None:
+                self.status.update(countdown=max(0.0, (self.config["wait_time"] - elapsed_time) / 1000))
+            if watching:
+                if not self.detector.is_present("enemies_present"):
+                    cleared = True
+                elif cleared:
+                    self.observe_respawn(elapsed_time / 1000)
+                    watching = False
+            if elapsed_time >= self.config["wait_time"]:
+                # Keep looking a while for a respawn slower than wait_time, so it is measured too
+                if not (watching and cleared and elapsed_time < self.config["wait_time"] + MAX_EXTRA_WAIT * 1000):
+                    break
+            poll = 0.25 if watching else 1
+            if self.phase_lock is not None and elapsed_time < self.config["wait_time"]:
+                # End the wait on the locked timeline rather than on the next whole second
+                poll = min(poll, (self.config["wait_time"] - elapsed_time) / 1000)
+            self.clock.sleep(poll)
+    
+    def checkpoint(self, phase):
+        """Record the step about to run, so a restart can resume from it"""
+        self.phase = phase
+        if self.status is not None:
+            # The running cycle counts from 1, a stop shows the cycles completed
+            cycle = self.cycles_completed if phase == "stopped" else self.cycles_completed + 1
+            # Pause is published from here, the status block has a single writer (this thread)
+            self.status.update(state="paused" if self.paused else None, phase=phase, cycle=cycle)
+        if self.journal is not None:
+            self.journal.record(
+                routine=type(self).__name__,
+                phase=phase,
+                cycle=self.cycles_completed,
+                time=self.clock.time(),
+                cycle_start=self.cycle_start_time,
+                seed=self.rng.seed,
+                rng=self.rng.state()
+            )
+    
+    def load_resume_point(self):
+        """Restore a recent checkpoint, returning (phase, cycle start time) or None to start fresh"""
+        if self.journal is None:
+            return None
+        
+        record = self.journal.last_record()
+        if (record is None or record.get("routine") != type(self).__name__
+                or record.get("phase") not in dict(self.cycle_steps)):
+            return None
+        age = self.clock.time() - record["time"]
+        if age > self.config["resume_max_age"] / 1000:
+            return None
+        
+        self.cycles_completed = record["cycle"]
+        if not self.config["seed"]:
+            # Carry on the interrupted run's timing streams
+            self.rng = RunRng(record["seed"])
+        self.rng.restore(record["rng"])
+        
+        phase = record["phase"]
+        phases = [name for name, _ in self.cycle_steps]
+        elapsed_time = (self.clock.time() - record["cycle_start"]) * 1000
+        wait = phases.index("wait")
+        if phases.index(phase) <= wait and elapsed_time >= self.config["wait_time"]:
+            # The respawn timer ran out while we were down, go straight to the step after the wait
+            phase = phases[wait + 1]
+        elif phases.index(phase) > wait and elapsed_time < self.config["wait_time"]:
+            # The wait was cut short before this step was journaled, wait out the rest of the respawn timer
+            phase = "wait"
+        
+        self.logger.info("Resuming cycle {cycle} at {phase} ({age:.0f}s after the last checkpoint)",
+                         cycle=self.cycles_completed + 1, phase=phase, age=age)
+        return phase, record["cycle_start"]
+    
+    def finish_cycle(self, cycle_start):
+        """Count a finished cycle and stop once the cycle budget is used up"""
+        duration = self.clock.monotonic() - cycle_start
+        self.cycles_completed += 1
+        self.cycle_seconds += duration
+        if self.status is not None:
+            self.status.update(last_cycle=duration)
+        if self.respawn is not None and self.config["respawn_tuning"]:
+            self.tune_wait_time()
+        if self.max_cycles and self.cycles_completed >= self.max_cycles:
+            self.logger.info("Finished {cycles} cycles", cycles=self.cycles_completed)
+            self.running = False
+    
+    def mark_respawn(self):
+        """Respawn hotkey: the operator saw the respawn, measure it from the cycle start"""
+        if self.respawn is None or self.cycle_start_time is None:
+            return
+        self.observe_respawn(self.clock.time() - self.cycle_start_time)
+    
+    def observe_respawn(self, seconds):
+        """Add a measured respawn period to the estimate"""
+        self.respawn.observe(seconds)
+        self.logger.debug("Respawn after {seconds:.2f}s", seconds=seconds)
+    
+    def tune_wait_time(self):
+        """Propose, or apply, the smallest wait_time that covers the estimated respawn period"""
+        safe = self.respawn.safe_wait(self.config["respawn_confidence"] / 100, self.config["respawn_min_samples"])
+        if safe is None or safe == self.respawn_proposal:
+            return
+        self.respawn_proposal = safe
+        if self.config["respawn_tuning"] >= 2:
+            self.logger.info("wait_time {old} -> {new} ms from {count} respawns (mean {mean:.2f}s)",
+                             old=self.config["wait_time"], new=safe, count=self.respawn.count, mean=self.respawn.mean)
+            self.config["wait_time"] = safe
+        else:
+            self.logger.info("Respawn estimate suggests wait_time {new} ms (now {old} ms) from {count} respawns",
+                             old=self.config["wait_time"], new=safe, count=self.respawn.count)
+    
+    def save_respawn_estimate(self):
+        """Keep the respawn estimate for the next run"""
+        try:
+            self.respawn.save(estimate_path(self.file_name()))
+        except OSError as e:
+            self.logger.error("Could not save respawn estimate: {error}", error=e)
+    
+    def lock_cycle_start(self, start_time=None):
+        """Wait for the cycle's slot on the phase-locked timeline and return the slot start as wall clock time"""
+        if start_time is not None:
+            # A resumed cycle anchors the timeline at its original start
+            self.phase_lock.lock(self.clock.monotonic() - (self.clock.time() - start_time))
+            return start_time
+        
+        slot_start = self.phase_lock.wait_for_slot()
+        self.logger.debug("Cycle {cycle} started {error:+.1f} ms off its slot",
+                          cycle=self.cycles_completed + 1, error=self.phase_lock.last_error * 1000)
+        # Time the respawn wait from the slot, so a late start does not shift the respawn
+        return self.clock.time() - (self.clock.monotonic() - slot_start)
+    
+    def report_phase_lock(self):
+        """Log the phase error of the cycle starts over the run"""
+        report = self.phase_lock.summary()
+        if report is not None:
+            self.logger.info("Phase lock over {cycles} cycles: error mean {mean:+.2f} ms, worst {worst:+.2f} ms, "
+                             "{missed} missed slots", cycles=report["cycles"], mean=report["mean"],
+                             worst=report["worst"], missed=report["missed"])
+    
+    def open_status(self):
+        """Start publishing live status for overlays and monitors"""
+        path = status_path(self.file_name())
+        try:
+            self.status = StatusBlock(path)
+        except (OSError, ValueError) as e:
+            self.logger.error("Could not open status block {path}: {error}", path=path, error=e)
+            return
+        self.status.update(state="running", cycle=self.cycles_completed)
+    
+    def create_emitter(self):
+        """Send input from the emitter thread, with the routine on the emitter's timeline clock"""
+        self.emitter = InputEmitter(
+            self.input,
+            self.clock,
+            lookahead=self.config["emitter_lookahead"] / 1000,
+            nice=self.config["emitter_nice"],
+            cpu=self.config["emitter_cpu"],
+            logger=self.logger
+        )
+        self.input = self.emitter
+        self.clock = self.emitter.clock
+    
+    def stop_emitter(self):
+        """Send the queued input and stop the emitter thread"""
+        self.emitter.stop()
+        stats = self.emitter.stats()
+        self.logger.info("Input emitter sent {emitted} events, {mean_late:.2f} ms late on average "
+                         "(worst {max_late:.2f} ms)", emitted=stats["emitted"], mean_late=stats["mean_late"], max_late=stats["max_late"])
+        if self.emitter.error is not None:
+            self.logger.error("Input emitter could not send input: {error}", error=self.emitter.error)
+        if self.emitter.thread is not None:
+            self.logger.warning("Input emitter is still blocked sending input, it will not restart until it finishes")
+    
+    def create_pacer(self):
+        """Pace key presses under input_rate and key_rates, wrapping the input backend"""
+        try:
+            key_rates = parse_key_rates(self.config["key_rates"])
+        except ValueError as e:
+            self.logger.error("Invalid key_rates, pacing without per-key limits: {error}", error=e)
+            key_rates = {}
+        # Config key names (e.g. action_key) stand for the key they are set to
+        key_rates = {self.config.get(key, key) if key.endswith("_key") else key: rate
+                     for key, rate in key_rates.items()}
+        self.pacer = PacedInput(self.input, self.clock, self.config["input_rate"], self.config["input_burst"],
+                                key_rates)
+        self.input = self.pacer
+    
+    def report_pacing(self):
+        """Log how often key presses were held back for the rate limits"""
+        stats = self.pacer.stats()
+        if stats["throttled"]:
+            self.logger.info("Paced {throttled} of {presses} key presses, {delay:.0f} ms added "
+                             "(longest {max_delay:.1f} ms)", throttled=stats["throttled"], presses=stats["presses"], delay=stats["delay"],
+                             max_delay=stats["max_delay"])
+    
+    def dump_trace(self):
+        """Write the spans recorded since the last dump to a new trace file"""
+        path = trace_path(self.file_name())
+        try:
+            count = self.tracer.dump(path)
+        except OSError as e:
+            self.logger.error("Could not write trace: {error}", error=e)
+            return
+        if count:
+            self.logger.info("Wrote {count} trace spans to {path}", count=count, path=path)
+    
+    def toggle_sampler(self):
+        """Sample the automation thread's stack for sampler_window, or end a sampling in progress early"""
+        if self.sampler is not None and self.sampler.running:
+            self.sampler.stop()
+            return
+        if self.automation_thread is None:
+            self.logger.warning("Nothing to sample, the automation is not running")
+            return
+        
+        self.sampler = StackSampler(
+            self.automation_thread,
+            samples_path(self.file_name()),
+            window=self.config["sampler_window"] / 1000,
+            on_done=self.sampler_done
+        ).start()
+        self.logger.info("Sampling the automation thread's stack for {window}s", window=self.config["sampler_window"] / 1000)
+    
+    def sampler_done(self, sampler):
+        """Report finished stack samples (called from the sampler's thread)"""
+        if sampler.error is not None:
+            self.logger.error("Could not write stack samples: {error}", error=sampler.error)
+        else:
+            self.logger.info("Wrote {samples} stack samples to {path}", samples=sampler.samples, path=sampler.path)
+    
+    def abort(self, reason="stopped"):
+        """Stop the run immediately, waking the automation thread from any sleep"""
+        self.running = False
+        self.clock.abort(reason)
+    
+    def start_watchdog(self):
+        """Start watching the game process for exits and hangs"""
+        if not self.config["watchdog"]:
+            return
+        
+        self.watchdog = ProcessWatchdog.for_name(
+            self.config["game_process"],
+            self.abort,
+            sample_interval=self.config["watchdog_interval"] / 1000,
+            hang_timeout=self.config["hang_timeout"] / 1000,
+            logger=self.logger
+        )
+        if self.watchdog is not None:
+            self.watchdog.start()
+    
+    def stop_watchdog(self):
+        """Stop the game process watchdog"""
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            self.watchdog = None
@@ -8,14 +8,13 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                            QHBoxLayout, QPushButton, QLabel, QListWidget, 
                            QTabWidget, QFormLayout, QLineEdit, QMessageBox,
                            QToolTip, QGroupBox, QScrollArea, QFrame, QSplitter,
-                           QDialog)
-from PyQt5.QtCore import Qt, QSize, pyqtSlot
+                           QDialog, QComboBox, QInputDialog)
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSlot
 from PyQt5.QtGui import QFont, QIcon, QKeyEvent, QMouseEvent
 
-# Import the script classes
-from PrimaryAltWestTek import PrimaryWestTek
-from TimedRunWestTek import TimedRunWestTek
-from AltWestTek import Alt
+# Routine modules are imported from the registry only when a script is started
+import RoutineFactory
+from ProfileStore import ProfileStore
 
 # Custom LineEdit for capturing key/mouse presses
 class KeyCaptureLineEdit(QLineEdit):
@@ -127,24 +126,27 @@ class MasterControllerGUI(QMainWindow):
         super().__init__()
         
         # Initialize configuration storage
-        self.config_folder = os.path.join(os.path.expanduser("~"), "Documents", "WestTekAuto")
-        self.primary_config_file = os.path.join(self.config_folder, "primary_config.json")
-        self.timed_run_config_file = os.path.join(self.config_folder, "timed_run_config.json")
-        self.alt_config_file = os.path.join(self.config_folder, "alt_config.json")
+        self.config_folder = RoutineFactory.CONFIG_FOLDER
+        self.profile_db_file = os.path.join(self.config_folder, "profiles.db")
+        self.detector_file = os.path.join(self.config_folder, "detector.json")
+        
+        # Built-in and plugin routines (metadata only)
+        self.routines = RoutineFactory.available_routines()
+        self.routine_names = list(self.routines)
         
         # Create default configurations
-        self.primary_config = self.get_default_primary_config()
-        self.timed_run_config = self.get_default_timed_run_config()
-        self.alt_config = self.get_default_alt_config()
+        self.configs = self.default_configs()
         
         # Ensure config folder exists and load configs
         self.ensure_config_folder()
         self.load_configs()
         
-        # Initialize script instances (will be created when needed)
-        self.primary_westek = None
-        self.timed_run_westek = None
-        self.alt_westek = None
+        # Open the named profile store
+        self.profile_store = ProfileStore(self.profile_db_file)
+        self.current_profile = None
+        
+        # Script instance (created when started)
+        self.routine = None
         
         # Keep track of running script
         self.current_script = None
@@ -153,6 +155,10 @@ class MasterControllerGUI(QMainWindow):
         # Setup UI
         self.init_ui()
         
+        if RoutineFactory.discovery_errors:
+            QMessageBox.warning(self, "Plugin Error", "Some routine plugins could not be loaded:\n" +
+                                "\n".join(RoutineFactory.discovery_errors))
+        
     def init_ui(self):
         """Initialize the user interface"""
         self.setWindowTitle("WestTek Automation Controller")
@@ -177,11 +183,40 @@ class MasterControllerGUI(QMainWindow):
         desc_label.setFont(QFont("Arial", 10))
         main_layout.addWidget(desc_label)
         
+        # Profile selector
+        profile_layout = QHBoxLayout()
+        profile_label = QLabel("Profile:")
+        profile_label.setFont(QFont("Arial", 10))
+        profile_layout.addWidget(profile_label)
+        
+        self.profile_combo = QComboBox()
+        self.profile_combo.setFont(QFont("Arial", 10))
+        self.profile_combo.setMinimumWidth(250)
+        profile_layout.addWidget(self.profile_combo, 1)
+        
+        self.save_profile_button = QPushButton("Save As...")
+        self.save_profile_button.setToolTip("Save the current settings as a named profile")
+        self.save_profile_button.clicked.connect(self.save_profile_as)
+        profile_layout.addWidget(self.save_profile_button)
+        
+        self.delete_profile_button = QPushButton("Delete")
+        self.delete_profile_button.setToolTip("Delete the selected profile")
+        self.delete_profile_button.clicked.connect(self.delete_profile)
+        profile_layout.addWidget(self.delete_profile_button)
+        
+        main_layout.addLayout(profile_layout)
+        
+        self.refresh_profiles()
+        self.profile_combo.currentIndexChanged.connect(self.switch_profile)
+        
         # Script list
         self.script_list = QListWidget()
-        self.script_list.addItem("PrimaryAltWestTek (For Main Character with AFK Player)")
-        self.script_list.addItem("AltWestTek (For AFK Players)")        
-        self.script_list.addItem("TimedRun (For Single Player)")
+        for name in self.routine_names:
+            info = self.routines[name]
+            if info.get("subtitle"):
+                self.script_list.addItem(f"{info['title']} ({info['subtitle']})")
+            else:
+                self.script_list.addItem(info["title"])
         self.script_list.setFont(QFont("Arial", 12))
         main_layout.addWidget(self.script_list)
         
@@ -211,6 +246,14 @@ class MasterControllerGUI(QMainWindow):
         self.stop_button.setEnabled(False)
         button_layout.addWidget(self.stop_button)
         
+        # Stack sampler button
+        self.sampler_button = QPushButton("Sample Stacks")
+        self.sampler_button.setFont(QFont("Arial", 12))
+        self.sampler_button.setToolTip("Sample the running automation's stack for its sampler window")
+        self.sampler_button.clicked.connect(self.sample_running_script)
+        self.sampler_button.setEnabled(False)
+        button_layout.addWidget(self.sampler_button)
+        
         # Settings button
         self.settings_button = QPushButton("Settings")
         self.settings_button.setFont(QFont("Arial", 12))
@@ -233,14 +276,8 @@ class MasterControllerGUI(QMainWindow):
     
     def update_script_description(self, index):
         """Update the script description based on selection"""
-        descriptions = [
-            "PrimaryAltWestTek is for your main character with AFK players. It handles shooting, OPK toggling, and elevator usage.",
-            "AltWestTek is designed for AFK players. It performs automated movement patterns and key presses to keep your character active.",
-            "TimedRun is optimized for single player mode. It focuses on efficient shooting and movement without waiting for other players."
-        ]
-        
-        if 0 <= index < len(descriptions):
-            self.script_desc.setText(descriptions[index])
+        if 0 <= index < len(self.routine_names):
+            self.script_desc.setText(self.routines[self.routine_names[index]].get("description", ""))
     
     def ensure_config_folder(self):
         """Create config folder if it doesn't exist"""
@@ -248,151 +285,93 @@ class MasterControllerGUI(QMainWindow):
             os.makedirs(self.config_folder)
             self.save_configs()  # Save default configs
     
+    def default_configs(self):
+        """Every routine's default configuration by routine name"""
+        return {name: RoutineFactory.default_config(name) for name in self.routine_names}
+    
     def load_configs(self):
         """Load configurations from files"""
         try:
-            if os.path.exists(self.primary_config_file):
-                with open(self.primary_config_file, 'r') as f:
-                    loaded_config = json.load(f)
-                    # Update only existing keys to handle new config options in future versions
-                    for key in loaded_config:
-                        if key in self.primary_config:
-                            self.primary_config[key] = loaded_config[key]
-            
-            if os.path.exists(self.timed_run_config_file):
-                with open(self.timed_run_config_file, 'r') as f:
-                    loaded_config = json.load(f)
-                    for key in loaded_config:
-                        if key in self.timed_run_config:
-                            self.timed_run_config[key] = loaded_config[key]
-            
-            if os.path.exists(self.alt_config_file):
-                with open(self.alt_config_file, 'r') as f:
-                    loaded_config = json.load(f)
-                    for key in loaded_config:
-                        if key in self.alt_config:
-                            self.alt_config[key] = loaded_config[key]
+            for name, config in self.configs.items():
+                config_file = os.path.join(self.config_folder, self.routines[name]["config_file"])
+                if os.path.exists(config_file):
+                    with open(config_file, 'r') as f:
+                        # Update only existing keys to handle new config options in future versions
+                        RoutineFactory.merge_config(config, json.load(f))
         except Exception as e:
             QMessageBox.warning(self, "Configuration Error", 
                               f"Error loading configurations: {str(e)}\nDefault configurations will be used.")
             # Reset to defaults if there's an error
-            self.primary_config = self.get_default_primary_config()
-            self.timed_run_config = self.get_default_timed_run_config()
-            self.alt_config = self.get_default_alt_config()
+            self.configs = self.default_configs()
             self.save_configs()
     
     def save_configs(self):
         """Save configurations to files"""
         try:
-            with open(self.primary_config_file, 'w') as f:
-                json.dump(self.primary_config, f, indent=2)
-            
-            with open(self.timed_run_config_file, 'w') as f:
-                json.dump(self.timed_run_config, f, indent=2)
-            
-            with open(self.alt_config_file, 'w') as f:
-                json.dump(self.alt_config, f, indent=2)
+            for name, config in self.configs.items():
+                with open(os.path.join(self.config_folder, self.routines[name]["config_file"]), 'w') as f:
+                    json.dump(config, f, indent=2)
         except Exception as e:
             QMessageBox.critical(self, "Save Error", f"Could not save configurations: {str(e)}")
     
-    def get_default_primary_config(self):
-        """Get default configuration for PrimaryAltWestTek"""
-        return {
-            # Random timing values
-            "shot_min_time": 63,
-            "shot_max_time": 88,
-            "quick_min_time": 50,
-            "quick_max_time": 150,
-            "shot_wait_min": 100,
-            "shot_wait_max": 105,
-            "slow_min_time": 1000,
-            "slow_max_time": 1500,
-            "load_screen_min": 10000,
-            "load_screen_max": 12000,
-            "elevator_reset_min": 8000,
-            "elevator_reset_max": 12000,
-            
-            # Shooting config
-            "shots": 60,
-            "wait_time": 60000,  # 60 seconds in milliseconds
-            
-            # Keys
-            "shoot_key": "left mouse",
-            "right_key": "d",
-            "sprint_key": "left shift",
-            "crouch_key": "left ctrl",
-            "use_key": "e",
-            "opk_enable1": "numpad1",
-            "opk_enable2": "numpad2",
-            
-            # Hotkeys
-            "pause_hotkey": "f1",
-            "exit_hotkey": "f2",
-            "start_hotkey": "f3",
-            "reload_hotkey": "f4",
-            
-            # Process
-            "game_process": "Fallout76.exe"
-        }
+    def refresh_profiles(self):
+        """Fill the profile selector from the profile store"""
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        self.profile_combo.addItem("(Current settings)")
+        self.profile_combo.addItems(self.profile_store.list_profiles())
+        if self.current_profile is not None:
+            self.profile_combo.setCurrentText(self.current_profile)
+        self.profile_combo.blockSignals(False)
+        self.delete_profile_button.setEnabled(self.current_profile is not None)
     
-    def get_default_timed_run_config(self):
-        """Get default configuration for TimedRunWestekAFKSingleShotStealth"""
-        return {
-            # Random timing values
-            "shot_min_time": 63,
-            "shot_max_time": 88,
-            "quick_min_time": 50,
-            "quick_max_time": 150,
-            "shot_wait_min": 100,
-            "shot_wait_max": 105,
-            "slow_min_time": 1000,
-            "slow_max_time": 1500,
-            "load_screen_min": 10000,
-            "load_screen_max": 12000,
-            "elevator_reset_min": 8000,
-            "elevator_reset_max": 12000,
-            
-            # Shooting config
-            "shots": 60,
-            "wait_time": 60000,  # 60 seconds in milliseconds
-            
-            # Keys
-            "shoot_key": "left mouse",
-            "right_key": "d",
-            "sprint_key": "left shift",
-            "crouch_key": "left ctrl",
-            "use_key": "e",
-            "opk_enable1": "numpad1",
-            "opk_enable2": "numpad2",
-            
-            # Hotkeys
-            "pause_hotkey": "f1",
-            "exit_hotkey": "f2",
-            "start_hotkey": "f3",
-            "reload_hotkey": "f4",
-            
-            # Process
-            "game_process": "Fallout76.exe"
-        }
+    def switch_profile(self, index):
+        """Switch the active configurations to the selected profile"""
+        if index <= 0:
+            # Back to the saved configurations, dropping the profile's values
+            self.current_profile = None
+            self.configs = self.default_configs()
+            self.load_configs()
+            self.delete_profile_button.setEnabled(False)
+            self.status_label.setText("Profile: (Current settings)")
+            return
+        
+        name = self.profile_combo.itemText(index)
+        loaded_configs = self.profile_store.load_profile(name)
+        
+        # Start from defaults so profiles saved by older versions pick up new options
+        self.configs = {routine_name: RoutineFactory.merge_config(config, loaded_configs.get(routine_name))
+                        for routine_name, config in self.default_configs().items()}
+        
+        self.current_profile = name
+        self.delete_profile_button.setEnabled(True)
+        self.status_label.setText(f"Profile: {name}")
     
-    def get_default_alt_config(self):
-        """Get default configuration for AltWestTek"""
-        return {
-            "walk_min_time": 63,
-            "walk_max_time": 88,
-            "sleep_min_time": 80,
-            "sleep_max_time": 100,
-            "walk_cycles": 8,
-            "wait_time": 60000,  # 60 seconds in milliseconds
-            "action_key": "e",
-            "action_press_time": 60,  # in milliseconds
-            "action_cycles": 15,
-            "backward_key": "s",
-            "right_key": "d",
-            "start_hotkey": "f3",
-            "stop_hotkey": "f2",
-            "game_process": "Fallout76.exe"
-        }
+    def save_profile_as(self):
+        """Save the current configurations under a profile name"""
+        name, ok = QInputDialog.getText(self, "Save Profile", "Profile name:",
+                                        text=self.current_profile or "")
+        name = name.strip()
+        if not ok or not name:
+            return
+        
+        self.profile_store.save_profile(name, self.configs)
+        self.current_profile = name
+        self.refresh_profiles()
+    
+    def delete_profile(self):
+        """Delete the selected profile from the profile store"""
+        if self.current_profile is None:
+            return
+        
+        reply = QMessageBox.question(self, "Delete Profile",
+                                     f"Delete profile '{self.current_profile}'?")
+        if reply != QMessageBox.Yes:
+            return
+        
+        self.profile_store.delete_profile(self.current_profile)
+        self.current_profile = None
+        self.refresh_profiles()
     
     def start_selected_script(self):
         """Start the selected script"""
@@ -402,59 +381,59 @@ class MasterControllerGUI(QMainWindow):
             return
         
         selected_row = self.script_list.currentRow()
+        if not 0 <= selected_row < len(self.routine_names):
+            return
         
-        if selected_row == 0:  # PrimaryAltWestTek
-            self.primary_westek = PrimaryWestTek(self.primary_config)
-            self.current_script = "primary"
-            self.status_label.setText("Running: PrimaryAltWestTek")
-            
-            # Start in a separate thread
-            self.script_thread = threading.Thread(target=self.primary_westek.run)
-            self.script_thread.daemon = True
-            self.script_thread.start()
-        
-        elif selected_row == 1:  # AltWestTek
-            self.alt_westek = Alt(self.alt_config)
-            self.current_script = "alt"
-            self.status_label.setText("Running: AltWestTek")
-            
-            # Start in a separate thread
-            self.script_thread = threading.Thread(target=self.alt_westek.run)
-            self.script_thread.daemon = True
-            self.script_thread.start()
-                
-        elif selected_row == 2:  # TimedRun
-            self.timed_run_westek = TimedRunWestTek(self.timed_run_config)
-            self.current_script = "timed_run"
-            self.status_label.setText("Running: TimedRun")
-            
-            # Start in a separate thread
-            self.script_thread = threading.Thread(target=self.timed_run_westek.run)
-            self.script_thread.daemon = True
-            self.script_thread.start()
+        name = self.routine_names[selected_row]
+        info = self.routines[name]
+        kwargs = {"detector": self.create_detector()} if info.get("detector") else {}
+        try:
+            # Imports the routine's module the first time it is started
+            self.routine = RoutineFactory.create_routine(name, self.configs[name], **kwargs)
+        except Exception as e:
+            QMessageBox.critical(self, "Start Error", f"Could not start {info['title']}: {str(e)}")
+            return
+        
+        self.current_script = name
+        self.status_label.setText(f"Running: {info['title']}")
+        
+        # Start in a separate thread
+        self.script_thread = threading.Thread(target=self.routine.run)
+        self.script_thread.daemon = True
+        self.script_thread.start()
         
         # Update button states
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
+        self.sampler_button.setEnabled(True)
         self.settings_button.setEnabled(False)
         self.script_list.setEnabled(False)
+        self.profile_combo.setEnabled(False)
         
         # Start monitoring thread
         self.monitor_thread = threading.Thread(target=self.monitor_script)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
     
+    def create_detector(self):
+        """Create the screen state detector when a probe file is configured"""
+        if not os.path.exists(self.detector_file):
+            return None
+        
+        try:
+            # Imported here so NumPy is only loaded when detection is used
+            from GameStateDetector import load_detector
+            return load_detector(self.detector_file)
+        except Exception as e:
+            QMessageBox.warning(self, "Detector Error",
+                              f"Error loading {self.detector_file}: {str(e)}\nRunning without screen detection.")
+            return None
+    
     def stop_running_script(self):
         """Stop the currently running script"""
-        if self.current_script == "alt" and self.alt_westek:
-            self.alt_westek.running = False
-            self.alt_westek.unregister_hotkeys()
-        elif self.current_script == "primary" and self.primary_westek:
-            self.primary_westek.running = False
-            self.primary_westek.unregister_hotkeys()
-        elif self.current_script == "timed_run" and self.timed_run_westek:
-            self.timed_run_westek.running = False
-            self.timed_run_westek.unregister_hotkeys()
+        if self.current_script is not None and self.routine:
+            self.routine.abort()
+            self.routine.unregister_hotkeys()
         
         self.status_label.setText("Stopped")
         self.current_script = None
@@ -462,8 +441,19 @@ class MasterControllerGUI(QMainWindow):
         # Update button states
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
+        self.sampler_button.setEnabled(False)
         self.settings_button.setEnabled(True)
         self.script_list.setEnabled(True)
+        self.profile_combo.setEnabled(True)
+    
+    def sample_running_script(self):
+        """Sample the running script's automation thread, or stop a sampling in progress"""
+        if self.current_script is None or not self.routine or not hasattr(self.routine, "toggle_sampler"):
+            return
+        if self.routine.automation_thread is None:
+            QMessageBox.information(self, "Sample Stacks", "Start the automation (its start hotkey) before sampling.")
+            return
+        self.routine.toggle_sampler()
     
     def monitor_script(self):
         """Monitor the running script thread"""
@@ -476,22 +466,27 @@ class MasterControllerGUI(QMainWindow):
                 self.status_label.setText("Script finished")
                 self.start_button.setEnabled(True)
                 self.stop_button.setEnabled(False)
+                self.sampler_button.setEnabled(False)
                 self.settings_button.setEnabled(True)
                 self.script_list.setEnabled(True)
+                self.profile_combo.setEnabled(True)
                 break
             time.sleep(1)
     
     def open_settings(self):
         """Open the settings dialog"""
-        self.settings_dialog = SettingsDialog(self, self.primary_config, self.timed_run_config, self.alt_config)
+        self.settings_dialog = SettingsDialog(self, self.configs)
         result = self.settings_dialog.exec_()
         
         if result:
             # Save updated configurations
-            self.primary_config = self.settings_dialog.primary_config
-            self.timed_run_config = self.settings_dialog.timed_run_config
-            self.alt_config = self.settings_dialog.alt_config
-            self.save_configs()
+            self.configs = self.settings_dialog.configs
+            
+            # Edits to a selected profile stay in that profile, the saved configurations are left alone
+            if self.current_profile is not None:
+                self.profile_store.save_profile(self.current_profile, self.configs)
+            else:
+                self.save_configs()
     
     def closeEvent(self, event):
         """Handle the window close event"""
@@ -499,23 +494,23 @@ class MasterControllerGUI(QMainWindow):
         if self.current_script is not None:
             self.stop_running_script()
         
+        self.profile_store.close()
+        
         # Accept the close event
         event.accept()
 
 
 class SettingsDialog(QDialog):
-    def __init__(self, parent, primary_config, timed_run_config, alt_config):
+    def __init__(self, parent, configs):
         super().__init__(parent)
         
         # Store configurations
-        self.primary_config = primary_config.copy()
-        self.timed_run_config = timed_run_config.copy()
-        self.alt_config = alt_config.copy()
+        self.configs = {name: config.copy() for name, config in configs.items()}
+        self.routines = parent.routines
         
-        # Default configurations for resetting
-        self.default_primary_config = parent.get_default_primary_config()
-        self.default_timed_run_config = parent.get_default_timed_run_config()
-        self.default_alt_config = parent.get_default_alt_config()
+        # Defaults (for resetting), tooltips, labels and groups of each routine's settings
+        self.schemas = {name: RoutineFactory.settings_schema(name) for name in self.configs}
+        self.fields = {}
         
         # Initialize UI
         self.init_ui()
@@ -533,9 +528,8 @@ class SettingsDialog(QDialog):
         self.tab_widget = QTabWidget()
         
         # Create tabs for each script
-        self.create_primary_tab()
-        self.create_timed_run_tab()
-        self.create_alt_tab()
+        for name in self.configs:
+            self.create_routine_tab(name)
         
         main_layout.addWidget(self.tab_widget)
         
@@ -556,583 +550,122 @@ class SettingsDialog(QDialog):
         
         main_layout.addLayout(button_layout)
     
-    def create_primary_tab(self):
-        """Create the PrimaryAltWestTek settings tab"""
+    def create_routine_tab(self, name):
+        """Create a routine's settings tab from its config schema"""
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
         
         container = QWidget()
         layout = QVBoxLayout(container)
         
-        # Dictionary of field descriptions (tooltips)
-        tooltips = {
-            "shot_min_time": "Minimum time to hold down the shoot button (in milliseconds)",
-            "shot_max_time": "Maximum time to hold down the shoot button (in milliseconds)",
-            "quick_min_time": "Minimum time for quick actions (in milliseconds)",
-            "quick_max_time": "Maximum time for quick actions (in milliseconds)",
-            "shot_wait_min": "Minimum wait time between shots (in milliseconds)",
-            "shot_wait_max": "Maximum wait time between shots (in milliseconds)",
-            "slow_min_time": "Minimum time for slow actions (in milliseconds)",
-            "slow_max_time": "Maximum time for slow actions (in milliseconds)",
-            "load_screen_min": "Minimum wait time for load screens (in milliseconds)",
-            "load_screen_max": "Maximum wait time for load screens (in milliseconds)",
-            "elevator_reset_min": "Not used (in milliseconds)",
-            "elevator_reset_max": "Not used (in milliseconds)",
-            "shots": "Number of shots to fire in sequence",
-            "wait_time": "Has to be above 1 minute for respawn to happen  (in milliseconds)",
-            "shoot_key": "Key to use for shooting",
-            "right_key": "Key to use for right movement",
-            "sprint_key": "Key to use for sprinting",
-            "crouch_key": "Key to use for crouching",
-            "use_key": "Key to use for interactions",
-            "opk_enable1": "First key for OPK sequence",
-            "opk_enable2": "Second key for OPK sequence",
-            "pause_hotkey": "Hotkey to pause the script",
-            "exit_hotkey": "Hotkey to exit the script",
-            "start_hotkey": "Hotkey to start the script",
-            "reload_hotkey": "Hotkey to reload the script",
-            "game_process": "Process name to monitor for the game"
-        }
-        
-        # Create fields for settings
-        self.primary_fields = {}
-        
-        # Helper method to create field with reset button
-        def create_field_with_reset(key, label_text, is_key_field=False):
-            field_layout = QHBoxLayout()
-            
-            # Create line edit or key capture edit based on the field type
-            if is_key_field:
-                line_edit = KeyCaptureLineEdit()
-                line_edit.setText(str(self.primary_config[key]))
-            else:
-                line_edit = QLineEdit(str(self.primary_config[key]))
-                
-            line_edit.setToolTip(tooltips.get(key, ""))
-            field_layout.addWidget(line_edit)
-            
-            # Create reset button
-            reset_button = QPushButton("↺")
-            reset_button.setToolTip(f"Set {key} to default")
-            reset_button.setMaximumWidth(30)
-            reset_button.clicked.connect(lambda: self.reset_field(line_edit, key, "primary"))
-            field_layout.addWidget(reset_button)
-            
-            # Store field reference
-            self.primary_fields[key] = line_edit
-            
-            return label_text, field_layout
-        
-        # Timing settings
-        timing_group = QGroupBox("Timing Settings")
-        timing_layout = QFormLayout()
-        
-        # Create timing fields
-        label, layout_widget = create_field_with_reset("shot_min_time", "Shot Min Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("shot_max_time", "Shot Max Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("quick_min_time", "Quick Min Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("quick_max_time", "Quick Max Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("shot_wait_min", "Shot Wait Min:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("shot_wait_max", "Shot Wait Max:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("slow_min_time", "Slow Min Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("slow_max_time", "Slow Max Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("load_screen_min", "Load Screen Min:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("load_screen_max", "Load Screen Max:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("elevator_reset_min", "Elevator Reset Min:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("elevator_reset_max", "Elevator Reset Max:")
-        timing_layout.addRow(label, layout_widget)
-        
-        timing_group.setLayout(timing_layout)
-        layout.addWidget(timing_group)
+        schema = self.schemas[name]
+        config = self.configs[name]
+        fields = self.fields.setdefault(name, {})
         
-        # Config settings
-        config_group = QGroupBox("Config Settings")
-        config_layout = QFormLayout()
-        
-        # Create config fields
-        label, layout_widget = create_field_with_reset("shots", "Number of Shots:")
-        config_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("wait_time", "Wait Time (ms):")
-        config_layout.addRow(label, layout_widget)
-        
-        config_group.setLayout(config_layout)
-        layout.addWidget(config_group)
-        
-        # Key settings
-        key_group = QGroupBox("Key Settings")
-        key_layout = QFormLayout()
-        
-        # Create key fields with key capture
-        label, layout_widget = create_field_with_reset("shoot_key", "Shoot Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("right_key", "Right Movement Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("sprint_key", "Sprint Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("crouch_key", "Crouch Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("use_key", "Use/Interact Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("opk_enable1", "OPK Enable Key 1:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("opk_enable2", "OPK Enable Key 2:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        key_group.setLayout(key_layout)
-        layout.addWidget(key_group)
-        
-        # Hotkey settings
-        hotkey_group = QGroupBox("Hotkey Settings")
-        hotkey_layout = QFormLayout()
-        
-        # Create hotkey fields with key capture
-        label, layout_widget = create_field_with_reset("pause_hotkey", "Pause Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("exit_hotkey", "Exit Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("start_hotkey", "Start Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("reload_hotkey", "Reload Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        hotkey_group.setLayout(hotkey_layout)
-        layout.addWidget(hotkey_group)
-        
-        # Process settings
-        process_group = QGroupBox("Process Settings")
-        process_layout = QFormLayout()
-        
-        # Create process fields
-        label, layout_widget = create_field_with_reset("game_process", "Game Process Name:")
-        process_layout.addRow(label, layout_widget)
-        
-        process_group.setLayout(process_layout)
-        layout.addWidget(process_group)
-        
-        scroll_area.setWidget(container)
-        self.tab_widget.addTab(scroll_area, "PrimaryAltWestTek")
-    
-    def create_timed_run_tab(self):
-        """Create the TimedRunWestekAFKSingleShotStealth settings tab"""
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        
-        container = QWidget()
-        layout = QVBoxLayout(container)
-        
-        # Dictionary of field descriptions (tooltips)
-        tooltips = {
-            "shot_min_time": "Minimum time to hold down the shoot button (in milliseconds)",
-            "shot_max_time": "Maximum time to hold down the shoot button (in milliseconds)",
-            "quick_min_time": "Minimum time for quick actions (in milliseconds)",
-            "quick_max_time": "Maximum time for quick actions (in milliseconds)",
-            "shot_wait_min": "Minimum wait time between shots (in milliseconds)",
-            "shot_wait_max": "Maximum wait time between shots (in milliseconds)",
-            "slow_min_time": "Minimum time for slow actions (in milliseconds)",
-            "slow_max_time": "Maximum time for slow actions (in milliseconds)",
-            "load_screen_min": "Minimum wait time for load screens (in milliseconds)",
-            "load_screen_max": "Maximum wait time for load screens (in milliseconds)",
-            "elevator_reset_min": "Not used (in milliseconds)",
-            "elevator_reset_max": "Not used (in milliseconds)",
-            "shots": "Number of shots to fire in sequence",
-            "wait_time": "Has to be above 1 minute for respawn to happen (in milliseconds)",
-            "shoot_key": "Key to use for shooting",
-            "right_key": "Key to use for right movement",
-            "sprint_key": "Key to use for sprinting",
-            "crouch_key": "Key to use for crouching",
-            "use_key": "Key to use for interactions",
-            "opk_enable1": "First key for OPK sequence",
-            "opk_enable2": "Second key for OPK sequence",
-            "pause_hotkey": "Hotkey to pause the script",
-            "exit_hotkey": "Hotkey to exit the script",
-            "start_hotkey": "Hotkey to start the script",
-            "reload_hotkey": "Hotkey to reload the script",
-            "game_process": "Process name to monitor for the game"
-        }
-        
-        # Create fields for settings
-        self.timed_run_fields = {}
-        
-        # Helper method to create field with reset button
-        def create_field_with_reset(key, label_text, is_key_field=False):
-            field_layout = QHBoxLayout()
+        for title, keys in schema["groups"]:
+            group = QGroupBox(title)
+            group_layout = QFormLayout()
             
-            # Create line edit or key capture edit based on the field type
-            if is_key_field:
-                line_edit = KeyCaptureLineEdit()
-                line_edit.setText(str(self.timed_run_config[key]))
-            else:
-                line_edit = QLineEdit(str(self.timed_run_config[key]))
+            for key in keys:
+                field_layout = QHBoxLayout()
                 
-            line_edit.setToolTip(tooltips.get(key, ""))
-            field_layout.addWidget(line_edit)
-            
-            # Create reset button
-            reset_button = QPushButton("↺")
-            reset_button.setToolTip(f"Set {key} to default")
-            reset_button.setMaximumWidth(30)
-            reset_button.clicked.connect(lambda: self.reset_field(line_edit, key, "timed_run"))
-            field_layout.addWidget(reset_button)
-            
-            # Store field reference
-            self.timed_run_fields[key] = line_edit
+                # Keys and hotkeys get the key capture field
+                if key.endswith("_key") or key.endswith("_hotkey") or key in schema["key_fields"]:
+                    line_edit = KeyCaptureLineEdit()
+                    line_edit.setText(str(config[key]))
+                else:
+                    line_edit = QLineEdit(str(config[key]))
+                line_edit.setToolTip(schema["tooltips"].get(key, ""))
+                field_layout.addWidget(line_edit)
+                
+                # Create reset button
+                reset_button = QPushButton("↺")
+                reset_button.setToolTip(f"Set {key} to default")
+                reset_button.setMaximumWidth(30)
+                reset_button.clicked.connect(lambda _, e=line_edit, k=key: self.reset_field(e, k, name))
+                field_layout.addWidget(reset_button)
+                
+                fields[key] = line_edit
+                group_layout.addRow(schema["labels"].get(key, key.replace("_", " ").title() + ":"), field_layout)
             
-            return label_text, field_layout
-        
-        # Timing settings
-        timing_group = QGroupBox("Timing Settings")
-        timing_layout = QFormLayout()
-        
-        # Create timing fields
-        label, layout_widget = create_field_with_reset("shot_min_time", "Shot Min Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("shot_max_time", "Shot Max Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("quick_min_time", "Quick Min Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("quick_max_time", "Quick Max Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("shot_wait_min", "Shot Wait Min:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("shot_wait_max", "Shot Wait Max:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("slow_min_time", "Slow Min Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("slow_max_time", "Slow Max Time:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("load_screen_min", "Load Screen Min:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("load_screen_max", "Load Screen Max:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("elevator_reset_min", "Elevator Reset Min:")
-        timing_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("elevator_reset_max", "Elevator Reset Max:")
-        timing_layout.addRow(label, layout_widget)
-        
-        timing_group.setLayout(timing_layout)
-        layout.addWidget(timing_group)
-        
-        # Config settings
-        config_group = QGroupBox("Config Settings")
-        config_layout = QFormLayout()
+            group.setLayout(group_layout)
+            layout.addWidget(group)
         
-        # Create config fields
-        label, layout_widget = create_field_with_reset("shots", "Number of Shots:")
-        config_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("wait_time", "Wait Time (ms):")
-        config_layout.addRow(label, layout_widget)
-        
-        config_group.setLayout(config_layout)
-        layout.addWidget(config_group)
-        
-        # Key settings
-        key_group = QGroupBox("Key Settings")
-        key_layout = QFormLayout()
-        
-        # Create key fields with key capture
-        label, layout_widget = create_field_with_reset("shoot_key", "Shoot Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("right_key", "Right Movement Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("sprint_key", "Sprint Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("crouch_key", "Crouch Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("use_key", "Use/Interact Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("opk_enable1", "OPK Enable Key 1:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("opk_enable2", "OPK Enable Key 2:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        key_group.setLayout(key_layout)
-        layout.addWidget(key_group)
-        
-        # Hotkey settings
-        hotkey_group = QGroupBox("Hotkey Settings")
-        hotkey_layout = QFormLayout()
-        
-        # Create hotkey fields with key capture
-        label, layout_widget = create_field_with_reset("pause_hotkey", "Pause Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("exit_hotkey", "Exit Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("start_hotkey", "Start Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("reload_hotkey", "Reload Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        hotkey_group.setLayout(hotkey_layout)
-        layout.addWidget(hotkey_group)
-        
-        # Process settings
-        process_group = QGroupBox("Process Settings")
-        process_layout = QFormLayout()
-        
-        # Create process fields
-        label, layout_widget = create_field_with_reset("game_process", "Game Process Name:")
-        process_layout.addRow(label, layout_widget)
-        
-        process_group.setLayout(process_layout)
-        layout.addWidget(process_group)
+        # Throughput of the values being edited, for the routines with a timing model
+        if name in RoutineFactory.ROUTINES:
+            self.add_throughput_preview(layout, name, fields, config)
         
         scroll_area.setWidget(container)
-        self.tab_widget.addTab(scroll_area, "TimedRun")
+        self.tab_widget.addTab(scroll_area, self.routines[name]["title"])
     
-    def create_alt_tab(self):
-        """Create the AltWestTek settings tab"""
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        
-        container = QWidget()
-        layout = QVBoxLayout(container)
-        
-        # Dictionary of field descriptions (tooltips)
-        tooltips = {
-            "walk_min_time": "Minimum walking time in milliseconds",
-            "walk_max_time": "Maximum walking time in milliseconds",
-            "sleep_min_time": "Minimum sleep time in milliseconds",
-            "sleep_max_time": "Maximum sleep time in milliseconds",
-            "walk_cycles": "Number of walking cycles to perform",
-            "wait_time": "Has to be above 1 minute for respawn to happen (in milliseconds)",
-            "action_key": "Key to press for interactions",
-            "action_press_time": "Time to hold the action key (in milliseconds)",
-            "action_cycles": "Number of times to press the action key",
-            "backward_key": "Key to use for backward movement",
-            "right_key": "Key to use for right movement",
-            "start_hotkey": "Hotkey to start the script",
-            "stop_hotkey": "Hotkey to stop the script",
-            "game_process": "Process name to monitor for the game"
-        }
-        
-        # Create fields for settings
-        self.alt_fields = {}
-        
-        # Helper method to create field with reset button
-        def create_field_with_reset(key, label_text, is_key_field=False):
-            field_layout = QHBoxLayout()
-            
-            # Create line edit or key capture edit based on the field type
-            if is_key_field:
-                line_edit = KeyCaptureLineEdit()
-                line_edit.setText(str(self.alt_config[key]))
-            else:
-                line_edit = QLineEdit(str(self.alt_config[key]))
-                
-            line_edit.setToolTip(tooltips.get(key, ""))
-            field_layout.addWidget(line_edit)
-            
-            # Create reset button
-            reset_button = QPushButton("↺")
-            reset_button.setToolTip(f"Set {key} to default")
-            reset_button.setMaximumWidth(30)
-            reset_button.clicked.connect(lambda: self.reset_field(line_edit, key, "alt"))
-            field_layout.addWidget(reset_button)
-            
-            # Store field reference
-            self.alt_fields[key] = line_edit
-            
-            return label_text, field_layout
-        
-        # Movement settings
-        movement_group = QGroupBox("Movement Settings")
-        movement_layout = QFormLayout()
-        
-        # Create movement fields
-        label, layout_widget = create_field_with_reset("walk_min_time", "Walk Min Time:")
-        movement_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("walk_max_time", "Walk Max Time:")
-        movement_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("sleep_min_time", "Sleep Min Time:")
-        movement_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("sleep_max_time", "Sleep Max Time:")
-        movement_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("walk_cycles", "Walk Cycles:")
-        movement_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("wait_time", "Wait Time (ms):")
-        movement_layout.addRow(label, layout_widget)
-        
-        movement_group.setLayout(movement_layout)
-        layout.addWidget(movement_group)
-        
-        # Action settings
-        action_group = QGroupBox("Action Settings")
-        action_layout = QFormLayout()
-        
-        # Create action fields
-        label, layout_widget = create_field_with_reset("action_key", "Action Key:", True)
-        action_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("action_press_time", "Action Press Time (ms):")
-        action_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("action_cycles", "Action Cycles:")
-        action_layout.addRow(label, layout_widget)
-        
-        action_group.setLayout(action_layout)
-        layout.addWidget(action_group)
-        
-        # Key settings
-        key_group = QGroupBox("Key Settings")
-        key_layout = QFormLayout()
-        
-        # Create key fields
-        label, layout_widget = create_field_with_reset("backward_key", "Backward Movement Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("right_key", "Right Movement Key:", True)
-        key_layout.addRow(label, layout_widget)
-        
-        key_group.setLayout(key_layout)
-        layout.addWidget(key_group)
-        
-        # Hotkey settings
-        hotkey_group = QGroupBox("Hotkey Settings")
-        hotkey_layout = QFormLayout()
-        
-        # Create hotkey fields
-        label, layout_widget = create_field_with_reset("start_hotkey", "Start Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        label, layout_widget = create_field_with_reset("stop_hotkey", "Stop Hotkey:", True)
-        hotkey_layout.addRow(label, layout_widget)
-        
-        hotkey_group.setLayout(hotkey_layout)
-        layout.addWidget(hotkey_group)
-        
-        # Process settings
-        process_group = QGroupBox("Process Settings")
-        process_layout = QFormLayout()
-        
-        # Create process fields
-        label, layout_widget = create_field_with_reset("game_process", "Game Process Name:")
-        process_layout.addRow(label, layout_widget)
+    def add_throughput_preview(self, layout, routine_name, fields, config):
+        """Add a planned throughput line to a tab, refreshed shortly after any of its fields change"""
+        group = QGroupBox("Planned Throughput")
+        group_layout = QVBoxLayout()
+        label = QLabel()
+        label.setWordWrap(True)
+        label.setToolTip("Monte Carlo simulation of the routine's step timings, without screen detection")
+        group_layout.addWidget(label)
+        group.setLayout(group_layout)
+        layout.addWidget(group)
+        
+        # Wait for typing to pause before simulating again
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(300)
+        timer.timeout.connect(lambda: self.update_throughput(label, routine_name, fields, config))
+        for field in fields.values():
+            field.textChanged.connect(timer.start)
+        self.update_throughput(label, routine_name, fields, config)
+    
+    def update_throughput(self, label, routine_name, fields, config):
+        """Simulate the tab's current values and show the result"""
+        try:
+            # Imported here so NumPy is only loaded when the settings are opened
+            import ThroughputPlanner
+        except ImportError:
+            label.setText("Install NumPy to see the planned throughput")
+            return
         
-        process_group.setLayout(process_layout)
-        layout.addWidget(process_group)
+        planned = dict(config)
+        for key, field in fields.items():
+            if isinstance(config.get(key), int):
+                try:
+                    planned[key] = int(field.text())
+                except ValueError:
+                    label.setText(f"Enter a whole number for {key} to see the planned throughput")
+                    return
         
-        scroll_area.setWidget(container)
-        self.tab_widget.addTab(scroll_area, "AltWestTek")
+        try:
+            result = ThroughputPlanner.plan(routine_name, planned, cycles=20000, seed=0)
+        except ValueError as e:
+            label.setText(f"Cannot plan these values: {e}")
+            return
+        label.setText(ThroughputPlanner.summary(result))
     
-    def reset_field(self, field, key, config_type):
+    def reset_field(self, field, key, name):
         """Reset a field to its default value"""
-        if config_type == "primary":
-            default_value = self.default_primary_config[key]
-        elif config_type == "timed_run":
-            default_value = self.default_timed_run_config[key]
-        elif config_type == "alt":
-            default_value = self.default_alt_config[key]
-        else:
-            return
-        
-        # Set the field value
-        field.setText(str(default_value))
+        field.setText(str(self.schemas[name]["config"].get(key, "")))
     
     def accept(self):
         """Save settings and close dialog"""
-        # Update primary config from fields
-        for key, field in self.primary_fields.items():
-            value = field.text()
-            # Convert numeric values to appropriate types
-            if key in ["shot_min_time", "shot_max_time", "quick_min_time", "quick_max_time", 
-                     "shot_wait_min", "shot_wait_max", "slow_min_time", "slow_max_time",
-                     "load_screen_min", "load_screen_max", "elevator_reset_min", "elevator_reset_max",
-                     "shots", "wait_time"]:
-                try:
-                    self.primary_config[key] = int(value)
-                except ValueError:
-                    QMessageBox.warning(self, "Invalid Value", 
-                                     f"Invalid numeric value for {key}. Using default: {self.primary_config[key]}")
-            else:
-                self.primary_config[key] = value
-        
-        # Update timed run config from fields
-        for key, field in self.timed_run_fields.items():
-            value = field.text()
-            # Convert numeric values to appropriate types
-            if key in ["shot_min_time", "shot_max_time", "quick_min_time", "quick_max_time", 
-                     "shot_wait_min", "shot_wait_max", "slow_min_time", "slow_max_time",
-                     "load_screen_min", "load_screen_max", "elevator_reset_min", "elevator_reset_max",
-                     "shots", "wait_time"]:
-                try:
-                    self.timed_run_config[key] = int(value)
-                except ValueError:
-                    QMessageBox.warning(self, "Invalid Value", 
-                                     f"Invalid numeric value for {key}. Using default: {self.timed_run_config[key]}")
-            else:
-                self.timed_run_config[key] = value
-        
-        # Update alt config from fields
-        for key, field in self.alt_fields.items():
-            value = field.text()
-            # Convert numeric values to appropriate types
-            if key in ["walk_min_time", "walk_max_time", "sleep_min_time", "sleep_max_time",
-                     "walk_cycles", "wait_time", "action_press_time", "action_cycles"]:
-                try:
-                    self.alt_config[key] = int(value)
-                except ValueError:
-                    QMessageBox.warning(self, "Invalid Value", 
-                                     f"Invalid numeric value for {key}. Using default: {self.alt_config[key]}")
-            else:
-                self.alt_config[key] = value
+        # Update each config from its fields, numeric where the default is numeric
+        for name, fields in self.fields.items():
+            config = self.configs[name]
+            defaults = self.schemas[name]["config"]
+            for key, field in fields.items():
+                value = field.text()
+                default_value = defaults.get(key)
+                if isinstance(default_value, bool):
+                    config[key] = value.strip().lower() in ("1", "true", "yes")
+                elif isinstance(default_value, (int, float)):
+                    try:
+                        config[key] = type(default_value)(value)
+                    except ValueError:
+                        QMessageBox.warning(self, "Invalid Value", 
+                                         f"Invalid numeric value for {key}. Using default: {config[key]}")
+                else:
+                    config[key] = value
         
         # Accept the dialog
         super().accept()
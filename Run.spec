@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('C:\\Users\\pacmanninja998\\Desktop\\West Tek\\python\\icon.ico', '.')],
-    hiddenimports=[],
+    hiddenimports=['PrimaryAltWestTek', 'TimedRunWestTek', 'AltWestTek'],  # Imported by name from RoutineFactory
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
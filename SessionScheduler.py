@@ -0,0 +1,323 @@
+import sys
+import json
+import time
+import heapq
+import datetime
+import threading
+from collections import deque
+
+import RoutineFactory
+from AsyncLogger import get_logger
+
+# Seconds before a run that completed no cycles (e.g. the game was not running) is repeated
+RETRY_DELAY = 60.0
+
+
+def is_clock_time(value):
+    """Whether a schedule time is a "HH:MM" time of day rather than a fixed moment"""
+    return isinstance(value, str) and len(value) <= 5 and ":" in value
+
+
+def parse_time(value, now=None):
+    """Parse an epoch number, an ISO date/time or a "HH:MM" time (next occurrence) into epoch seconds"""
+    if value is None or isinstance(value, (int, float)):
+        return value
+
+    now = now if now is not None else time.time()
+    if is_clock_time(value):
+        when = time_of_day(value, now)
+        # A time that has already passed today means tomorrow
+        return when if when >= now else when + 86400
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+def time_of_day(value, now):
+    """Epoch seconds of a "HH:MM" time on the day of now"""
+    hours, minutes = value.split(":")
+    return datetime.datetime.fromtimestamp(now).replace(
+        hour=int(hours), minute=int(minutes), second=0, microsecond=0).timestamp()
+
+
+def parse_window(start, stop, now=None):
+    """Resolve a run's start and stop into epoch seconds (None where not given)
+
+    A "HH:MM" stop is taken as the first occurrence after the start, so
+    22:00-06:00 spans midnight. For two "HH:MM" times the window is the one
+    open now (started yesterday or today), or else the next one, so a window
+    the session starts inside of runs right away instead of tomorrow.
+    """
+    now = now if now is not None else time.time()
+    if is_clock_time(start) and is_clock_time(stop):
+        start_at = time_of_day(start, now)
+        stop_at = time_of_day(stop, now)
+        while stop_at <= start_at:
+            stop_at += 86400
+        if start_at - 86400 <= now < stop_at - 86400:
+            # Inside yesterday's window, e.g. 03:00 in 22:00-06:00
+            return start_at - 86400, stop_at - 86400
+        if now < stop_at:
+            return start_at, stop_at
+        return start_at + 86400, stop_at + 86400
+
+    start_at = parse_time(start, now)
+    if is_clock_time(stop):
+        stop_at = time_of_day(stop, now)
+        while stop_at <= (start_at if start_at is not None else now):
+            stop_at += 86400
+        return start_at, stop_at
+    return start_at, parse_time(stop, now)
+
+
+class ScheduledRun:
+    """A queued routine run with its time window, budgets and cooldown"""
+
+    def __init__(self, routine, start=None, stop=None, max_cycles=0, max_duration=0,
+                 cooldown=0, repeat=1, profile=None, config=None):
+        self.routine = routine
+        # Window start (None for as soon as possible) and end (None for no end)
+        self.start_at, self.stop_at = parse_window(start, stop)
+        self.max_cycles = max_cycles  # Cycles per run, 0 for no limit
+        self.max_duration = max_duration  # Seconds per run, 0 for no limit
+        self.cooldown = cooldown  # Seconds between repeated runs
+        self.repeat = repeat  # Number of runs, 0 to repeat until the window closes
+        self.profile = profile
+        self.config = config  # Config overrides on top of the profile or saved config
+
+        self.runs_started = 0
+        self.results = []
+
+    @classmethod
+    def from_dict(cls, entry):
+        """Build a scheduled run from a schedule file entry"""
+        return cls(
+            entry["routine"],
+            start=entry.get("start"),
+            stop=entry.get("stop"),
+            max_cycles=entry.get("max_cycles", 0),
+            max_duration=entry.get("max_duration", 0),
+            cooldown=entry.get("cooldown", 0),
+            repeat=entry.get("repeat", 1),
+            profile=entry.get("profile"),
+            config=entry.get("config")
+        )
+
+    def runs_left(self):
+        """Whether another run of this entry may start"""
+        return self.repeat == 0 or self.runs_started < self.repeat
+
+    def __repr__(self):
+        return f"ScheduledRun({self.routine}, run {self.runs_started}/{self.repeat or 'inf'})"
+
+
+class SessionScheduler:
+    """Run queued routines from a single timer heap, sleeping until the next event"""
+
+    def __init__(self, create_routine=None, logger=None):
+        self.create_routine = create_routine or self.build_routine
+        self.logger = logger if logger else get_logger()
+
+        # Heap of (when, sequence, action, scheduled run, run number)
+        self.heap = []
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+        self.pending = deque()  # Runs due while another routine was running
+        self.active = None  # (scheduled run, routine, thread, start time)
+        self.stopping = False
+
+        self.entries = []  # Every scheduled run, for the report
+        self.session_start = None
+        self.session_end = None
+
+    def build_routine(self, entry):
+        """Create the routine for a scheduled run from its profile and overrides"""
+        config = RoutineFactory.load_config(entry.routine, profile=entry.profile)
+        if entry.config:
+            config.update(entry.config)
+        return RoutineFactory.create_routine(entry.routine, config, logger=self.logger)
+
+    def push(self, when, action, entry, run_number=0):
+        """Add an event to the heap and wake the scheduler thread"""
+        with self.condition:
+            self.sequence += 1
+            heapq.heappush(self.heap, (when, self.sequence, action, entry, run_number))
+            self.condition.notify()
+
+    def add(self, entry):
+        """Queue a scheduled run"""
+        self.entries.append(entry)
+        self.push(entry.start_at or time.time(), "start", entry)
+
+    def stop(self):
+        """Stop the running routine and end the session"""
+        with self.condition:
+            self.stopping = True
+            if self.active is not None:
+                self.active[1].abort("scheduler stopped")
+            self.condition.notify()
+
+    def run(self):
+        """Process events until nothing is queued or running, then return the report"""
+        self.session_start = time.time()
+        with self.condition:
+            while not self.stopping and (self.heap or self.active is not None or self.pending):
+                if not self.heap:
+                    # Only a running routine is left, its finish event will wake us
+                    self.condition.wait()
+                    continue
+
+                when, _, action, entry, run_number = self.heap[0]
+                delay = when - time.time()
+                if delay > 0:
+                    self.condition.wait(delay)
+                    continue
+
+                heapq.heappop(self.heap)
+                if action == "start":
+                    self.start_run(entry)
+                elif action == "stop":
+                    self.stop_run(entry, run_number)
+                elif action == "finished":
+                    self.finish_run(entry)
+
+            # Let a routine stopped by stop() finish its cleanup
+            if self.active is not None:
+                thread = self.active[2]
+                self.condition.release()
+                thread.join(5)
+                self.condition.acquire()
+
+        self.session_end = time.time()
+        return self.report()
+
+    def start_run(self, entry):
+        """Start a scheduled run now, or queue it behind the running routine"""
+        now = time.time()
+        if entry.stop_at is not None and now >= entry.stop_at:
+            self.logger.info("Skipping {routine}: window closed", routine=entry.routine)
+            return
+        if self.active is not None:
+            self.pending.append(entry)
+            return
+
+        try:
+            routine = self.create_routine(entry)
+        except Exception as e:
+            self.logger.error("Could not create {routine}: {error}", routine=entry.routine, error=e)
+            return
+
+        routine.max_cycles = entry.max_cycles
+        entry.runs_started += 1
+        run_number = entry.runs_started
+        thread = threading.Thread(target=self.run_routine, args=(entry, routine),
+                                  name=f"Scheduled-{entry.routine}", daemon=True)
+        self.active = (entry, routine, thread, time.monotonic())
+        self.logger.info("Starting {routine} run {run}", routine=entry.routine, run=run_number)
+        thread.start()
+
+        # Stop event for the end of the window or the duration budget
+        stop_times = []
+        if entry.stop_at is not None:
+            stop_times.append(entry.stop_at)
+        if entry.max_duration:
+            stop_times.append(now + entry.max_duration)
+        if stop_times:
+            self.push(min(stop_times), "stop", entry, run_number)
+
+    def run_routine(self, entry, routine):
+        """Routine thread: run the automation, then post a finished event"""
+        try:
+            routine.start_automation()
+        except SystemExit:
+            # exit_script() ends the routine's thread with SystemExit
+            pass
+        except Exception as e:
+            self.logger.error("{routine} failed: {error}", routine=entry.routine, error=e)
+        finally:
+            self.push(time.time(), "finished", entry)
+
+    def stop_run(self, entry, run_number):
+        """Abort the routine if this stop event belongs to the run that is still active"""
+        if self.active is not None and self.active[0] is entry and entry.runs_started == run_number:
+            self.active[1].abort("schedule budget reached")
+
+    def finish_run(self, entry):
+        """Record a finished run, schedule its repeat and start whatever is queued"""
+        _, routine, _, started = self.active
+        duration = time.monotonic() - started
+        entry.results.append({
+            "duration": duration,
+            "cycles": routine.cycles_completed,
+            "cycle_seconds": routine.cycle_seconds
+        })
+        self.active = None
+        # Drop the stop event of the finished run so it does not keep the session alive
+        self.heap = [event for event in self.heap if not (event[2] == "stop" and event[3] is entry)]
+        heapq.heapify(self.heap)
+        self.logger.info("{routine} finished {cycles} cycles in {duration:.0f}s",
+                         routine=entry.routine, cycles=routine.cycles_completed, duration=duration)
+
+        if entry.runs_left():
+            cooldown = entry.cooldown
+            if not routine.cycles_completed and cooldown < RETRY_DELAY:
+                # A run that ends at once would otherwise be restarted in a tight loop
+                cooldown = RETRY_DELAY
+                self.logger.warning("{routine} completed no cycles, repeating it in {delay:.0f}s",
+                                    routine=entry.routine, delay=cooldown)
+            next_start = time.time() + cooldown
+            if entry.stop_at is None or next_start < entry.stop_at:
+                self.push(next_start, "start", entry)
+
+        while self.pending and self.active is None:
+            self.start_run(self.pending.popleft())
+
+    def report(self):
+        """Summarise how the session's wall time was spent"""
+        results = [dict(result, routine=entry.routine) for entry in self.entries for result in entry.results]
+
+        wall = (self.session_end or time.time()) - (self.session_start or time.time())
+        running = sum(result["duration"] for result in results)
+        productive = sum(result["cycle_seconds"] for result in results)
+        return {
+            "wall_seconds": wall,
+            "productive_seconds": productive,  # Inside routine cycles
+            "routine_overhead_seconds": running - productive,  # Routine up but not cycling (alignment)
+            "idle_seconds": max(0.0, wall - running),  # Waiting for windows and cooldowns
+            "productive_share": productive / wall if wall > 0 else 0.0,
+            "cycles": sum(result["cycles"] for result in results),
+            "runs": results
+        }
+
+
+def load_schedule(path):
+    """Load scheduled runs from a JSON file with a "runs" list"""
+    with open(path, 'r') as f:
+        schedule = json.load(f)
+    return [ScheduledRun.from_dict(entry) for entry in schedule["runs"]]
+
+
+# If this script is run directly, run a schedule file headless (no GUI needed)
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python SessionScheduler.py <schedule.json>")
+        print('Schedule: {"runs": [{"routine": "primary", "start": "02:00", "stop": "06:00",')
+        print('           "max_cycles": 100, "max_duration": 3600, "cooldown": 300, "repeat": 2,')
+        print('           "profile": "server2"}]}')
+        sys.exit(1)
+
+    scheduler = SessionScheduler()
+    for scheduled_run in load_schedule(sys.argv[1]):
+        scheduler.add(scheduled_run)
+
+    try:
+        session_report = scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+        session_report = scheduler.report()
+
+    scheduler.logger.stop()
+    print(f"Wall time:   {session_report['wall_seconds']:.0f}s")
+    print(f"Productive:  {session_report['productive_seconds']:.0f}s "
+          f"({session_report['productive_share'] * 100:.1f}%) over {session_report['cycles']} cycles")
+    print(f"Overhead:    {session_report['routine_overhead_seconds']:.0f}s")
+    print(f"Idle:        {session_report['idle_seconds']:.0f}s")
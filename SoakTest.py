@@ -0,0 +1,193 @@
+import os
+import gc
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import psutil
+
+import RoutineFactory
+from AsyncLogger import AsyncLogger
+from CycleJournal import CycleJournal
+from RoutineClock import SimClock
+
+
+class FakeInput:
+    """Input backend that records key state and hotkeys instead of sending input"""
+
+    def __init__(self):
+        self.pressed = set()
+        self.presses = 0
+        self.hotkeys = []  # (hotkey, callback), one entry per registration like the keyboard module
+
+    def press(self, key):
+        self.pressed.add(key)
+        self.presses += 1
+
+    def release(self, key):
+        self.pressed.discard(key)
+
+    def add_hotkey(self, hotkey, callback):
+        self.hotkeys.append((hotkey, callback))
+        return hotkey
+
+    def remove_hotkey(self, hotkey):
+        for index, (registered, _) in enumerate(self.hotkeys):
+            if registered == hotkey:
+                del self.hotkeys[index]
+                return
+        raise KeyError(hotkey)
+
+    def trigger(self, hotkey):
+        """Run the callback of a registered hotkey, as a key press would"""
+        for registered, callback in self.hotkeys:
+            if registered == hotkey:
+                return callback()
+        raise KeyError(hotkey)
+
+
+class SoakRun:
+    """Run one routine for many simulated cycles, starting and stopping it like the GUI does"""
+
+    def __init__(self, routine_name, work_folder, interval=500):
+        self.routine_name = routine_name
+        self.interval = interval  # Cycles per start/stop, and between memory samples
+        self.clock = SimClock()
+        self.input = FakeInput()
+        self.logger = AsyncLogger(log_file=os.path.join(work_folder, f"{routine_name}.log"), console=False).start()
+        self.journal_file = os.path.join(work_folder, f"{routine_name}_checkpoint.journal")
+
+        self.config = RoutineFactory.default_config(routine_name)
+        self.config.update({
+            "seed": 1,
+            "watchdog": 0,  # No game process to watch
+            "adaptive_load_screen": 0
+        })
+        self.cycles = 0
+        self.samples = []  # (cycles, traced bytes, rss bytes)
+
+    def start_stop(self):
+        """Create the routine, start it from its hotkey for one interval of cycles, then stop it"""
+        routine = RoutineFactory.create_routine(self.routine_name, dict(self.config), logger=self.logger,
+                                                clock=self.clock, input_backend=self.input)
+        routine.process_exists = lambda process_name: True
+        routine.journal = CycleJournal(self.journal_file)
+        routine.max_cycles = self.interval
+
+        # Same as MasterControllerGUI: run() on a thread registers the hotkeys and waits
+        thread = threading.Thread(target=routine.run, daemon=True)
+        thread.start()
+        while not routine.hotkeys_registered and thread.is_alive():
+            time.sleep(0.001)
+
+        self.input.trigger(routine.config["start_hotkey"])
+        self.cycles += routine.cycles_completed
+
+        # Stop button
+        routine.abort()
+        routine.unregister_hotkeys()
+        thread.join(2)
+
+        if thread.is_alive():
+            raise RuntimeError(f"{self.routine_name} run() did not return after its hotkeys were unregistered")
+        if self.input.hotkeys:
+            raise RuntimeError(f"{self.routine_name} left {len(self.input.hotkeys)} hotkeys registered")
+        if self.input.pressed:
+            raise RuntimeError(f"{self.routine_name} left keys held down: {sorted(self.input.pressed)}")
+
+    def sample(self):
+        """Record traced and resident memory after a full collection"""
+        gc.collect()
+        self.samples.append((self.cycles, tracemalloc.get_traced_memory()[0], psutil.Process().memory_info().rss))
+
+    def close(self):
+        self.logger.stop()
+
+
+def growth_per_1k(samples, column):
+    """Least squares slope of a memory column against cycles, in bytes per 1000 cycles"""
+    cycles = [sample[0] for sample in samples]
+    values = [sample[column] for sample in samples]
+    mean_cycles = sum(cycles) / len(cycles)
+    mean_values = sum(values) / len(values)
+    spread = sum((c - mean_cycles) ** 2 for c in cycles)
+    if not spread:
+        return 0.0
+    slope = sum((c - mean_cycles) * (v - mean_values) for c, v in zip(cycles, values)) / spread
+    return slope * 1000
+
+
+def soak(routine_name, cycles, interval, warmup, work_folder, top=10):
+    """Soak a routine and return its memory report"""
+    run = SoakRun(routine_name, work_folder, interval)
+    started = time.perf_counter()
+
+    try:
+        # Let caches, the RNG streams and the journal reach their steady size first
+        while run.cycles < warmup:
+            run.start_stop()
+
+        threads_before = threading.active_count()
+        tracemalloc.start(10)
+        run.sample()
+        baseline = tracemalloc.take_snapshot()
+        while run.cycles < warmup + cycles:
+            run.start_stop()
+            run.sample()
+        final = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        leaked_threads = threading.active_count() - threads_before
+    finally:
+        run.close()
+
+    # Leave out the harness's own samples
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    top_sites = final.filter_traces(filters).compare_to(baseline.filter_traces(filters), "lineno")[:top]
+    return {
+        "routine": routine_name,
+        "cycles": run.cycles - warmup,
+        "seconds": time.perf_counter() - started,
+        "traced_growth_per_1k": growth_per_1k(run.samples, 1),
+        "rss_growth_per_1k": growth_per_1k(run.samples, 2),
+        "leaked_threads": leaked_threads,
+        "key_presses": run.input.presses,
+        "top_sites": top_sites
+    }
+
+
+# If this script is run directly, soak every routine and fail on memory growth
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak the routines over simulated cycles and track memory")
+    parser.add_argument("--routines", nargs="+", default=list(RoutineFactory.ROUTINES),
+                        choices=list(RoutineFactory.ROUTINES), help="Routines to soak")
+    parser.add_argument("--cycles", type=int, default=5000, help="Measured cycles per routine")
+    parser.add_argument("--interval", type=int, default=250, help="Cycles per start/stop and memory sample")
+    parser.add_argument("--warmup", type=int, default=500, help="Cycles before measuring")
+    parser.add_argument("--max-growth", type=float, default=16.0,
+                        help="Fail above this traced memory growth per 1k cycles (in KB)")
+    args = parser.parse_args()
+
+    work_folder = tempfile.mkdtemp(prefix="westtek_soak_")
+    failed = False
+    try:
+        for name in args.routines:
+            report = soak(name, args.cycles, args.interval, args.warmup, work_folder)
+            growth_kb = report["traced_growth_per_1k"] / 1024
+            passed = growth_kb <= args.max_growth and report["leaked_threads"] <= 0
+            failed = failed or not passed
+
+            print(f"{name}: {report['cycles']} cycles in {report['seconds']:.1f}s "
+                  f"({report['key_presses']} key presses) - {'PASS' if passed else 'FAIL'}")
+            print(f"  Traced growth: {growth_kb:.2f} KB per 1k cycles (limit {args.max_growth:.2f} KB)")
+            print(f"  RSS growth:    {report['rss_growth_per_1k'] / 1024:.2f} KB per 1k cycles")
+            print(f"  Leaked threads: {report['leaked_threads']}")
+            print("  Top allocation sites since the baseline:")
+            for stat in report["top_sites"]:
+                print(f"    {stat.size_diff / 1024:+8.1f} KB {stat.count_diff:+6d} blocks  {stat.traceback[0]}")
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,96 @@
+import os
+import sys
+import time
+import datetime
+import threading
+
+from RoutineFactory import CONFIG_FOLDER
+
+SAMPLES_FOLDER = os.path.join(CONFIG_FOLDER, "stack_samples")
+
+
+def samples_path(routine_name):
+    """New collapsed-stack file for a routine, named after the time sampling started"""
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(SAMPLES_FOLDER, f"{routine_name}_{stamp}.collapsed")
+
+
+def frame_name(code):
+    """Collapsed-stack label of a function"""
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread for a fixed window
+
+    Each sample walks the target's frames from sys._current_frames() and counts the
+    stack as a tuple of code objects, so the target thread is never interrupted or
+    slowed beyond the GIL hand-off. Time spent sleeping shows up too, so the counts
+    cover wall-clock time. The result is written as collapsed stacks
+    ("outer;inner count" lines), the input of flamegraph.pl, speedscope and Perfetto.
+    """
+
+    def __init__(self, thread_id, path, window=10.0, interval=0.005, on_done=None):
+        self.thread_id = thread_id
+        self.path = path
+        self.window = window
+        self.interval = interval
+        self.on_done = on_done  # Called with the sampler once the file is written
+        self.counts = {}
+        self.samples = 0
+        self.error = None
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start sampling on a background thread"""
+        self.thread = threading.Thread(target=self.run, name="StackSampler", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """End the window early; the file is still written"""
+        self.stop_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def run(self):
+        """Sampler thread: sample until the window ends or the target thread exits, then write the file"""
+        end = time.monotonic() + self.window
+        while not self.stop_event.is_set() and time.monotonic() < end:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                # The routine's thread has finished
+                break
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            key = tuple(stack)
+            self.counts[key] = self.counts.get(key, 0) + 1
+            self.samples += 1
+            self.stop_event.wait(self.interval)
+
+        try:
+            self.write()
+        except OSError as e:
+            self.error = e
+        if self.on_done is not None:
+            self.on_done(self)
+
+    def collapsed(self):
+        """Collapsed-stack lines, outermost frame first, most sampled first"""
+        lines = {}
+        for stack, count in self.counts.items():
+            line = ";".join(frame_name(code) for code in reversed(stack))
+            lines[line] = lines.get(line, 0) + count
+        return [f"{line} {count}" for line, count in sorted(lines.items(), key=lambda item: -item[1])]
+
+    def write(self):
+        """Write the collapsed stacks to the sampler's path"""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            for line in self.collapsed():
+                f.write(line + "\n")
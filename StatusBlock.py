@@ -0,0 +1,169 @@
+import os
+import sys
+import mmap
+import time
+import struct
+
+from RoutineFactory import CONFIG_FOLDER
+
+STATUS_FOLDER = os.path.join(CONFIG_FOLDER, "status")
+
+MAGIC = b"WTST"
+VERSION = 1
+
+# Layout, little-endian, for readers in any language:
+#   0  char[4]  magic "WTST"
+#   4  u16      version
+#   6  u16      payload size in bytes
+#   8  u64      sequence, odd while the routine is writing
+#  16  u8       state, an index into STATES
+#  17  u8       reserved
+#  18  u16      reserved
+#  20  u32      cycle number, counted from 1
+#  24  char[16] phase, NUL padded
+#  40  f64      countdown in seconds (to the start minute or the end of the respawn wait)
+#  48  f64      last cycle duration in seconds
+#  56  f64      update time, Unix seconds
+HEADER = struct.Struct("<4sHHQ")
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+PAYLOAD = struct.Struct("<BBHI16sddd")
+PAYLOAD_OFFSET = HEADER.size
+SIZE = HEADER.size + PAYLOAD.size
+
+STATES = ("stopped", "countdown", "running", "paused")
+
+
+def status_path(routine_name):
+    """Status block file of a routine"""
+    return os.path.join(STATUS_FOLDER, f"{routine_name}.status")
+
+
+class StatusBlock:
+    """Live routine status in a fixed-layout memory-mapped file, guarded by a sequence lock
+
+    The routine's automation thread is the only writer (hotkey and control
+    threads leave their changes for it to publish): it makes the sequence odd,
+    packs the payload straight into the mapping and makes the sequence even
+    again, so a publish is three struct writes and no system call. Readers map the same file and retry
+    while the sequence is odd or changed under them, never blocking the routine.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Reuse an existing block in place, an overlay may still have it mapped (Windows cannot resize it then)
+        self.file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if os.fstat(self.file.fileno()).st_size != SIZE:
+            self.file.truncate(SIZE)
+        self.map = mmap.mmap(self.file.fileno(), SIZE)
+        self.sequence = 0
+        self.state = 0
+        self.cycle = 0
+        self.phase = b""
+        self.countdown = 0.0
+        self.last_cycle = 0.0
+        self.phases = {}  # Encoded phase names, so publishing a phase does not encode it again
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, PAYLOAD.size, self.sequence)
+        self.publish()
+
+    def update(self, state=None, cycle=None, phase=None, countdown=None, last_cycle=None):
+        """Change the given fields and publish the block"""
+        if state is not None:
+            self.state = STATES.index(state)
+        if cycle is not None:
+            self.cycle = cycle
+        if phase is not None:
+            encoded = self.phases.get(phase)
+            if encoded is None:
+                encoded = self.phases[phase] = phase.encode()[:16]
+            self.phase = encoded
+        if countdown is not None:
+            self.countdown = countdown
+        if last_cycle is not None:
+            self.last_cycle = last_cycle
+        self.publish()
+
+    def publish(self):
+        self.sequence += 1
+        SEQUENCE.pack_into(self.map, SEQUENCE_OFFSET, self.sequence)
+        PAYLOAD.pack_into(self.map, PAYLOAD_OFFSET, self.state, 0, 0, self.cycle, self.phase,
+                          self.countdown, self.last_cycle, time.time())
+        self.sequence += 1
+        SEQUENCE.pack_into(self.map, SEQUENCE_OFFSET, self.sequence)
+
+    def close(self, state="stopped"):
+        """Publish the final state and unmap; the file stays for readers to see the last status"""
+        if self.map.closed:
+            return
+        self.update(state=state, countdown=0.0)
+        self.map.close()
+        self.file.close()
+
+
+class StatusReader:
+    """Reads a routine's status block from its memory-mapped file"""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), SIZE, access=mmap.ACCESS_READ)
+        magic, version, payload_size, _ = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or payload_size != PAYLOAD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} status block")
+
+    def read(self, retries=1000):
+        """Consistent status as a dict, or None if the writer kept it busy through every retry"""
+        for _ in range(retries):
+            before = SEQUENCE.unpack_from(self.map, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            state, _, _, cycle, phase, countdown, last_cycle, updated = PAYLOAD.unpack_from(self.map, PAYLOAD_OFFSET)
+            if SEQUENCE.unpack_from(self.map, SEQUENCE_OFFSET)[0] == before:
+                return {
+                    "state": STATES[state] if state < len(STATES) else state,
+                    "cycle": cycle,
+                    "phase": phase.rstrip(b"\0").decode(errors="replace"),
+                    "countdown": countdown,
+                    "last_cycle": last_cycle,
+                    "updated": updated,
+                    "sequence": before
+                }
+        return None
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+# If this script is run directly, show a routine's live status
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show the live status a routine publishes")
+    parser.add_argument("routine", help="Routine class name, e.g. PrimaryWestTek, or CLASS-ID for a control server instance")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="Keep printing at this interval")
+    args = parser.parse_args()
+
+    try:
+        reader = StatusReader(status_path(args.routine))
+    except (OSError, ValueError) as e:
+        print(f"No status for {args.routine}: {e}")
+        sys.exit(1)
+
+    try:
+        while True:
+            status = reader.read()
+            if status is None:
+                print("Status busy, try again")
+            else:
+                print(f"{status['state']:<9} cycle {status['cycle']:<5} {status['phase']:<10} "
+                      f"countdown {status['countdown']:6.1f}s  last cycle {status['last_cycle']:6.2f}s  "
+                      f"({time.time() - status['updated']:.1f}s ago)")
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
@@ -0,0 +1,286 @@
+import sys
+import json
+import time
+import socket
+import secrets
+import datetime
+import threading
+
+DEFAULT_ADDRESS = "127.0.0.1:8777"
+
+
+def parse_address(address):
+    """Split "host:port" into a (host, port) tuple"""
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def next_aligned_time(after, second=1):
+    """First wall clock time at the given second of a minute that is not before after"""
+    moment = datetime.datetime.fromtimestamp(after).replace(second=second, microsecond=0)
+    when = moment.timestamp()
+    return when if when >= after else when + 60
+
+
+class SyncCoordinator:
+    """UDP service that answers clock pings and releases barriers with a shared go deadline"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, margin=0.1, keep_released=10.0, waiting_timeout=1.0):
+        self.address = parse_address(address)
+        self.margin = margin  # Extra lead time on top of the slowest round trip
+        self.keep_released = keep_released  # Seconds a released round still answers repeated joins
+        self.waiting_timeout = waiting_timeout  # Seconds a client stays in a barrier without resending its join (two resends)
+        self.socket = None
+        self.thread = None
+        self.running = False
+        self.barriers = {}  # name -> {"waiting": {token: (addr, client, last join)}, "released": {token: (addr, deadline)}, "released_at"}
+
+    @classmethod
+    def try_start(cls, address=DEFAULT_ADDRESS, **kwargs):
+        """Start a coordinator unless another process already holds the address"""
+        coordinator = cls(address, **kwargs)
+        try:
+            return coordinator.start()
+        except OSError:
+            return None
+
+    def start(self):
+        """Bind the socket and serve on a background thread"""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self.socket.bind(self.address)
+        except OSError:
+            self.socket.close()
+            raise
+        self.socket.settimeout(0.5)
+        self.running = True
+        self.thread = threading.Thread(target=self.serve, name="SyncCoordinator", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(2)
+        if self.socket is not None:
+            self.socket.close()
+
+    def serve(self):
+        """Answer pings and joins until stopped"""
+        while self.running:
+            try:
+                data, addr = self.socket.recvfrom(2048)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            received = time.time()
+
+            try:
+                message = json.loads(data)
+                if message["type"] == "ping":
+                    self.send(addr, {"type": "pong", "seq": message["seq"], "t0": message["t0"],
+                                     "t1": received, "t2": time.time()})
+                elif message["type"] == "join":
+                    self.join(addr, message)
+                elif message["type"] == "leave":
+                    self.barriers.get(message["barrier"], {}).get("waiting", {}).pop(message["token"], None)
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    def send(self, addr, message):
+        """Send a JSON datagram"""
+        self.socket.sendto(json.dumps(message).encode(), addr)
+
+    def join(self, addr, message):
+        """Add a client to a barrier, releasing everyone once all parties are in"""
+        name, token = message["barrier"], message["token"]
+        barrier = self.barriers.setdefault(name, {"waiting": {}, "released": {}, "released_at": 0.0})
+
+        if token in barrier["released"]:
+            # The go message was lost, send it again
+            self.send(addr, {"type": "go", "barrier": name, "deadline": barrier["released"][token][1]})
+            return
+        if barrier["released"] and time.time() - barrier["released_at"] > self.keep_released:
+            barrier["released"] = {}
+
+        now = time.time()
+        barrier["waiting"][token] = (addr, message, now)
+        # Clients that stopped resending (timed out or aborted) no longer count as parties
+        barrier["waiting"] = {token: entry for token, entry in barrier["waiting"].items()
+                              if now - entry[2] <= self.waiting_timeout}
+        if len(barrier["waiting"]) < message["parties"]:
+            return
+
+        # Everyone is in: leave time for the slowest client to hear about it
+        slowest = max(client["rtt"] for _, client, _ in barrier["waiting"].values())
+        deadline = time.time() + slowest + self.margin
+        if message.get("align"):
+            deadline = next_aligned_time(deadline, message["align_second"])
+
+        barrier["released"] = {token: (addr, deadline) for token, (addr, _, _) in barrier["waiting"].items()}
+        barrier["released_at"] = time.time()
+        barrier["waiting"] = {}
+        for waiting_addr, _ in barrier["released"].values():
+            self.send(waiting_addr, {"type": "go", "barrier": name, "deadline": deadline})
+
+
+class SyncClient:
+    """Client side of the barrier: clock offset measurement and waiting for the go"""
+
+    def __init__(self, address=DEFAULT_ADDRESS, client_id=None):
+        self.address = parse_address(address)
+        self.client_id = client_id or f"{socket.gethostname()}-{secrets.token_hex(3)}"
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.offset = 0.0  # Coordinator clock minus our clock
+        self.rtt = None
+
+    def close(self):
+        self.socket.close()
+
+    def request(self, message, expect, timeout):
+        """Send a message and return the first reply of the expected type, or None"""
+        self.socket.settimeout(timeout)
+        self.socket.sendto(json.dumps(message).encode(), self.address)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                data, _ = self.socket.recvfrom(2048)
+            except (socket.timeout, ConnectionResetError):
+                # Windows reports an unreachable port as a reset on the next receive
+                return None
+            reply = json.loads(data)
+            if reply.get("type") == expect and reply.get("seq", message.get("seq")) == message.get("seq"):
+                return reply
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            self.socket.settimeout(remaining)
+
+    def measure(self, samples=8, timeout=0.2):
+        """Estimate the clock offset from the ping with the shortest round trip"""
+        best = None
+        for seq in range(samples):
+            t0 = time.time()
+            reply = self.request({"type": "ping", "seq": seq, "t0": t0}, "pong", timeout)
+            t3 = time.time()
+            if reply is None:
+                continue
+            # NTP style: the coordinator's turnaround is left out of the round trip
+            rtt = (t3 - t0) - (reply["t2"] - reply["t1"])
+            offset = ((reply["t1"] - t0) + (reply["t2"] - t3)) / 2
+            if best is None or rtt < best[0]:
+                best = (rtt, offset)
+        if best is None:
+            return False
+        self.rtt, self.offset = best
+        return True
+
+    def wait_for_go(self, barrier, parties, align_second=None, timeout=120.0, check=None):
+        """Join a barrier and return the local time of the shared go deadline, or None on timeout
+
+        check is called between resends so the caller can abort the wait.
+        """
+        if self.rtt is None and not self.measure():
+            return None
+
+        message = {"type": "join", "barrier": barrier, "parties": parties, "token": secrets.token_hex(8),
+                   "id": self.client_id, "rtt": self.rtt, "offset": self.offset,
+                   "align": align_second is not None, "align_second": align_second or 0}
+        give_up = time.monotonic() + timeout
+        try:
+            while time.monotonic() < give_up:
+                if check is not None:
+                    check()
+                # Resend the join every half second in case a datagram was lost
+                reply = self.request(message, "go", 0.5)
+                if reply is not None and reply["barrier"] == barrier:
+                    message = None
+                    return reply["deadline"] - self.offset
+            return None
+        finally:
+            if message is not None:
+                # Timed out or aborted: stop counting as a party (a lost leave expires with the join)
+                try:
+                    self.socket.sendto(json.dumps({"type": "leave", "barrier": barrier,
+                                                   "token": message["token"]}).encode(), self.address)
+                except OSError:
+                    pass
+
+
+def sleep_until(deadline, clock=None):
+    """Sleep until a local wall clock time, ending with one short precise sleep"""
+    clock_time = clock.time if clock else time.time
+    clock_sleep = clock.sleep if clock else time.sleep
+    remaining = deadline - clock_time()
+    if remaining > 0.1:
+        # Long waits may use a coarse timer (Event.wait), so stop short of the deadline
+        clock_sleep(remaining - 0.05)
+        remaining = deadline - clock_time()
+    if remaining > 0:
+        clock_sleep(remaining)
+
+
+def test_client(address, parties, client_id):
+    """Child process for the multi-process test: wait for the go and print the wake time"""
+    client = SyncClient(address, client_id)
+    deadline = client.wait_for_go("test", parties, timeout=20)
+    if deadline is None:
+        print(json.dumps({"id": client_id, "error": "no go"}))
+        return
+    sleep_until(deadline)
+    woke = time.time()
+    # Block for a moment so the other clients get the CPU to wake on time, as idle routines would
+    time.sleep(0.2)
+    print(json.dumps({"id": client_id, "woke": woke + client.offset, "late": woke - deadline,
+                      "offset": client.offset, "rtt": client.rtt}))
+
+
+# If this script is run directly, serve a coordinator, or test the barrier with several processes
+if __name__ == "__main__":
+    import argparse
+    import subprocess
+
+    parser = argparse.ArgumentParser(description="Minute-boundary sync barrier for cooperating routines")
+    parser.add_argument("mode", choices=["serve", "test", "client"], help="Run a coordinator, or a multi-process test")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="Coordinator host:port")
+    parser.add_argument("--clients", type=int, default=4, help="Processes in the test")
+    parser.add_argument("--id", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == "client":
+        test_client(args.address, args.clients, args.id)
+        sys.exit(0)
+
+    coordinator = SyncCoordinator(args.address).start()
+    if args.mode == "serve":
+        print(f"Sync coordinator on {args.address}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            coordinator.stop()
+        sys.exit(0)
+
+    # Start the clients a little apart, like routines started by hand
+    children = []
+    for index in range(args.clients):
+        children.append(subprocess.Popen([sys.executable, __file__, "client", "--address", args.address,
+                                          "--clients", str(args.clients), "--id", f"client{index}"],
+                                         stdout=subprocess.PIPE, text=True))
+        time.sleep(0.3)
+    results = [json.loads(child.communicate()[0]) for child in children]
+    coordinator.stop()
+
+    woke = [result["woke"] for result in results if "woke" in result]
+    for result in results:
+        if "woke" in result:
+            print(f"{result['id']}: offset {result['offset'] * 1000:+.3f} ms, rtt {result['rtt'] * 1000:.3f} ms, "
+                  f"late {result['late'] * 1000:.3f} ms")
+        else:
+            print(f"{result['id']}: {result['error']}")
+    if len(woke) == len(results):
+        print(f"Start spread across {len(woke)} processes: {(max(woke) - min(woke)) * 1000:.3f} ms")
+    else:
+        sys.exit(1)
@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+# Luma weights for converting RGB frames to greyscale
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def next_fast_length(n):
+    """Smallest 2/3/5-smooth number >= n, which NumPy's FFT handles quickly"""
+    best = 1 << (n - 1).bit_length()
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            candidate = power35
+            while candidate < n:
+                candidate *= 2
+            best = min(best, candidate)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+def to_gray(image):
+    """Convert an HxWx3 (or HxW) image to a float32 greyscale array"""
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    return image[:, :, :3] @ GRAY_WEIGHTS
+
+
+class TemplateMatcher:
+    """FFT-based normalized cross-correlation search for a template inside a region of interest"""
+
+    def __init__(self, template, roi=None, threshold=0.8):
+        template = to_gray(np.asarray(template))
+        self.height, self.width = template.shape
+        self.roi = roi  # (x, y, width, height) to search, or None for the whole frame
+        self.threshold = threshold
+
+        # Zero-mean template, so the numerator does not need local image means
+        self.template = template - template.mean()
+        self.template_norm = float(np.sqrt(np.square(self.template).sum()))
+        self.size = self.height * self.width
+
+        # Template spectrum cached per FFT shape (fixed once the ROI size is known)
+        self.spectrum_cache = {}
+
+        self.last_score = 0.0
+        self.last_location = None
+
+    def template_spectrum(self, fft_shape):
+        """Return the cached spectrum of the flipped template for an FFT shape"""
+        spectrum = self.spectrum_cache.get(fft_shape)
+        if spectrum is None:
+            spectrum = np.fft.rfft2(self.template[::-1, ::-1], fft_shape)
+            self.spectrum_cache[fft_shape] = spectrum
+        return spectrum
+
+    def crop(self, frame):
+        """Return the region of interest of a frame and its offset"""
+        if self.roi is None:
+            return frame, 0, 0
+        x, y, width, height = self.roi
+        return frame[y:y + height, x:x + width], x, y
+
+    def score_map(self, image):
+        """Return the NCC score of every valid template position in a greyscale image"""
+        image_height, image_width = image.shape
+        out_height = image_height - self.height + 1
+        out_width = image_width - self.width + 1
+        if out_height <= 0 or out_width <= 0:
+            return None
+
+        # Correlation with the zero-mean template through the FFT
+        fft_shape = (next_fast_length(image_height), next_fast_length(image_width))
+        product = np.fft.rfft2(image, fft_shape) * self.template_spectrum(fft_shape)
+        correlation = np.fft.irfft2(product, fft_shape)
+        numerator = correlation[self.height - 1:image_height, self.width - 1:image_width]
+
+        # Local image energy around each position from integral images
+        window_sum = self.window_sums(image)
+        window_square_sum = self.window_sums(np.square(image, dtype=np.float64))
+        variance = window_square_sum - np.square(window_sum) / self.size
+        np.maximum(variance, 0, out=variance)
+        denominator = np.sqrt(variance) * self.template_norm
+
+        scores = np.zeros_like(numerator)
+        np.divide(numerator, denominator, out=scores, where=denominator > 1e-6)
+        return scores
+
+    def window_sums(self, image):
+        """Sum of every template-sized window of an image using an integral image"""
+        integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+        np.cumsum(image, axis=0, out=integral[1:, 1:])
+        np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+        h, w = self.height, self.width
+        return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+    def match(self, frame):
+        """Return the best score and its (x, y) position in frame coordinates"""
+        region, offset_x, offset_y = self.crop(frame)
+        scores = self.score_map(to_gray(region))
+        if scores is None:
+            self.last_score, self.last_location = 0.0, None
+            return self.last_score, self.last_location
+
+        index = int(np.argmax(scores))
+        row, col = divmod(index, scores.shape[1])
+        self.last_score = float(scores[row, col])
+        self.last_location = (offset_x + col, offset_y + row)
+        return self.last_score, self.last_location
+
+    def matches(self, frame):
+        """Return True if the template is found in the frame above the threshold"""
+        score, _ = self.match(frame)
+        return score >= self.threshold
+
+    @classmethod
+    def from_config(cls, config, base_folder=""):
+        """Build a matcher from its JSON description, loading the template image"""
+        from GameStateDetector import load_png
+
+        template = load_png(os.path.join(base_folder, config["template"]))
+        return cls(template, config.get("roi"), config.get("threshold", 0.8))
+
+
+def load_labels(folder, paths):
+    """Load expected results from labels.json, or from pos_/neg_ file name prefixes"""
+    labels_file = os.path.join(folder, "labels.json")
+    if os.path.exists(labels_file):
+        with open(labels_file, 'r') as f:
+            labels = json.load(f)
+        return [labels.get(os.path.basename(path)) for path in paths]
+    labels = []
+    for path in paths:
+        name = os.path.basename(path).lower()
+        labels.append(True if name.startswith("pos") else False if name.startswith("neg") else None)
+    return labels
+
+
+def benchmark(matcher, frames, labels, repeat=3):
+    """Time a matcher over frames and compare its results with labels"""
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [matcher.matches(frame) for frame in frames]
+    elapsed = time.perf_counter() - start
+
+    labelled = [(result, label) for result, label in zip(results, labels) if label is not None]
+    correct = sum(1 for result, label in labelled if result == label)
+    true_positives = sum(1 for result, label in labelled if result and label)
+    return {
+        "frames": len(frames),
+        "matches_per_second": len(frames) * repeat / elapsed if elapsed > 0 else 0.0,
+        "ms_per_frame": elapsed / (len(frames) * repeat) * 1000 if frames else 0.0,
+        "labelled": len(labelled),
+        "accuracy": correct / len(labelled) if labelled else None,
+        "recall": (true_positives / sum(1 for _, label in labelled if label)
+                   if any(label for _, label in labelled) else None)
+    }
+
+
+# If this script is run directly, benchmark a template over a folder of sample frames
+if __name__ == "__main__":
+    import argparse
+    from GameStateDetector import DirectoryFrameSource, load_png
+
+    parser = argparse.ArgumentParser(description="Benchmark template matching over sample frames")
+    parser.add_argument("template", help="PNG template to search for")
+    parser.add_argument("frames", help="Folder of PNG frames (labels.json or pos_/neg_ names)")
+    parser.add_argument("--roi", type=int, nargs=4, metavar=("X", "Y", "W", "H"), help="Region of interest")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Match threshold")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the frames")
+    args = parser.parse_args()
+
+    source = DirectoryFrameSource(args.frames, loop=False)
+    if not source.frames:
+        print(f"No PNG frames in {args.frames}")
+        sys.exit(1)
+
+    matcher = TemplateMatcher(load_png(args.template), args.roi, args.threshold)
+    report = benchmark(matcher, source.frames, load_labels(args.frames, source.paths), args.repeat)
+
+    print(f"Frames:        {report['frames']}")
+    print(f"Matches/sec:   {report['matches_per_second']:.1f} ({report['ms_per_frame']:.2f} ms/frame)")
+    if report["accuracy"] is None:
+        print("Accuracy:      no labelled frames")
+    else:
+        print(f"Accuracy:      {report['accuracy'] * 100:.1f}% of {report['labelled']} labelled frames")
+        if report["recall"] is not None:
+            print(f"Recall:        {report['recall'] * 100:.1f}%")
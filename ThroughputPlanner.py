@@ -0,0 +1,155 @@
+import sys
+import numpy as np
+
+# Fixed input timings of the routines' steps in seconds, as written in their step methods
+OPK_TOGGLE = 0.03 + 1 + 0.03 + 1  # Both OPK hotkeys with a second to settle after each
+RUN_RIGHT = 4 * (0.03 + 0.4 + 0.03)
+CROUCH = 0.03 + 0.03 + 0.1
+
+# Steps where the routine sends no input, counted as idle time
+IDLE_PHASES = ("wait", "slack")
+
+
+def uniform_ms(rng, low, high, size):
+    """Draws matching RunRng.randint(low, high) / 1000, as seconds"""
+    return rng.integers(low, high + 1, size=size) / 1000
+
+
+def respawn_wait(elapsed, wait_time):
+    """Time wait_for_respawn sleeps: whole one second polls until wait_time has passed since the cycle start"""
+    return np.ceil(np.maximum(wait_time / 1000 - elapsed, 0.0))
+
+
+def load_screen(config, rng, n):
+    """Load screen wait; adaptive mode depends on the game, so it is drawn between its minimum and the cap"""
+    if config["adaptive_load_screen"]:
+        return uniform_ms(rng, config["load_screen_adaptive_min"], config["load_screen_max"], n)
+    return uniform_ms(rng, config["load_screen_min"], config["load_screen_max"], n)
+
+
+def shot_burst(config, rng, n):
+    """Hold and gap of every shot of every cycle in one draw"""
+    shape = (n, config["shots"])
+    return (uniform_ms(rng, config["shot_min_time"], config["shot_max_time"], shape)
+            + uniform_ms(rng, config["shot_wait_min"], config["shot_wait_max"], shape)).sum(axis=1)
+
+
+def primary_model(config, rng, n):
+    """Step durations of n PrimaryWestTek cycles"""
+    steps = {
+        "shoot": shot_burst(config, rng, n),
+        "opk_off": np.full(n, OPK_TOGGLE),
+        "run": np.full(n, RUN_RIGHT),
+        "crouch": np.full(n, CROUCH)
+    }
+    steps["wait"] = respawn_wait(sum(steps.values()), config["wait_time"])
+    steps["elevator"] = np.full(n, 0.06 + 1)
+    steps["opk_on"] = np.full(n, OPK_TOGGLE)
+    steps["load"] = load_screen(config, rng, n)
+    return steps
+
+
+def timed_run_model(config, rng, n):
+    """Step durations of n TimedRunWestTek cycles"""
+    steps = {
+        "shoot": shot_burst(config, rng, n),
+        "opk_toggle": np.full(n, OPK_TOGGLE),
+        "run": np.full(n, RUN_RIGHT),
+        "crouch": np.full(n, CROUCH)
+    }
+    steps["wait"] = respawn_wait(sum(steps.values()), config["wait_time"])
+    steps["opk_on"] = np.full(n, OPK_TOGGLE - 1)  # No settle after the second hotkey
+    steps["elevator"] = 1 + uniform_ms(rng, config["quick_min_time"], config["quick_max_time"], n)
+    steps["load"] = load_screen(config, rng, n)
+    return steps
+
+
+def alt_model(config, rng, n):
+    """Step durations of n Alt cycles"""
+    shape = (n, config["walk_cycles"])
+    # Each walk holds backward, then both keys, then right, with the same walk draw three times
+    walk = uniform_ms(rng, config["walk_min_time"], config["walk_max_time"], shape)
+    walk_sleep = uniform_ms(rng, config["sleep_min_time"], config["sleep_max_time"], shape)
+    steps = {"walk": (3 * walk + walk_sleep).sum(axis=1)}
+    steps["wait"] = respawn_wait(steps["walk"], config["wait_time"])
+    steps["action"] = np.full(n, config["action_cycles"] * config["action_press_time"] / 1000)
+    return steps
+
+
+# Timing model of each built-in routine, by RoutineFactory name
+MODELS = {
+    "primary": primary_model,
+    "alt": alt_model,
+    "timed_run": timed_run_model
+}
+
+
+def plan(routine_name, config, cycles=100000, seed=None):
+    """Simulate cycles of a routine's timing model and summarise throughput
+
+    Returns the cycle duration distribution in seconds, the expected cycles per
+    hour, the idle share (time in the respawn wait) and each step's share of the
+    cycle. The countdown to the first cycle and screen detection are left out.
+    """
+    if routine_name not in MODELS:
+        raise ValueError(f"No timing model for {routine_name}")
+
+    rng = np.random.default_rng(seed)
+    steps = MODELS[routine_name](config, rng, cycles)
+    period = config.get("cycle_period", 0) / 1000
+    if period:
+        # Phase-locked cycles wait for their slot; one that overruns it starts the next cycle late
+        steps["slack"] = np.maximum(period - sum(steps.values()), 0.0)
+    durations = sum(steps.values())
+    total = durations.sum() or 1.0
+    mean = float(durations.mean())
+    p5, p50, p95 = np.percentile(durations, [5, 50, 95])
+    return {
+        "routine": routine_name,
+        "cycles": cycles,
+        "mean": mean,
+        "std": float(durations.std()),
+        "min": float(durations.min()),
+        "p5": float(p5),
+        "median": float(p50),
+        "p95": float(p95),
+        "max": float(durations.max()),
+        "cycles_per_hour": 3600 / mean if mean else float("inf"),
+        "idle_share": float(sum(steps[phase].sum() for phase in IDLE_PHASES if phase in steps) / total),
+        "step_shares": {phase: float(values.sum() / total) for phase, values in steps.items()}
+    }
+
+
+def summary(result):
+    """One line summary for the settings dialog"""
+    return (f"{result['cycles_per_hour']:.1f} cycles/hour, cycle {result['mean']:.2f}s "
+            f"(5-95%: {result['p5']:.2f}-{result['p95']:.2f}s), idle {result['idle_share'] * 100:.0f}%")
+
+
+# If this script is run directly, plan a routine's stored or default config
+if __name__ == "__main__":
+    import argparse
+    import RoutineFactory
+
+    parser = argparse.ArgumentParser(description="Monte Carlo cycle throughput of a routine config")
+    parser.add_argument("routine", choices=list(MODELS), help="Routine to simulate")
+    parser.add_argument("--profile", help="Stored settings profile (default: the GUI's saved settings)")
+    parser.add_argument("--cycles", type=int, default=100000, help="Cycles to simulate")
+    parser.add_argument("--seed", type=int, help="Seed for the simulation")
+    parser.add_argument("--set", nargs="*", default=[], metavar="KEY=VALUE", help="Override numeric config values")
+    args = parser.parse_args()
+
+    config = RoutineFactory.load_config(args.routine, profile=args.profile)
+    for item in args.set:
+        key, _, value = item.partition("=")
+        if key not in config:
+            parser.error(f"Unknown config key {key}")
+        config[key] = int(value)
+
+    result = plan(args.routine, config, args.cycles, args.seed)
+    print(summary(result))
+    print(f"Cycle min {result['min']:.3f}s, median {result['median']:.3f}s, max {result['max']:.3f}s, "
+          f"std {result['std'] * 1000:.1f} ms over {result['cycles']} cycles")
+    for phase, share in result["step_shares"].items():
+        print(f"  {phase:<12} {share * 100:5.1f}%")
+    sys.exit(0)